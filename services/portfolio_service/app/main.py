@@ -1,13 +1,28 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from app.routers import portfolios, transactions, auth
 from core.settings import settings
+from utils.price_oracle import price_oracle
+from utils.price_service_client import historical_price_cache, price_service_client
 from typing import Annotated
 
 from fastapi import Depends, FastAPI
 from fastapi.security import OAuth2PasswordBearer
 
 
-app = FastAPI(title="Portfolio Microservice")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled client for every call to price_service
+    price_service_client.start()
+    # Keep the current BTC price fresh in the background
+    price_oracle.start(settings.CURRENT_PRICE_REFRESH_SECONDS)
+    yield
+    await price_oracle.stop()
+    await price_service_client.close()
+
+
+app = FastAPI(title="Portfolio Microservice", lifespan=lifespan)
 
 app.include_router(portfolios.router, prefix="/portfolio", tags=["Portfolios"])
 app.include_router(transactions.router, prefix="/transaction", tags=["Transactions"])
@@ -17,3 +32,12 @@ app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 @app.get("/health", tags=["meta"])
 async def health():
     return {"status": "ok", "env": settings.APP_ENV}
+
+
+@app.get("/health/price-service", tags=["meta"])
+async def price_service_pool():
+    """Connection pool usage and cache counters of the client that calls price_service."""
+    return {
+        **price_service_client.pool_stats(),
+        "cache": historical_price_cache.stats(),
+    }
@@ -16,6 +16,8 @@ from utils.timestamp import FIRST_HISTORICAL_TIMESTAMP, get_last_valid_timestamp
 NUM_BTC = Numeric(20, 8)
 # Fiat prices and values with 2 decimal places
 NUM_USD = Numeric(20, 2)
+# Exact BTC amount times USD price (8 + 2 decimal places)
+NUM_COST = Numeric(30, 10)
 
 
 class User(Base):
@@ -53,6 +55,19 @@ class Portfolio(Base):
 
     goal_in_usd: Mapped[Decimal] = mapped_column(DECIMAL(19, 0), nullable=False)
 
+    # Running totals over the portfolio's transactions, updated in the same database
+    # transaction as every transaction write (see app/portfolio_aggregates.py)
+    total_btc_amount: Mapped[Decimal] = mapped_column(
+        NUM_BTC, nullable=False, default=Decimal("0"), server_default="0"
+    )
+    initial_value_usd: Mapped[Decimal] = mapped_column(
+        NUM_USD, nullable=False, default=Decimal("0"), server_default="0"
+    )
+    # SUM(btc_amount * price_at_purchase); divided by total_btc_amount for the average price
+    cost_basis_usd: Mapped[Decimal] = mapped_column(
+        NUM_COST, nullable=False, default=Decimal("0"), server_default="0"
+    )
+
     # Relationships
     user: Mapped["User"] = relationship(back_populates="portfolios")
     transactions: Mapped[list["Transaction"]] = relationship(
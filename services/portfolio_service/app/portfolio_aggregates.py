@@ -0,0 +1,137 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import NUM_COST, Portfolio, Transaction
+
+USD_CENT = Decimal("0.01")
+
+# Running totals kept on each portfolio, and the scale each is compared at
+AGGREGATE_SCALES = {
+    "total_btc_amount": Decimal("1e-8"),
+    "initial_value_usd": USD_CENT,
+    "cost_basis_usd": Decimal("1e-10"),
+}
+
+
+def transaction_values(btc_amount: Decimal, price: Decimal) -> dict:
+    """
+    Returns the price and value columns of a transaction, rounded the way they are
+    stored, so the running totals add up exactly to the stored rows.
+    """
+    price_at_purchase = Decimal(price).quantize(USD_CENT, rounding=ROUND_HALF_UP)
+    return {
+        "btc_amount": btc_amount,
+        "price_at_purchase": price_at_purchase,
+        "initial_value_usd": (btc_amount * price_at_purchase).quantize(
+            USD_CENT, rounding=ROUND_HALF_UP
+        ),
+    }
+
+
+def portfolio_metrics_columns() -> tuple:
+    """Columns for PortfolioReadWithMetrics, read from the portfolio row alone."""
+    return (
+        Portfolio.id,
+        Portfolio.name,
+        Portfolio.goal_in_usd,
+        Portfolio.initial_value_usd,
+        Portfolio.total_btc_amount,
+        case(
+            (
+                Portfolio.total_btc_amount > 0,
+                Portfolio.cost_basis_usd / Portfolio.total_btc_amount,
+            ),
+            else_=0,
+        ).label("average_price_usd"),
+    )
+
+
+async def add_to_portfolio(
+    db: AsyncSession,
+    portfolio_id: int,
+    btc_amount: Decimal,
+    initial_value_usd: Decimal,
+    cost_basis_usd: Decimal,
+) -> None:
+    """
+    Adds deltas to a portfolio's running totals with a single UPDATE ... SET x = x + delta,
+    so concurrent writers never lose each other's changes. The caller commits.
+    """
+    await db.execute(
+        update(Portfolio)
+        .where(Portfolio.id == portfolio_id)
+        .values(
+            total_btc_amount=Portfolio.total_btc_amount + btc_amount,
+            initial_value_usd=Portfolio.initial_value_usd + initial_value_usd,
+            cost_basis_usd=Portfolio.cost_basis_usd + cost_basis_usd,
+        )
+    )
+
+
+async def apply_transaction(db: AsyncSession, transaction, sign: int = 1) -> None:
+    """Adds (sign=1) or removes (sign=-1) a transaction from its portfolio's totals."""
+    await add_to_portfolio(
+        db,
+        transaction.portfolio_id,
+        sign * transaction.btc_amount,
+        sign * transaction.initial_value_usd,
+        sign * transaction.btc_amount * transaction.price_at_purchase,
+    )
+
+
+async def check_portfolio_aggregates(
+    db: AsyncSession, repair: bool = False
+) -> list[dict]:
+    """
+    Rebuilds every portfolio's totals from its transactions and compares them with the
+    stored ones.
+
+    Args:
+        repair (bool): Overwrite the totals that differ with the rebuilt ones (the
+            caller commits).
+
+    Returns:
+        list[dict]: One entry per differing value: portfolio_id, column, stored and expected.
+    """
+    result = await db.execute(
+        select(
+            Transaction.portfolio_id,
+            func.sum(Transaction.btc_amount),
+            func.sum(Transaction.initial_value_usd),
+            func.sum(
+                Transaction.btc_amount * Transaction.price_at_purchase, type_=NUM_COST
+            ),
+        ).group_by(Transaction.portfolio_id)
+    )
+    expected = {row[0]: row[1:] for row in result.all()}
+
+    result = await db.execute(
+        select(Portfolio.id, *(getattr(Portfolio, name) for name in AGGREGATE_SCALES))
+    )
+    differences = []
+    zeros = (Decimal(0),) * len(AGGREGATE_SCALES)
+    for portfolio_id, *stored in result.all():
+        rebuilt = expected.get(portfolio_id, zeros)
+        changed = {}
+        for (name, scale), stored_value, rebuilt_value in zip(
+            AGGREGATE_SCALES.items(), stored, rebuilt
+        ):
+            stored_value = Decimal(stored_value).quantize(scale)
+            rebuilt_value = Decimal(rebuilt_value).quantize(scale)
+            if stored_value != rebuilt_value:
+                differences.append(
+                    {
+                        "portfolio_id": portfolio_id,
+                        "column": name,
+                        "stored": stored_value,
+                        "expected": rebuilt_value,
+                    }
+                )
+                changed[name] = rebuilt_value
+        if repair and changed:
+            await db.execute(
+                update(Portfolio).where(Portfolio.id == portfolio_id).values(**changed)
+            )
+    return differences
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends
 from typing import Annotated
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func, case
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from app.database import get_db
-from app.models import Portfolio, Transaction, User
+from app.models import Portfolio, User
+from app.portfolio_aggregates import portfolio_metrics_columns
 from app.schemas.portfolios import (
     PortfolioRead,
     PortfolioCreate,
@@ -14,7 +15,7 @@ from app.schemas.portfolios import (
 from core.security import get_current_user
 from fastapi import HTTPException, status
 from decimal import Decimal
-from utils.fetch_current_btc_price import get_current_price
+from utils.price_oracle import get_price_context
 
 router = APIRouter()
 
@@ -25,41 +26,17 @@ async def list_portfolios(
     db: AsyncSession = Depends(get_db),
 ):
 
-    query = (
-        select(
-            Portfolio.id.label("id"),
-            Portfolio.name.label("name"),
-            Portfolio.goal_in_usd.label("goal_in_usd"),
-            func.coalesce(func.sum(Transaction.initial_value_usd), 0).label(
-                "initial_value_usd"
-            ),
-            func.coalesce(func.sum(Transaction.btc_amount), 0).label(
-                "total_btc_amount"
-            ),
-            case(
-                (
-                    func.sum(Transaction.btc_amount) > 0,
-                    func.sum(Transaction.btc_amount * Transaction.price_at_purchase)
-                    / func.sum(Transaction.btc_amount),
-                ),
-                else_=0,
-            ).label("average_price_usd"),
-        )
-        .join(
-            Transaction,
-            Portfolio.id == Transaction.portfolio_id,
-            isouter=True,
-        )
-        .where(Portfolio.user_id == current_user.id)
-        .group_by(Portfolio.id, Portfolio.name)
+    # Totals are kept on the portfolio row, so no join over the transactions
+    query = select(*portfolio_metrics_columns()).where(
+        Portfolio.user_id == current_user.id
     )
     result = await db.execute(query)
     portfolios_from_db = result.all()
-    current_price = get_current_price()
+    price_context = await get_price_context()
 
     porfolios_with_metrics = [
         PortfolioReadWithMetrics.model_validate(
-            portfolio, from_attributes=True, context={"current_price": current_price}
+            portfolio, from_attributes=True, context=price_context
         )
         for portfolio in portfolios_from_db
     ]
@@ -73,33 +50,8 @@ async def get_portfolio(
     current_user: Annotated[User, Depends(get_current_user)],
     db: AsyncSession = Depends(get_db),
 ):
-    query = (
-        select(
-            Portfolio.id.label("id"),
-            Portfolio.name.label("name"),
-            Portfolio.goal_in_usd.label("goal_in_usd"),
-            func.coalesce(func.sum(Transaction.initial_value_usd), 0).label(
-                "initial_value_usd"
-            ),
-            func.coalesce(func.sum(Transaction.btc_amount), 0).label(
-                "total_btc_amount"
-            ),
-            case(
-                (
-                    func.sum(Transaction.btc_amount) > 0,
-                    func.sum(Transaction.btc_amount * Transaction.price_at_purchase)
-                    / func.sum(Transaction.btc_amount),
-                ),
-                else_=0,
-            ).label("average_price_usd"),
-        )
-        .join(
-            Transaction,
-            Portfolio.id == Transaction.portfolio_id,
-            isouter=True,
-        )
-        .where(Portfolio.id == portfolio_id, Portfolio.user_id == current_user.id)
-        .group_by(Portfolio.id, Portfolio.name)
+    query = select(*portfolio_metrics_columns()).where(
+        Portfolio.id == portfolio_id, Portfolio.user_id == current_user.id
     )
 
     result = await db.execute(query)
@@ -108,10 +60,10 @@ async def get_portfolio(
     if not data:
         raise HTTPException(status_code=404, detail="Portfolio not found")
 
-    current_price = get_current_price()
+    price_context = await get_price_context()
 
     return PortfolioReadWithMetrics.model_validate(
-        data, from_attributes=True, context={"current_price": current_price}
+        data, from_attributes=True, context=price_context
     )
 
 
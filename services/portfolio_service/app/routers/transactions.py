@@ -1,20 +1,29 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from typing import Annotated, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models import Transaction, User, Portfolio
+from app.portfolio_aggregates import (
+    add_to_portfolio,
+    apply_transaction,
+    transaction_values,
+)
 from app.schemas.transactions import (
+    BulkRowError,
+    TransactionBulkResult,
     TransactionRead,
     TransactionCreate,
     TransactionReadWithMetrics,
 )
 from core.security import get_current_user
+from core.settings import settings
+from utils.bulk_transactions import parse_bulk_body, price_hours, validate_rows
 from utils.price_service_client import fetch_btc_price_data_for_timestamp
-from utils.fetch_current_btc_price import get_current_price
+from utils.price_oracle import get_price_context
+from utils.timestamp import round_timestamp_to_nearest_hour
 from fastapi import HTTPException
-import requests
 from datetime import datetime, timezone
 
 router = APIRouter()
@@ -53,11 +62,11 @@ async def list_transactions(
             status_code=404, detail="No transactions found for this user."
         )
 
-    current_price = get_current_price()
+    price_context = await get_price_context()
 
     transactions_with_metrics = [
         TransactionReadWithMetrics.model_validate(
-            transaction, from_attributes=True, context={"current_price": current_price}
+            transaction, from_attributes=True, context=price_context
         )
         for transaction in data
     ]
@@ -91,26 +100,145 @@ async def create_transaction(
             detail="Could not fetch price data from the external service. Please try again later.",
         )
 
-    btc_amount = transaction_data.btc_amount
-    price_at_purchase = price_data.close
-    initial_value_usd = btc_amount * price_at_purchase
     timestamp_hour_rounded = datetime.fromtimestamp(
         price_data.unix_timestamp, tz=timezone.utc
     )
 
     new_transaction = Transaction(
         portfolio_id=transaction_data.portfolio_id,
-        btc_amount=btc_amount,
-        price_at_purchase=price_at_purchase,
-        initial_value_usd=initial_value_usd,
         timestamp_hour_rounded=timestamp_hour_rounded,
+        **transaction_values(transaction_data.btc_amount, price_data.close),
     )
     db.add(new_transaction)
+    # Update the portfolio totals in the same database transaction
+    await apply_transaction(db, new_transaction)
     await db.commit()
     await db.refresh(new_transaction)
     return new_transaction
 
 
+@router.post(
+    "/bulk",
+    response_model=TransactionBulkResult,
+    status_code=201,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/TransactionCreate"},
+                    }
+                },
+                "text/csv": {
+                    "schema": {
+                        "type": "string",
+                        "example": "portfolio_id,btc_amount,timestamp\n"
+                        "1,0.01,2024-01-01T12:00:00Z",
+                    }
+                },
+            },
+        }
+    },
+)
+async def create_transactions_bulk(
+    request: Request,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: AsyncSession = Depends(get_db),
+) -> TransactionBulkResult:
+    """
+    Imports many transactions at once from a JSON list or a CSV upload.
+
+    Ownership is checked once for all portfolios and every distinct hour is priced once,
+    concurrently. Valid rows are inserted together in one transaction; rows that fail
+    validation, belong to an unknown portfolio or could not be priced are reported by
+    their 1-based position and skipped.
+    """
+    try:
+        rows = parse_bulk_body(
+            await request.body(), request.headers.get("content-type", "")
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if len(rows) > settings.BULK_TRANSACTIONS_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.BULK_TRANSACTIONS_MAX_ROWS} transactions per import.",
+        )
+
+    valid, errors = validate_rows(rows)
+
+    # Verify that the portfolios belong to the current user
+    portfolio_ids = {transaction.portfolio_id for _, transaction in valid}
+    owned = set()
+    if portfolio_ids:
+        result = await db.execute(
+            select(Portfolio.id).where(
+                Portfolio.id.in_(portfolio_ids),
+                Portfolio.user_id == current_user.id,
+            )
+        )
+        owned = set(result.scalars())
+
+    hours = {}
+    for number, transaction in valid:
+        if transaction.portfolio_id not in owned:
+            errors.append(BulkRowError(row=number, errors=["Portfolio not found"]))
+            continue
+        hour = round_timestamp_to_nearest_hour(int(transaction.timestamp.timestamp()))
+        hours[number] = hour
+
+    prices = await price_hours(
+        set(hours.values()),
+        fetch_btc_price_data_for_timestamp,
+        settings.BULK_PRICE_CONCURRENCY,
+    )
+
+    new_transactions = []
+    for number, transaction in valid:
+        if number not in hours:
+            continue
+        price_data = prices[hours[number]]
+        if price_data is None:
+            errors.append(
+                BulkRowError(
+                    row=number,
+                    errors=["Could not fetch price data from the external service."],
+                )
+            )
+            continue
+        new_transactions.append(
+            {
+                "portfolio_id": transaction.portfolio_id,
+                "timestamp_hour_rounded": datetime.fromtimestamp(
+                    price_data.unix_timestamp, tz=timezone.utc
+                ),
+                **transaction_values(transaction.btc_amount, price_data.close),
+            }
+        )
+
+    # One executemany; SQLAlchemy sends it as batched multi-row INSERT ... VALUES
+    if new_transactions:
+        await db.execute(insert(Transaction), new_transactions)
+
+        # One totals update per portfolio, in the same database transaction
+        totals = {}
+        for row in new_transactions:
+            btc, value, cost = totals.get(row["portfolio_id"], (0, 0, 0))
+            totals[row["portfolio_id"]] = (
+                btc + row["btc_amount"],
+                value + row["initial_value_usd"],
+                cost + row["btc_amount"] * row["price_at_purchase"],
+            )
+        for portfolio_id, (btc, value, cost) in totals.items():
+            await add_to_portfolio(db, portfolio_id, btc, value, cost)
+        await db.commit()
+
+    errors.sort(key=lambda error: error.row)
+    return TransactionBulkResult(inserted=len(new_transactions), errors=errors)
+
+
 @router.get("/{transaction_id}", response_model=TransactionReadWithMetrics)
 async def get_transaction(
     transaction_id: int,
@@ -139,10 +267,10 @@ async def get_transaction(
     if not data:
         raise HTTPException(status_code=404, detail="Transaction not found")
 
-    current_price = get_current_price()
+    price_context = await get_price_context()
 
     transaction_with_metrics = TransactionReadWithMetrics.model_validate(
-        data, from_attributes=True, context={"current_price": current_price}
+        data, from_attributes=True, context=price_context
     )
     return transaction_with_metrics
 
@@ -153,6 +281,8 @@ async def delete_transaction(
     current_user: Annotated[User, Depends(get_current_user)],
     db: AsyncSession = Depends(get_db),
 ):
+    # Lock the row so a concurrent delete or update of the same transaction waits,
+    # then finds it gone or changed, and its values are subtracted only once
     query = (
         select(Transaction)
         .join(Portfolio)
@@ -160,12 +290,15 @@ async def delete_transaction(
             Transaction.id == transaction_id,
             Portfolio.user_id == current_user.id,
         )
+        .with_for_update(of=Transaction)
+        .execution_options(populate_existing=True)
     )
     result = await db.execute(query)
     transaction = result.scalar_one_or_none()
     if not transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
 
+    await apply_transaction(db, transaction, sign=-1)
     await db.delete(transaction)
     await db.commit()
     return
@@ -212,20 +345,35 @@ async def update_transaction(
             detail="Could not fetch price data from the external service. Please try again later.",
         )
 
-    btc_amount = transaction_data.btc_amount
-    price_at_purchase = price_data.close
-    initial_value_usd = btc_amount * price_at_purchase
+    values = transaction_values(transaction_data.btc_amount, price_data.close)
     timestamp_hour_rounded = datetime.fromtimestamp(
         price_data.unix_timestamp, tz=timezone.utc
     )
 
+    # Lock the row and re-read it (the price lookup above is not done under the lock),
+    # so concurrent updates or deletes of the same transaction take turns and each
+    # moves the totals from the values it actually replaces
+    result = await db.execute(
+        select(Transaction)
+        .where(Transaction.id == transaction_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    transaction = result.scalar_one_or_none()
+    if not transaction:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+
+    # Move the transaction's share of the totals from the old values to the new ones
+    await apply_transaction(db, transaction, sign=-1)
+
     # Update transaction fields
     transaction.portfolio_id = transaction_data.portfolio_id
-    transaction.btc_amount = btc_amount
-    transaction.price_at_purchase = price_at_purchase
-    transaction.initial_value_usd = initial_value_usd
+    transaction.btc_amount = values["btc_amount"]
+    transaction.price_at_purchase = values["price_at_purchase"]
+    transaction.initial_value_usd = values["initial_value_usd"]
     transaction.timestamp_hour_rounded = timestamp_hour_rounded
 
+    await apply_transaction(db, transaction)
     await db.commit()
     await db.refresh(transaction)
     return transaction
@@ -1,3 +1,4 @@
+from datetime import datetime
 from decimal import Decimal
 from pydantic import BaseModel, Field
 from pydantic_core.core_schema import ValidationInfo
@@ -28,6 +29,10 @@ class PortfolioReadWithMetrics(PortfolioRead):
     net_result: Decimal | None = None
     roi: Decimal | None = None  # Return on Investment
 
+    # When the current price used above was fetched, and whether it is past its TTL
+    price_updated_at: datetime | None = None
+    price_stale: bool | None = None
+
     model_config = {"from_attributes": True}
 
     @model_validator(mode="after")
@@ -57,4 +62,6 @@ class PortfolioReadWithMetrics(PortfolioRead):
             self.net_result = Decimal("0.0")
             self.roi = Decimal("0.0")
 
+        self.price_updated_at = info.context.get("price_updated_at")
+        self.price_stale = info.context.get("price_stale")
         return self
@@ -52,6 +52,10 @@ class TransactionReadWithMetrics(TransactionRead):
     net_result: Decimal | None = None
     roi: Decimal | None = None
 
+    # When the current price used above was fetched, and whether it is past its TTL
+    price_updated_at: datetime | None = None
+    price_stale: bool | None = None
+
     @model_validator(mode="after")
     def calculate_metrics(self, info: ValidationInfo) -> Self:
         if self.current_value_usd is not None:
@@ -69,9 +73,21 @@ class TransactionReadWithMetrics(TransactionRead):
         else:
             self.net_result = Decimal("0.0")
             self.roi = Decimal("0.0")
+        self.price_updated_at = info.context.get("price_updated_at")
+        self.price_stale = info.context.get("price_stale")
         return self
 
 
+class BulkRowError(BaseModel):
+    row: int = Field(description="1-based position of the row in the upload")
+    errors: list[str]
+
+
+class TransactionBulkResult(BaseModel):
+    inserted: int
+    errors: list[BulkRowError]
+
+
 class PriceData(BaseModel):
     unix_timestamp: int
     high: Decimal
@@ -0,0 +1,42 @@
+import argparse
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.portfolio_aggregates import check_portfolio_aggregates
+from core.settings import settings
+
+# ----- Settings -----
+DATABASE_URL = settings.db_url
+
+# ----- Create engine and session -----
+engine = create_async_engine(DATABASE_URL)
+async_session = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+
+async def check(repair: bool):
+    """Compares the stored portfolio totals with their transactions."""
+    async with async_session() as session:
+        async with session.begin():
+            differences = await check_portfolio_aggregates(session, repair=repair)
+
+    for difference in differences:
+        print(
+            f"portfolio {difference['portfolio_id']}: {difference['column']} "
+            f"stored {difference['stored']}, expected {difference['expected']}"
+        )
+    if not differences:
+        print("Portfolio totals match their transactions.")
+    elif repair:
+        print(f"Repaired {len(differences)} value(s).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check the running portfolio totals against their transactions."
+    )
+    parser.add_argument(
+        "--repair", action="store_true", help="overwrite the totals that differ"
+    )
+    asyncio.run(check(parser.parse_args().repair))
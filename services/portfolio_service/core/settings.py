@@ -22,7 +22,31 @@ class Settings(BaseSettings):
 
     # --- External services ---
     PRICE_SERVICE_BASE_URL: str = Field()
-    CRYPTOCOMPARE_API_KEY: str = Field()
+    # Connection pool and timeouts for calls to price_service
+    PRICE_SERVICE_MAX_CONNECTIONS: int = Field(default=20)
+    PRICE_SERVICE_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=10)
+    PRICE_SERVICE_KEEPALIVE_EXPIRY: float = Field(default=30.0)
+    PRICE_SERVICE_TIMEOUT: float = Field(default=5.0)
+    PRICE_SERVICE_CONNECT_TIMEOUT: float = Field(default=2.0)
+    # Longest a request may wait for a free connection
+    PRICE_SERVICE_POOL_TIMEOUT: float = Field(default=5.0)
+    # Needs the `h2` package; falls back to HTTP/1.1 without it
+    PRICE_SERVICE_HTTP2: bool = Field(default=False)
+    # Closed hours fetched from price_service kept in memory (LRU)
+    PRICE_CACHE_MAX_ENTRIES: int = Field(default=10000)
+
+    # --- Current BTC price (kept in memory) ---
+    CURRENT_PRICE_REFRESH_SECONDS: float = Field(default=30.0)
+    # Reads start a background refresh once it is older than this
+    CURRENT_PRICE_TTL_SECONDS: float = Field(default=60.0)
+    # Reads do not start another refresh for this long after one failed
+    CURRENT_PRICE_RETRY_SECONDS: float = Field(default=10.0)
+
+    # --- Bulk transaction import ---
+    BULK_TRANSACTIONS_MAX_ROWS: int = Field(default=10000)
+    # Price lookups in flight at once while pricing an import
+    BULK_PRICE_CONCURRENCY: int = Field(default=16)
+
     # --- Security / Auth ---
     SECRET_KEY: str = Field(..., description="JWT signing secret")
     ALGORITHM: str = Field(default="HS256")
@@ -0,0 +1,47 @@
+"""Add running totals to portfolios
+
+Revision ID: 3b7d5f2a9c61
+Revises: fe8e2b6bb9d4
+Create Date: 2026-10-18 10:12:41.203518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7d5f2a9c61'
+down_revision: Union[str, None] = 'fe8e2b6bb9d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('portfolios', sa.Column('total_btc_amount', sa.Numeric(precision=20, scale=8), server_default='0', nullable=False))
+    op.add_column('portfolios', sa.Column('initial_value_usd', sa.Numeric(precision=20, scale=2), server_default='0', nullable=False))
+    op.add_column('portfolios', sa.Column('cost_basis_usd', sa.Numeric(precision=30, scale=10), server_default='0', nullable=False))
+
+    # Backfill from the existing transactions
+    op.execute("""
+        UPDATE portfolios AS p
+        SET total_btc_amount = t.total_btc_amount,
+            initial_value_usd = t.initial_value_usd,
+            cost_basis_usd = t.cost_basis_usd
+        FROM (
+            SELECT portfolio_id,
+                   SUM(btc_amount) AS total_btc_amount,
+                   SUM(initial_value_usd) AS initial_value_usd,
+                   SUM(btc_amount * price_at_purchase) AS cost_basis_usd
+            FROM transactions
+            GROUP BY portfolio_id
+        ) AS t
+        WHERE p.id = t.portfolio_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('portfolios', 'cost_basis_usd')
+    op.drop_column('portfolios', 'initial_value_usd')
+    op.drop_column('portfolios', 'total_btc_amount')
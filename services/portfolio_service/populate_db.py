@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.models import Base, User, Portfolio, Transaction
+from app.portfolio_aggregates import check_portfolio_aggregates
 from core.settings import settings
 from passlib.context import CryptContext
 
@@ -84,6 +85,11 @@ async def populate():
                     transactions.append(t)
                     session.add(t)
 
+            await session.flush()
+
+            # ---- Fill in the portfolio totals ----
+            await check_portfolio_aggregates(session, repair=True)
+
         # Commit all changes
         await session.commit()
         print("Database populated successfully!")
@@ -1,5 +1,9 @@
+import asyncio
 import pytest
+import uvicorn
+from decimal import Decimal
 from typing import AsyncGenerator
+from fastapi import FastAPI, Request
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
@@ -7,6 +11,8 @@ from app.main import app
 from app.database import Base, get_db
 from app.schemas.transactions import PriceData
 from core.settings import settings
+from utils.price_oracle import price_oracle
+from utils.price_service_client import historical_price_cache, price_service_client
 
 from faker import Faker
 from fastapi import status
@@ -109,6 +115,68 @@ async def created_transaction(
     yield create_response.json()
 
 
+@pytest.fixture
+async def price_service(monkeypatch) -> dict:
+    """
+    Runs a local stand-in for price_service on a free port and points the shared
+    client at it. Yields its state: the client `ports` seen (one per TCP connection),
+    the `requests` served, and a `missing` set of hours answered with the next hour.
+    """
+    state = {"ports": set(), "requests": 0, "missing": set()}
+    upstream = FastAPI()
+
+    @upstream.get("/prices/{unix_timestamp}")
+    async def price(unix_timestamp: int, request: Request, mode: str = "exact"):
+        state["ports"].add(request.client.port)
+        state["requests"] += 1
+        await asyncio.sleep(0.02)
+        hour = unix_timestamp // 3600 * 3600
+        if hour in state["missing"]:
+            hour += 3600
+        return {
+            "unix_timestamp": hour,
+            "high": 112545.3,
+            "low": 111143.27,
+            "open": 111491.96,
+            "close": 112293.52,
+            "volumefrom": 2809.0,
+            "volumeto": 314166893.0,
+            "mode": mode,
+        }
+
+    server = uvicorn.Server(
+        uvicorn.Config(upstream, host="127.0.0.1", port=0, log_level="warning")
+    )
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+
+    monkeypatch.setattr(settings, "PRICE_SERVICE_BASE_URL", f"http://127.0.0.1:{port}")
+    monkeypatch.setattr(settings, "PRICE_SERVICE_MAX_CONNECTIONS", 4)
+    monkeypatch.setattr(settings, "PRICE_SERVICE_MAX_KEEPALIVE_CONNECTIONS", 4)
+    await price_service_client.close()
+    price_service_client.reset()
+    historical_price_cache.reset()
+    yield state
+
+    await price_service_client.close()
+    server.should_exit = True
+    await task
+
+
+@pytest.fixture(autouse=True)
+def current_price():
+    """
+    Seeds the in-memory current BTC price so handlers never call price_service.
+    Yields the seeded price.
+    """
+    price = Decimal("112293.52")
+    price_oracle.set_price(price)
+    yield price
+    price_oracle.reset()
+
+
 @pytest.fixture(scope="session")
 def anyio_backend():
     """
@@ -0,0 +1,212 @@
+import pytest
+from decimal import Decimal
+from httpx import AsyncClient
+from fastapi import status
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Portfolio
+from app.portfolio_aggregates import check_portfolio_aggregates
+from app.schemas.transactions import PriceData
+
+
+def price_data(close: float) -> PriceData:
+    return PriceData(
+        unix_timestamp=1756908000,
+        high=112545.3,
+        low=111143.27,
+        open=111491.96,
+        close=close,
+        volumefrom=2809.0,
+        volumeto=314166893.0,
+    )
+
+
+async def get_totals(client: AsyncClient, auth_headers: dict, portfolio_id: int):
+    response = await client.get(f"/portfolio/{portfolio_id}", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    portfolio = response.json()
+    return (
+        Decimal(portfolio["total_btc_amount"]),
+        Decimal(portfolio["initial_value_usd"]),
+        Decimal(portfolio["average_price_usd"]).quantize(Decimal("0.01")),
+    )
+
+
+async def differences_for(db_session: AsyncSession, portfolio_id: int, **kwargs):
+    differences = await check_portfolio_aggregates(db_session, **kwargs)
+    return [d for d in differences if d["portfolio_id"] == portfolio_id]
+
+
+class TestPortfolioAggregates:
+
+    @pytest.mark.anyio
+    async def test_totals_follow_create_update_and_delete(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        created_portfolio: dict,
+        db_session: AsyncSession,
+        mocker,
+    ):
+        fetch = mocker.patch(
+            "app.routers.transactions.fetch_btc_price_data_for_timestamp",
+            return_value=price_data(100000.0),
+        )
+        portfolio_id = created_portfolio["id"]
+        assert await get_totals(client, auth_headers, portfolio_id) == (0, 0, 0)
+
+        first = await client.post(
+            "/transaction/",
+            json={
+                "portfolio_id": portfolio_id,
+                "btc_amount": "0.1",
+                "timestamp": "2023-10-01T12:00:00Z",
+            },
+            headers=auth_headers,
+        )
+        fetch.return_value = price_data(50000.0)
+        second = await client.post(
+            "/transaction/",
+            json={
+                "portfolio_id": portfolio_id,
+                "btc_amount": "0.3",
+                "timestamp": "2023-10-02T12:00:00Z",
+            },
+            headers=auth_headers,
+        )
+        assert first.status_code == second.status_code == status.HTTP_201_CREATED
+
+        # Weighted average: (0.1 * 100000 + 0.3 * 50000) / 0.4
+        assert await get_totals(client, auth_headers, portfolio_id) == (
+            Decimal("0.4"),
+            Decimal("25000"),
+            Decimal("62500.00"),
+        )
+
+        response = await client.put(
+            f"/transaction/{second.json()['id']}",
+            json={
+                "portfolio_id": portfolio_id,
+                "btc_amount": "0.1",
+                "timestamp": "2023-10-02T12:00:00Z",
+            },
+            headers=auth_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert await get_totals(client, auth_headers, portfolio_id) == (
+            Decimal("0.2"),
+            Decimal("15000"),
+            Decimal("75000.00"),
+        )
+
+        response = await client.delete(
+            f"/transaction/{first.json()['id']}", headers=auth_headers
+        )
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert await get_totals(client, auth_headers, portfolio_id) == (
+            Decimal("0.1"),
+            Decimal("5000"),
+            Decimal("50000.00"),
+        )
+        assert await differences_for(db_session, portfolio_id) == []
+
+    @pytest.mark.anyio
+    async def test_moving_a_transaction_moves_its_totals(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        created_portfolio: dict,
+        created_transaction: dict,
+    ):
+        response = await client.post(
+            "/portfolio/", json={"name": "Second Portfolio"}, headers=auth_headers
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        second_id = response.json()["id"]
+
+        response = await client.put(
+            f"/transaction/{created_transaction['id']}",
+            json={
+                "portfolio_id": second_id,
+                "btc_amount": "0.01",
+                "timestamp": "2023-10-01T12:00:00Z",
+            },
+            headers=auth_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        assert await get_totals(client, auth_headers, created_portfolio["id"]) == (
+            0,
+            0,
+            0,
+        )
+        assert await get_totals(client, auth_headers, second_id) == (
+            Decimal("0.01"),
+            Decimal("1122.94"),
+            Decimal("112293.52"),
+        )
+
+    @pytest.mark.anyio
+    async def test_bulk_import_updates_totals(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        created_portfolio: dict,
+        db_session: AsyncSession,
+        mocker,
+    ):
+        mocker.patch(
+            "app.routers.transactions.fetch_btc_price_data_for_timestamp",
+            return_value=price_data(112293.52),
+        )
+        portfolio_id = created_portfolio["id"]
+        rows = [
+            {
+                "portfolio_id": portfolio_id,
+                "btc_amount": "0.01",
+                "timestamp": "2023-10-01T12:00:00Z",
+            }
+        ] * 3
+
+        response = await client.post(
+            "/transaction/bulk", json=rows, headers=auth_headers
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+        # Each row's value is rounded to the cent before it is added up
+        assert await get_totals(client, auth_headers, portfolio_id) == (
+            Decimal("0.03"),
+            Decimal("3368.82"),
+            Decimal("112293.52"),
+        )
+        assert await differences_for(db_session, portfolio_id) == []
+
+    @pytest.mark.anyio
+    async def test_checker_detects_and_repairs_drift(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        created_transaction: dict,
+        db_session: AsyncSession,
+    ):
+        portfolio_id = created_transaction["portfolio_id"]
+        await db_session.execute(
+            update(Portfolio)
+            .where(Portfolio.id == portfolio_id)
+            .values(total_btc_amount=Decimal("5"))
+        )
+
+        differences = await differences_for(db_session, portfolio_id, repair=True)
+
+        assert differences == [
+            {
+                "portfolio_id": portfolio_id,
+                "column": "total_btc_amount",
+                "stored": Decimal("5.00000000"),
+                "expected": Decimal("0.01000000"),
+            }
+        ]
+        assert await differences_for(db_session, portfolio_id) == []
+        totals = await get_totals(client, auth_headers, portfolio_id)
+        assert totals[0] == Decimal("0.01")
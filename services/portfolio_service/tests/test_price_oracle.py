@@ -0,0 +1,211 @@
+import asyncio
+import time
+import pytest
+from decimal import Decimal
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from httpx import AsyncClient, ASGITransport
+
+from utils.price_oracle import PriceOracle, price_oracle
+from utils.price_service_client import price_service_client
+
+
+@pytest.fixture
+async def latest_price(monkeypatch) -> dict:
+    """
+    Local stand-in for price_service's /prices/latest, plugged into the shared client and
+    slow enough for concurrent readers to pile up. Yields its state: `calls` made,
+    whether to `fail`, and the `price` to serve.
+    """
+    state = {"calls": 0, "fail": False, "price": 65000.5}
+    upstream = FastAPI()
+
+    @upstream.get("/prices/latest")
+    async def latest():
+        state["calls"] += 1
+        await asyncio.sleep(0.05)
+        if state["fail"]:
+            return JSONResponse(
+                {"detail": "Latest price not available yet."}, status_code=503
+            )
+        return {"price": state["price"], "last_updated": time.time()}
+
+    async with AsyncClient(
+        transport=ASGITransport(app=upstream), base_url="http://price-service"
+    ) as client:
+        monkeypatch.setattr(price_service_client, "client", client)
+        yield state
+
+
+@pytest.fixture
+def oracle(latest_price: dict) -> PriceOracle:
+    return PriceOracle(ttl_seconds=60)
+
+
+class TestPriceOracle:
+
+    @pytest.mark.anyio
+    async def test_concurrent_reads_share_one_upstream_call(
+        self, oracle: PriceOracle, latest_price: dict
+    ):
+        quotes = await asyncio.gather(*(oracle.get_quote() for _ in range(200)))
+
+        assert latest_price["calls"] == 1
+        assert {quote.price for quote in quotes} == {Decimal("65000.50")}
+        assert not any(quote.stale for quote in quotes)
+
+        # Fresh reads are answered from memory
+        await asyncio.gather(*(oracle.get_quote() for _ in range(200)))
+        assert latest_price["calls"] == 1
+
+    @pytest.mark.anyio
+    async def test_expired_price_is_served_while_refreshed_once(
+        self, oracle: PriceOracle, latest_price: dict
+    ):
+        oracle.set_price(Decimal("60000.00"), updated_at=0)
+        latest_price["price"] = 66000
+
+        # Reads do not wait on the upstream: they get the old price, flagged stale
+        quotes = await asyncio.gather(*(oracle.get_quote() for _ in range(50)))
+        assert {quote.price for quote in quotes} == {Decimal("60000.00")}
+        assert all(quote.stale for quote in quotes)
+
+        await oracle.refresh()
+        assert latest_price["calls"] == 1
+        quote = await oracle.get_quote()
+        assert (quote.price, quote.stale) == (Decimal("66000.00"), False)
+
+    @pytest.mark.anyio
+    async def test_failed_refresh_serves_last_price_as_stale(
+        self, oracle: PriceOracle, latest_price: dict
+    ):
+        oracle.set_price(Decimal("60000.00"), updated_at=0)
+        latest_price["fail"] = True
+
+        quote = await oracle.get_quote()
+        await oracle.refresh()
+
+        assert quote.price == Decimal("60000.00")
+        assert quote.stale is True
+        assert quote.updated_at.timestamp() == 0
+        assert oracle.failures == 1
+
+    @pytest.mark.anyio
+    async def test_reads_back_off_after_a_failed_refresh(
+        self, oracle: PriceOracle, latest_price: dict
+    ):
+        oracle.set_price(Decimal("60000.00"), updated_at=0)
+        latest_price["fail"] = True
+        assert not await oracle.refresh()
+
+        for _ in range(20):
+            quote = await oracle.get_quote()
+        assert quote.stale is True
+        assert latest_price["calls"] == 1
+
+        # Once the retry delay has passed, a read starts a new refresh
+        oracle.last_error_at -= oracle.retry_seconds
+        await oracle.get_quote()
+        await oracle.refresh()
+        assert latest_price["calls"] == 2
+
+    @pytest.mark.anyio
+    async def test_cancelled_reader_does_not_cancel_the_refresh(
+        self, oracle: PriceOracle, latest_price: dict
+    ):
+        reader = asyncio.create_task(oracle.get_quote())
+        await asyncio.sleep(0.01)
+        reader.cancel()
+
+        quote = await oracle.get_quote()
+
+        assert quote.price == Decimal("65000.50")
+        assert latest_price["calls"] == 1
+
+    @pytest.mark.anyio
+    async def test_refresher_survives_an_unexpected_error(
+        self, oracle: PriceOracle, monkeypatch
+    ):
+        calls = []
+
+        async def fetch_current_price():
+            calls.append(time.time())
+            if len(calls) == 1:
+                raise RuntimeError("client is closed")
+            return Decimal("65000.50"), time.time()
+
+        monkeypatch.setattr(
+            "utils.price_oracle.fetch_current_price", fetch_current_price
+        )
+        oracle.start(refresh_seconds=0.01)
+        try:
+            await asyncio.sleep(0.1)
+            assert not oracle._task.done()
+            assert oracle.failures == 1
+            assert oracle.quote().price == Decimal("65000.50")
+        finally:
+            await oracle.stop()
+
+
+class TestPriceStaleness:
+
+    @pytest.mark.anyio
+    async def test_portfolio_reports_price_timestamp(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        created_portfolio: dict,
+        current_price: Decimal,
+    ):
+        response = await client.get(
+            f"/portfolio/{created_portfolio['id']}", headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        portfolio = response.json()
+        assert portfolio["price_updated_at"] is not None
+        assert portfolio["price_stale"] is False
+
+    @pytest.mark.anyio
+    async def test_transaction_reports_stale_price(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        created_transaction: dict,
+        current_price: Decimal,
+        mocker,
+    ):
+        # price_service is down and the seeded price has expired
+        mocker.patch(
+            "utils.price_oracle.fetch_current_price",
+            return_value=None,
+        )
+        price_oracle.set_price(current_price, updated_at=0)
+
+        response = await client.get(
+            f"/transaction/{created_transaction['id']}", headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        transaction = response.json()
+        assert transaction["price_stale"] is True
+        assert transaction["price_updated_at"].startswith("1970-01-01")
+
+
+class TestPriceServiceQuote:
+
+    @pytest.mark.anyio
+    async def test_old_quote_from_price_service_counts_as_failure(
+        self, oracle: PriceOracle, latest_price: dict, mocker
+    ):
+        # price_service answers, but its own poller has not refreshed for long
+        mocker.patch(
+            "utils.price_oracle.fetch_current_price",
+            return_value=(Decimal("64000.00"), time.time() - 3600),
+        )
+
+        assert not await oracle.refresh()
+
+        quote = oracle.quote()
+        assert (quote.price, quote.stale) == (Decimal("64000.00"), True)
+        assert oracle.is_backing_off()
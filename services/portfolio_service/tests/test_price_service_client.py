@@ -0,0 +1,107 @@
+import asyncio
+import time
+import pytest
+from decimal import Decimal
+
+from core.settings import settings
+from utils.price_service_client import (
+    fetch_btc_price_data_for_timestamp,
+    historical_price_cache,
+    price_service_client,
+)
+
+HOUR = 1756908000
+
+
+class TestPriceServiceClient:
+
+    @pytest.mark.anyio
+    async def test_concurrent_calls_reuse_pooled_connections(self, price_service):
+        timestamps = [HOUR + i * 3600 for i in range(40)]
+
+        prices = await asyncio.gather(
+            *(fetch_btc_price_data_for_timestamp(ts) for ts in timestamps)
+        )
+
+        assert all(price.close == Decimal("112293.52") for price in prices)
+        # 40 requests over at most 4 kept-alive connections
+        assert len(price_service["ports"]) <= 4
+
+        stats = price_service_client.pool_stats()
+        assert stats["requests"] == 40
+        assert stats["in_flight"] == 0
+        assert stats["in_use"] == 0
+        assert 1 <= stats["idle"] <= 4
+        # Requests queued behind the 4 connections waited for one
+        assert stats["max_pool_wait_ms"] > 0
+
+        await fetch_btc_price_data_for_timestamp(timestamps[0])
+        assert len(price_service["ports"]) <= 4
+
+    @pytest.mark.anyio
+    async def test_pool_stats_endpoint(self, client, price_service):
+        await fetch_btc_price_data_for_timestamp(HOUR)
+
+        response = await client.get("/health/price-service")
+
+        assert response.status_code == 200
+        stats = response.json()
+        assert stats["open"] is True
+        assert stats["requests"] == 1
+        assert stats["connections"] == stats["idle"] == 1
+
+
+class TestHistoricalPriceCache:
+
+    @pytest.mark.anyio
+    async def test_closed_hour_is_fetched_once(self, price_service):
+        # Both timestamps round to HOUR
+        first = await fetch_btc_price_data_for_timestamp(HOUR - 600)
+        second = await fetch_btc_price_data_for_timestamp(HOUR + 1799)
+
+        assert first == second
+        assert first.unix_timestamp == HOUR
+        assert price_service["requests"] == 1
+        stats = historical_price_cache.stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+    @pytest.mark.anyio
+    async def test_concurrent_lookups_share_one_request(self, price_service):
+        prices = await asyncio.gather(
+            *(fetch_btc_price_data_for_timestamp(HOUR) for _ in range(20))
+        )
+
+        assert {price.unix_timestamp for price in prices} == {HOUR}
+        assert price_service["requests"] == 1
+        stats = historical_price_cache.stats()
+        assert (stats["misses"], stats["shared"]) == (1, 19)
+
+    @pytest.mark.anyio
+    async def test_open_and_missing_hours_are_not_cached(self, price_service):
+        open_hour = int(time.time()) // 3600 * 3600
+        price_service["missing"].add(HOUR)
+
+        for _ in range(2):
+            await fetch_btc_price_data_for_timestamp(open_hour)
+            price = await fetch_btc_price_data_for_timestamp(HOUR)
+
+        assert price.unix_timestamp == HOUR + 3600
+        assert price_service["requests"] == 4
+        assert historical_price_cache.stats()["entries"] == 0
+
+    @pytest.mark.anyio
+    async def test_least_recently_used_hour_is_evicted(
+        self, price_service, monkeypatch
+    ):
+        monkeypatch.setattr(historical_price_cache, "max_entries", 2)
+
+        for hour in (HOUR, HOUR + 3600, HOUR, HOUR + 7200):
+            await fetch_btc_price_data_for_timestamp(hour)
+        assert price_service["requests"] == 3
+
+        # HOUR + 3600 was the least recently used
+        await fetch_btc_price_data_for_timestamp(HOUR)
+        assert price_service["requests"] == 3
+        await fetch_btc_price_data_for_timestamp(HOUR + 3600)
+        assert price_service["requests"] == 4
+        assert historical_price_cache.stats()["evictions"] == 2
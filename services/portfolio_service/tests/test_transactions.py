@@ -1,3 +1,4 @@
+import time
 import pytest
 from httpx import AsyncClient
 from fastapi import status
@@ -5,7 +6,8 @@ from faker import Faker
 from decimal import Decimal
 from app.schemas.transactions import PriceData
 from datetime import datetime, timezone, timedelta
-
+from core.settings import settings
+from utils.price_service_client import price_service_client
 
 fake = Faker()
 
@@ -714,3 +716,197 @@ class TestDeleteTransaction:
             f"/transaction/{transaction_id}", headers=second_user_headers
         )
         assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestBulkCreateTransactions:
+    base_hour = 1756908000
+
+    @staticmethod
+    async def fake_price_data(timestamp: int) -> PriceData:
+        return PriceData(
+            unix_timestamp=timestamp,
+            high=112545.3,
+            low=111143.27,
+            open=111491.96,
+            close=100000 + (timestamp - 1756908000) // 3600,
+            volumefrom=2809.0,
+            volumeto=314166893.0,
+        )
+
+    def timestamp(self, hour: int, minute: int = 10) -> str:
+        return datetime.fromtimestamp(
+            self.base_hour + hour * 3600 + minute * 60, tz=timezone.utc
+        ).isoformat()
+
+    @pytest.mark.anyio
+    async def test_bulk_json_inserts_valid_rows_and_reports_errors(
+        self, client: AsyncClient, auth_headers: dict, created_portfolio: dict, mocker
+    ):
+        fetch = mocker.patch(
+            "app.routers.transactions.fetch_btc_price_data_for_timestamp",
+            side_effect=self.fake_price_data,
+        )
+        portfolio_id = created_portfolio["id"]
+        rows = [
+            {
+                "portfolio_id": portfolio_id,
+                "btc_amount": "0.1",
+                "timestamp": self.timestamp(0),
+            },
+            {
+                "portfolio_id": portfolio_id,
+                "btc_amount": "-1",
+                "timestamp": self.timestamp(0),
+            },
+            {
+                "portfolio_id": portfolio_id,
+                "btc_amount": "0.2",
+                "timestamp": self.timestamp(1, 40),
+            },
+            {"portfolio_id": 9999, "btc_amount": "0.1", "timestamp": self.timestamp(0)},
+            {
+                "portfolio_id": portfolio_id,
+                "btc_amount": "0.3",
+                "timestamp": self.timestamp(2),
+            },
+        ]
+
+        response = await client.post(
+            "/transaction/bulk", json=rows, headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        result = response.json()
+        assert result["inserted"] == 3
+        assert [error["row"] for error in result["errors"]] == [2, 4]
+        assert result["errors"][0]["errors"][0].startswith("btc_amount")
+        assert result["errors"][1]["errors"] == ["Portfolio not found"]
+        # 1:40 rounds up to hour 2, so two distinct hours are priced
+        assert sorted(call.args[0] for call in fetch.call_args_list) == [
+            self.base_hour,
+            self.base_hour + 2 * 3600,
+        ]
+
+        response = await client.get(
+            "/transaction/",
+            params={"portfolio_id": portfolio_id},
+            headers=auth_headers,
+        )
+        transactions = response.json()
+        assert len(transactions) == 3
+        assert {Decimal(t["price_at_purchase"]) for t in transactions} == {
+            Decimal("100000"),
+            Decimal("100002"),
+        }
+
+    @pytest.mark.anyio
+    async def test_bulk_csv_import(
+        self, client: AsyncClient, auth_headers: dict, created_portfolio: dict, mocker
+    ):
+        mocker.patch(
+            "app.routers.transactions.fetch_btc_price_data_for_timestamp",
+            side_effect=self.fake_price_data,
+        )
+        lines = ["portfolio_id,btc_amount,timestamp"] + [
+            f"{created_portfolio['id']},0.5,{self.timestamp(hour)}" for hour in range(3)
+        ]
+
+        response = await client.post(
+            "/transaction/bulk",
+            content="\n".join(lines),
+            headers={**auth_headers, "Content-Type": "text/csv"},
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json() == {"inserted": 3, "errors": []}
+
+    @pytest.mark.anyio
+    async def test_bulk_import_of_many_rows_prices_each_hour_once(
+        self, client: AsyncClient, auth_headers: dict, created_portfolio: dict, mocker
+    ):
+        fetch = mocker.patch(
+            "app.routers.transactions.fetch_btc_price_data_for_timestamp",
+            side_effect=self.fake_price_data,
+        )
+        rows = [
+            {
+                "portfolio_id": created_portfolio["id"],
+                "btc_amount": "0.001",
+                "timestamp": self.timestamp(i % 500, i % 30),
+            }
+            for i in range(10000)
+        ]
+
+        response = await client.post(
+            "/transaction/bulk", json=rows, headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json() == {"inserted": 10000, "errors": []}
+        assert fetch.call_count == 500
+
+    @pytest.mark.slow
+    @pytest.mark.anyio
+    async def test_bulk_import_of_10k_rows_against_a_price_stand_in(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        created_portfolio: dict,
+        price_service: dict,
+        monkeypatch,
+        capsys,
+    ):
+        # As wide a pool as the import prices hours with, unlike the fixture's 4
+        concurrency = settings.BULK_PRICE_CONCURRENCY
+        monkeypatch.setattr(settings, "PRICE_SERVICE_MAX_CONNECTIONS", concurrency)
+        monkeypatch.setattr(
+            settings, "PRICE_SERVICE_MAX_KEEPALIVE_CONNECTIONS", concurrency
+        )
+        await price_service_client.close()
+        rows = [
+            {
+                "portfolio_id": created_portfolio["id"],
+                "btc_amount": "0.001",
+                "timestamp": self.timestamp(i % 1000, i % 30),
+            }
+            for i in range(10000)
+        ]
+
+        started = time.perf_counter()
+        response = await client.post(
+            "/transaction/bulk", json=rows, headers=auth_headers
+        )
+        elapsed = time.perf_counter() - started
+
+        with capsys.disabled():
+            print(
+                f"\n10k-row bulk import, 1000 hours priced over HTTP: {elapsed:.2f} s"
+            )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json() == {"inserted": 10000, "errors": []}
+        assert price_service["requests"] == 1000
+        assert elapsed < 5
+
+    @pytest.mark.anyio
+    async def test_bulk_import_rejects_unreadable_or_oversized_bodies(
+        self, client: AsyncClient, auth_headers: dict, monkeypatch
+    ):
+        response = await client.post(
+            "/transaction/bulk",
+            content="not json",
+            headers={**auth_headers, "Content-Type": "application/json"},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = await client.post(
+            "/transaction/bulk",
+            content="id,amount\n1,2",
+            headers={**auth_headers, "Content-Type": "text/csv"},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        monkeypatch.setattr(settings, "BULK_TRANSACTIONS_MAX_ROWS", 2)
+        response = await client.post(
+            "/transaction/bulk", json=[{}, {}, {}], headers=auth_headers
+        )
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
@@ -0,0 +1,85 @@
+import asyncio
+import csv
+import io
+import json
+from collections.abc import Awaitable, Callable
+from pydantic import ValidationError
+from app.schemas.transactions import BulkRowError, PriceData, TransactionCreate
+
+CSV_COLUMNS = ("portfolio_id", "btc_amount", "timestamp")
+
+
+def parse_bulk_body(body: bytes, content_type: str) -> list[dict]:
+    """
+    Parses an uploaded batch of transactions into one dict per row.
+
+    JSON bodies are a list of objects (or {"transactions": [...]}); CSV bodies have a
+    header with `portfolio_id,btc_amount,timestamp`.
+
+    Raises:
+        ValueError: If the body cannot be read as a batch of rows.
+    """
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type == "text/csv":
+        try:
+            reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+        except UnicodeDecodeError:
+            raise ValueError("CSV body must be UTF-8.")
+        if reader.fieldnames is None or not set(CSV_COLUMNS) <= set(reader.fieldnames):
+            raise ValueError(f"CSV header must contain {', '.join(CSV_COLUMNS)}.")
+        return list(reader)
+
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise ValueError("Body is not valid JSON.")
+    if isinstance(data, dict):
+        data = data.get("transactions")
+    if not isinstance(data, list):
+        raise ValueError("Body must be a list of transactions.")
+    return data
+
+
+def validate_rows(
+    rows: list,
+) -> tuple[list[tuple[int, TransactionCreate]], list[BulkRowError]]:
+    """
+    Validates every row against TransactionCreate.
+
+    Returns:
+        tuple: (row number, transaction) pairs for the valid rows and the errors of the
+        others. Row numbers are 1-based positions in the upload.
+    """
+    valid = []
+    errors = []
+    for number, row in enumerate(rows, start=1):
+        try:
+            valid.append((number, TransactionCreate.model_validate(row)))
+        except ValidationError as exc:
+            errors.append(
+                BulkRowError(
+                    row=number,
+                    errors=[
+                        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+                        for error in exc.errors()
+                    ],
+                )
+            )
+    return valid, errors
+
+
+async def price_hours(
+    hours: set[int],
+    fetch: Callable[[int], Awaitable[PriceData | None]],
+    concurrency: int,
+) -> dict[int, PriceData | None]:
+    """Prices every distinct hour concurrently, with at most `concurrency` lookups in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def price_hour(hour: int) -> PriceData | None:
+        async with semaphore:
+            return await fetch(hour)
+
+    ordered = sorted(hours)
+    prices = await asyncio.gather(*(price_hour(hour) for hour in ordered))
+    return dict(zip(ordered, prices))
@@ -1,56 +1,56 @@
-from decimal import Decimal
-import requests
-from core.settings import settings
+import asyncio
+import logging
+from decimal import Decimal, InvalidOperation
 
-API_KEY = settings.CRYPTOCOMPARE_API_KEY
+import httpx
+from utils.price_service_client import price_service_client
 
+logger = logging.getLogger(__name__)
 
-def get_current_price():
+
+async def fetch_current_price() -> tuple[Decimal, float] | None:
     """
-    Fetches the current price of Bitcoin (BTC) in US Dollars (USD) from the CryptoCompare API.
+    Fetches the current price of Bitcoin (BTC) in US Dollars (USD) from price_service.
 
-    Uses the 'min-api.cryptocompare.com' endpoint to request the latest price of BTC in USD.
-    Requires an API key set as an environment variable 'CRYPTOCOMPARE_API_KEY'.
+    Uses the `/prices/latest` endpoint, which serves the spot price price_service keeps
+    in memory, through the shared pooled client, so this service does not call
+    CryptoCompare itself.
 
     Returns:
-    - Decimal: The current price of one Bitcoin in US Dollars.
+    - tuple: The price of one Bitcoin in US Dollars and when price_service fetched it
+      (Unix seconds), or None on failure.
     """
-    endpoint = "https://min-api.cryptocompare.com/data/price"
-
-    params = {
-        "fsym": "BTC",  # From symbol (Bitcoin)
-        "tsyms": "USD",  # To symbol (US Dollar)
-        "api_key": API_KEY,
-    }
     try:
-        response = requests.get(endpoint, params=params)
-        response.raise_for_status()  # Raises an HTTPError for bad responses (4xx and 5xx)
+        response = await price_service_client.get("/prices/latest")
+        response.raise_for_status()  # Raises an HTTPStatusError for 4xx and 5xx
         data = response.json()
-        print(data)
-
-        if "USD" in data:
-            current_price = Decimal(data["USD"]).quantize(
-                Decimal("0.01")
-            )  # Round to 2 decimal places
-            return current_price
-        else:
-            print(f"Error: Unexpected response format: {data}")
-            return None
-
-    except requests.exceptions.RequestException as e:
-        # Handle any requests-related errors (network issues, invalid responses, etc.)
-        print(f"Error fetching data from CryptoCompare API: {e}")
+
+        price = Decimal(str(data["price"])).quantize(
+            Decimal("0.01")
+        )  # Round to 2 decimal places
+        return price, float(data["last_updated"])
+
+    except httpx.HTTPError as exc:
+        # Network issues, timeouts and error responses (503 before its first quote)
+        logger.error(f"Error fetching the latest price from price_service: {exc}")
         return None
 
-    except (ValueError, KeyError) as e:
-        # Handle JSON decoding errors or missing data in the response
-        print(f"Error processing API response: {e}")
+    except (ValueError, KeyError, TypeError, InvalidOperation) as exc:
+        # JSON decoding errors or unusable values in the response
+        logger.error(f"Error processing price_service response: {exc}")
         return None
 
 
-if __name__ == "__main__":
-    price = get_current_price()
-    if price is not None:
-        print(f"Current BTC Price in USD: {price}")
+async def main():
+    try:
+        result = await fetch_current_price()
+    finally:
+        await price_service_client.close()
+    if result is not None:
+        print(f"Current BTC Price in USD: {result[0]}")
     else:
         print("Failed to retrieve the current BTC price.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
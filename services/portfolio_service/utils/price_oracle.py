@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import NamedTuple
+
+from fastapi import HTTPException
+from core.settings import settings
+from utils.fetch_current_btc_price import fetch_current_price
+
+logger = logging.getLogger(__name__)
+
+
+class PriceQuote(NamedTuple):
+    price: Decimal
+    updated_at: datetime
+    stale: bool
+
+
+class PriceOracle:
+    """
+    The current BTC/USD price, kept in memory so request handlers never wait on
+    price_service (which serves it from its own spot price poller).
+
+    A background task refreshes the price every `refresh_seconds`. A read that finds the
+    price older than `ttl_seconds` gets it right away, flagged as stale, and starts a
+    refresh in the background; only a read with no price at all waits for one.
+    Concurrent reads share a single upstream call, and after a failed refresh no new
+    one is started from reads for `retry_seconds`.
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0, retry_seconds: float = 10.0):
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = retry_seconds
+        self._task: asyncio.Task | None = None
+        self._refresh_task: asyncio.Task | None = None
+        self.reset()
+
+    def reset(self):
+        """Forgets the cached price and the counters."""
+        self.price: Decimal | None = None
+        self.updated_at: float | None = None
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error_at: float | None = None
+
+    def set_price(self, price: Decimal, updated_at: float | None = None):
+        self.price = price
+        self.updated_at = time.time() if updated_at is None else updated_at
+
+    def is_stale(self, now: float | None = None) -> bool:
+        if self.updated_at is None:
+            return True
+        return (now or time.time()) - self.updated_at > self.ttl_seconds
+
+    def quote(self) -> PriceQuote | None:
+        """Returns the cached price without refreshing it, or None if there is none."""
+        if self.price is None:
+            return None
+        return PriceQuote(
+            price=self.price,
+            updated_at=datetime.fromtimestamp(self.updated_at, tz=timezone.utc),
+            stale=self.is_stale(),
+        )
+
+    def is_backing_off(self, now: float | None = None) -> bool:
+        """Whether the last refresh failed less than `retry_seconds` ago."""
+        if self.last_error_at is None or self.last_error_at < (self.updated_at or 0):
+            return False
+        return (now or time.time()) - self.last_error_at < self.retry_seconds
+
+    async def get_quote(self) -> PriceQuote | None:
+        """
+        Returns the cached price without waiting on the upstream, refreshing it in the
+        background if it is older than the TTL. Waits for a refresh only if there is no
+        price yet (and the last attempt did not just fail).
+        """
+        if self.is_stale() and not self.is_backing_off():
+            if self.price is None:
+                await self.refresh()
+            else:
+                self._start_refresh()
+        return self.quote()
+
+    async def refresh(self) -> bool:
+        """
+        Fetches a new price, joining the refresh already in flight if there is one.
+        Callers that are cancelled do not cancel the shared refresh.
+
+        Returns:
+            bool: Whether a new price was stored.
+        """
+        return await asyncio.shield(self._start_refresh())
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh())
+            self._refresh_task.add_done_callback(self._clear_refresh_task)
+        return self._refresh_task
+
+    def _clear_refresh_task(self, task: asyncio.Task):
+        if self._refresh_task is task:
+            self._refresh_task = None
+
+    async def _refresh(self) -> bool:
+        self.refreshes += 1
+        result = await fetch_current_price()
+        if result is not None:
+            price, updated_at = result
+            self.set_price(price, updated_at=updated_at)
+            # An old quote means price_service could not refresh it either
+            if not self.is_stale():
+                return True
+        self.failures += 1
+        self.last_error_at = time.time()
+        return False
+
+    async def run_refresher(self, interval: float):
+        """
+        Refreshes the price every `interval` seconds until cancelled. An unexpected error
+        is logged and counted as a failed refresh; it does not stop the loop.
+        """
+        while True:
+            try:
+                if not await self.refresh():
+                    logger.warning("Current BTC price refresh failed")
+            except Exception:
+                self.failures += 1
+                self.last_error_at = time.time()
+                logger.exception("Current BTC price refresh raised")
+            await asyncio.sleep(interval)
+
+    def start(self, refresh_seconds: float):
+        """Starts the background refresher."""
+        self._task = asyncio.create_task(self.run_refresher(refresh_seconds))
+
+    async def stop(self):
+        """Cancels the background refresher."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+price_oracle = PriceOracle(
+    ttl_seconds=settings.CURRENT_PRICE_TTL_SECONDS,
+    retry_seconds=settings.CURRENT_PRICE_RETRY_SECONDS,
+)
+
+
+async def get_price_context() -> dict:
+    """
+    Returns the current price as validation context for the `*ReadWithMetrics` schemas.
+    Raises 503 if no price has been fetched yet and price_service cannot be reached.
+    """
+    quote = await price_oracle.get_quote()
+    if quote is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Current BTC price is not available. Please try again later.",
+        )
+    return {
+        "current_price": quote.price,
+        "price_updated_at": quote.updated_at,
+        "price_stale": quote.stale,
+    }
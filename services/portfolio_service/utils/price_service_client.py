@@ -1,27 +1,227 @@
+import asyncio
 import httpx  # Import httpx
 import logging  # Import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
 from pydantic import ValidationError
 from app.schemas.transactions import PriceData
 from core.settings import settings
+from utils.timestamp import round_timestamp_to_nearest_hour
 
 # It's a good practice to set up a logger
 logger = logging.getLogger(__name__)
 
 
+class PriceServiceClient:
+    """
+    One pooled `httpx.AsyncClient` for every call to price_service, so requests reuse
+    kept-alive connections instead of paying a TCP/TLS handshake each time.
+
+    The app lifespan opens it with `start()` and closes it with `close()`; a call made
+    outside the lifespan (scripts, tests) opens it on first use.
+    """
+
+    def __init__(self):
+        self.client: httpx.AsyncClient | None = None
+        self.http2 = False
+        self.reset()
+
+    def reset(self):
+        """Zeroes the request and wait counters."""
+        self.requests = 0
+        self.in_flight = 0
+        self.pool_waits = 0
+        self.pool_wait_seconds = 0.0
+        self.max_pool_wait_seconds = 0.0
+
+    def start(self):
+        """Opens the client with the pool limits and timeouts from settings."""
+        if self.client is not None:
+            return
+        limits = httpx.Limits(
+            max_connections=settings.PRICE_SERVICE_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.PRICE_SERVICE_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.PRICE_SERVICE_KEEPALIVE_EXPIRY,
+        )
+        timeout = httpx.Timeout(
+            settings.PRICE_SERVICE_TIMEOUT,
+            connect=settings.PRICE_SERVICE_CONNECT_TIMEOUT,
+            pool=settings.PRICE_SERVICE_POOL_TIMEOUT,
+        )
+        self.http2 = settings.PRICE_SERVICE_HTTP2
+        try:
+            transport = httpx.AsyncHTTPTransport(limits=limits, http2=self.http2)
+        except ImportError:
+            # HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+            logger.warning("h2 is not installed; using HTTP/1.1 for price_service")
+            self.http2 = False
+            transport = httpx.AsyncHTTPTransport(limits=limits)
+        self.client = httpx.AsyncClient(
+            base_url=settings.PRICE_SERVICE_BASE_URL,
+            transport=transport,
+            timeout=timeout,
+        )
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def get(self, path: str, **kwargs) -> httpx.Response:
+        """
+        Sends a GET through the shared pool, recording how long the request waited for
+        a connection (the time until it starts connecting or sending on one).
+        """
+        self.start()
+        started = time.perf_counter()
+        waited = False
+
+        async def trace(event_name: str, info: dict):
+            nonlocal waited
+            if not waited and (
+                event_name.startswith("connection.")
+                or event_name.endswith("send_request_headers.started")
+            ):
+                waited = True
+                wait = time.perf_counter() - started
+                self.pool_waits += 1
+                self.pool_wait_seconds += wait
+                self.max_pool_wait_seconds = max(self.max_pool_wait_seconds, wait)
+
+        self.requests += 1
+        self.in_flight += 1
+        try:
+            return await self.client.get(path, extensions={"trace": trace}, **kwargs)
+        finally:
+            self.in_flight -= 1
+
+    def pool_stats(self) -> dict:
+        """Returns connection counts from the pool and the request/wait counters."""
+        connections = []
+        if self.client is not None:
+            # httpx does not expose its httpcore pool publicly
+            pool = getattr(self.client._transport, "_pool", None)
+            connections = pool.connections if pool is not None else []
+        open_connections = [c for c in connections if not c.is_closed()]
+        idle = sum(1 for c in open_connections if c.is_idle())
+        return {
+            "open": self.client is not None,
+            "http2": self.http2,
+            "max_connections": settings.PRICE_SERVICE_MAX_CONNECTIONS,
+            "connections": len(open_connections),
+            "in_use": len(open_connections) - idle,
+            "idle": idle,
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "avg_pool_wait_ms": (
+                self.pool_wait_seconds / self.pool_waits * 1000
+                if self.pool_waits
+                else 0.0
+            ),
+            "max_pool_wait_ms": self.max_pool_wait_seconds * 1000,
+        }
+
+
+price_service_client = PriceServiceClient()
+
+
+class HistoricalPriceCache:
+    """
+    Bounded LRU of price_service answers keyed by the rounded hour.
+
+    Closed hours never change, so they are kept until evicted. An hour that is still
+    open, or that price_service answered with a different (nearest) hour because it is
+    missing, is never stored: both can change later. Concurrent lookups of the same
+    hour share one upstream call.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, PriceData] = OrderedDict()
+        self._in_flight: dict[int, asyncio.Task] = {}
+        self.reset()
+
+    def reset(self):
+        """Empties the cache and zeroes the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.evictions = 0
+
+    async def get(
+        self, hour: int, fetch: Callable[[], Awaitable[PriceData | None]]
+    ) -> PriceData | None:
+        """
+        Returns the price for `hour`, calling `fetch` on a miss unless a call for the
+        same hour is already in flight.
+        """
+        price = self._entries.get(hour)
+        if price is not None:
+            self._entries.move_to_end(hour)
+            self.hits += 1
+            return price
+
+        task = self._in_flight.get(hour)
+        if task is None:
+            self.misses += 1
+            task = asyncio.create_task(self._fetch(hour, fetch))
+            self._in_flight[hour] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(hour, None))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    async def _fetch(
+        self, hour: int, fetch: Callable[[], Awaitable[PriceData | None]]
+    ) -> PriceData | None:
+        price = await fetch()
+        closed = hour + 3600 <= time.time()
+        if price is not None and closed and price.unix_timestamp == hour:
+            self._entries[hour] = price
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return price
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.shared
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+historical_price_cache = HistoricalPriceCache(settings.PRICE_CACHE_MAX_ENTRIES)
+
+
 async def fetch_btc_price_data_for_timestamp(timestamp: int) -> PriceData | None:
     """
     Fetches the historical Bitcoin price in USD for a given timestamp from the price_service API.
+    If the rounded hour is missing, price_service answers with the closest stored hour.
+    Closed hours are answered from `historical_price_cache` when possible.
     Returns PriceData on success, or None on failure.
     """
-    url = f"{settings.PRICE_SERVICE_BASE_URL}/prices/{timestamp}"
+    hour = round_timestamp_to_nearest_hour(timestamp)
+    return await historical_price_cache.get(hour, lambda: _request_price_data(hour))
 
+
+async def _request_price_data(timestamp: int) -> PriceData | None:
+    """Requests the price for `timestamp` from price_service, logging and returning None on failure."""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, timeout=5.0)
+        response = await price_service_client.get(
+            f"/prices/{timestamp}", params={"mode": "nearest"}
+        )
 
-            response.raise_for_status()
+        response.raise_for_status()
 
-            return PriceData(**response.json())
+        return PriceData(**response.json())
 
     except httpx.RequestError as exc:
         logger.error(
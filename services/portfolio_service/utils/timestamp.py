@@ -12,3 +12,14 @@ def get_last_valid_timestamp() -> datetime:
     return (datetime.now(timezone.utc) - timedelta(hours=1)).replace(
         minute=29, second=59, microsecond=0
     )
+
+
+def round_timestamp_to_nearest_hour(unix_timestamp: int) -> int:
+    """
+    Rounds a Unix timestamp to the nearest full hour the way price_service does:
+    29:59 and below round down, 30:00 and above round up.
+    """
+    remainder = unix_timestamp % 3600
+    if remainder < 1800:
+        return unix_timestamp - remainder
+    return unix_timestamp + (3600 - remainder)
@@ -0,0 +1,49 @@
+"""key hourly_bitcoin_prices by unix_timestamp
+
+Revision ID: b7e2c4f19a83
+Revises: 5d8a1e3f7c62
+Create Date: 2026-10-18 16:05:27.514093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c4f19a83'
+down_revision: Union[str, None] = '5d8a1e3f7c62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The surrogate id and its index go; the unique timestamp index becomes the primary key
+    op.drop_index('ix_hourly_bitcoin_prices_id', table_name='hourly_bitcoin_prices')
+    op.drop_constraint('hourly_bitcoin_prices_pkey', 'hourly_bitcoin_prices', type_='primary')
+    op.drop_column('hourly_bitcoin_prices', 'id')
+    op.drop_index('ix_hourly_bitcoin_prices_unix_timestamp', table_name='hourly_bitcoin_prices')
+    op.create_primary_key('hourly_bitcoin_prices_pkey', 'hourly_bitcoin_prices', ['unix_timestamp'])
+
+    # Rewrite the table in time order (also drops the dead space left by the id column),
+    # then index it with BRIN, which relies on that order
+    op.execute('CLUSTER hourly_bitcoin_prices USING hourly_bitcoin_prices_pkey')
+    op.create_index(
+        'ix_hourly_bitcoin_prices_unix_timestamp_brin',
+        'hourly_bitcoin_prices',
+        ['unix_timestamp'],
+        unique=False,
+        postgresql_using='brin',
+    )
+    op.execute('ANALYZE hourly_bitcoin_prices')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_hourly_bitcoin_prices_unix_timestamp_brin', table_name='hourly_bitcoin_prices')
+    op.drop_constraint('hourly_bitcoin_prices_pkey', 'hourly_bitcoin_prices', type_='primary')
+    op.create_index('ix_hourly_bitcoin_prices_unix_timestamp', 'hourly_bitcoin_prices', ['unix_timestamp'], unique=True)
+    # SERIAL, like the initial migration; existing rows get ids in physical (time) order
+    op.execute('ALTER TABLE hourly_bitcoin_prices ADD COLUMN id SERIAL NOT NULL')
+    op.create_primary_key('hourly_bitcoin_prices_pkey', 'hourly_bitcoin_prices', ['id'])
+    op.create_index('ix_hourly_bitcoin_prices_id', 'hourly_bitcoin_prices', ['id'], unique=False)
@@ -0,0 +1,43 @@
+"""add minute_bitcoin_prices
+
+Revision ID: e41d9b7a2c05
+Revises: b7e2c4f19a83
+Create Date: 2026-10-18 17:21:48.902716
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e41d9b7a2c05"
+down_revision: Union[str, None] = "b7e2c4f19a83"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "minute_bitcoin_prices",
+        sa.Column(
+            "unix_timestamp", sa.BigInteger(), autoincrement=False, nullable=False
+        ),
+        sa.Column("high", sa.Float(), nullable=False),
+        sa.Column("low", sa.Float(), nullable=False),
+        sa.Column("open", sa.Float(), nullable=False),
+        sa.Column("close", sa.Float(), nullable=False),
+        sa.Column("volumefrom", sa.Float(), nullable=False),
+        sa.Column("volumeto", sa.Float(), nullable=False),
+    )
+    # The primary key is the only index; carrying the price columns in it makes
+    # minute lookups index-only scans
+    op.execute(
+        "ALTER TABLE minute_bitcoin_prices ADD CONSTRAINT minute_bitcoin_prices_pkey "
+        "PRIMARY KEY (unix_timestamp) INCLUDE (high, low, open, close, volumefrom, volumeto)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("minute_bitcoin_prices")
@@ -0,0 +1,144 @@
+import asyncio
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.data_version import get_data_version
+from app.models import HourlyBitcoinPrice
+
+METRICS = ("returns", "volatility", "vwap", "volume", "max_drawdown")
+HOURS_PER_YEAR = 24 * 365
+
+
+def _prefix_sum(values: np.ndarray) -> np.ndarray:
+    """Returns P with P[0] = 0 and P[k] = values[0] + ... + values[k - 1]."""
+    prefix = np.empty(values.size + 1, dtype=np.float64)
+    prefix[0] = 0.0
+    np.cumsum(values, out=prefix[1:])
+    return prefix
+
+
+class PriceSeriesStats:
+    """
+    Window statistics over the stored hourly closes and volumes.
+
+    The constructor builds prefix sums of volume, quote volume, log returns and squared
+    log returns once (O(n)); every window sum afterwards is the difference of two
+    prefix entries (O(1)). Only max drawdown needs a pass over the window.
+    Returns are taken between consecutive stored hours, so gaps are bridged.
+    """
+
+    def __init__(
+        self,
+        timestamps: np.ndarray,
+        close: np.ndarray,
+        volumefrom: np.ndarray,
+        volumeto: np.ndarray,
+    ):
+        self.timestamps = timestamps
+        self.close = close
+        self.volume = _prefix_sum(volumefrom)
+        self.quote_volume = _prefix_sum(volumeto)
+        # log_returns[k] is the return from row k to row k + 1
+        log_returns = np.diff(np.log(close)) if close.size else np.empty(0)
+        self.log_returns = _prefix_sum(log_returns)
+        self.squared_log_returns = _prefix_sum(log_returns**2)
+
+    @classmethod
+    def from_rows(cls, rows) -> "PriceSeriesStats":
+        """Builds the statistics from (unix_timestamp, close, volumefrom, volumeto) rows sorted ASC."""
+        data = np.array(rows, dtype=np.float64).reshape(len(rows), 4)
+        return cls(data[:, 0].astype(np.int64), data[:, 1], data[:, 2], data[:, 3])
+
+    def window(self, from_ts: int, to_ts: int) -> tuple[int, int]:
+        """Returns the [start, end) row range of the stored hours between from_ts and to_ts (inclusive)."""
+        start = int(np.searchsorted(self.timestamps, from_ts, side="left"))
+        end = int(np.searchsorted(self.timestamps, to_ts, side="right"))
+        return start, max(start, end)
+
+    def compute(self, start: int, end: int, metrics=METRICS) -> dict:
+        """
+        Computes the requested metrics for rows [start, end); the window must not be empty.
+
+        Returns:
+            dict: simple_return and log_return (returns); volatility (std. dev. of hourly log
+            returns) and annualized_volatility; vwap (quote volume / volume); volume;
+            max_drawdown (most negative close / running max close - 1). Metrics that need
+            more rows than the window has are None.
+        """
+        result = {}
+        returns = end - start - 1
+        if "returns" in metrics:
+            log_return = self.log_returns[end - 1] - self.log_returns[start]
+            result["log_return"] = float(log_return)
+            result["simple_return"] = float(np.expm1(log_return))
+        if "volatility" in metrics:
+            result["volatility"] = result["annualized_volatility"] = None
+            if returns >= 2:
+                total = self.log_returns[end - 1] - self.log_returns[start]
+                squares = (
+                    self.squared_log_returns[end - 1] - self.squared_log_returns[start]
+                )
+                variance = max((squares - total**2 / returns) / (returns - 1), 0.0)
+                result["volatility"] = float(np.sqrt(variance))
+                result["annualized_volatility"] = result["volatility"] * float(
+                    np.sqrt(HOURS_PER_YEAR)
+                )
+        if "volume" in metrics or "vwap" in metrics:
+            volume = self.volume[end] - self.volume[start]
+            if "volume" in metrics:
+                result["volume"] = float(volume)
+            if "vwap" in metrics:
+                quote_volume = self.quote_volume[end] - self.quote_volume[start]
+                result["vwap"] = float(quote_volume / volume) if volume > 0 else None
+        if "max_drawdown" in metrics:
+            closes = self.close[start:end]
+            drawdowns = closes / np.maximum.accumulate(closes) - 1
+            result["max_drawdown"] = float(drawdowns.min())
+        return result
+
+
+class PriceStatsCache:
+    """Keeps one PriceSeriesStats and rebuilds it when the stored hours change."""
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self.reset()
+
+    def reset(self):
+        self.key = None
+        self.stats: PriceSeriesStats | None = None
+
+    async def get(self, session: AsyncSession) -> PriceSeriesStats:
+        # The data version changes with every updater run; the bounds also catch
+        # rows written without bumping it
+        bounds = (
+            await session.execute(
+                select(
+                    func.min(HourlyBitcoinPrice.unix_timestamp),
+                    func.max(HourlyBitcoinPrice.unix_timestamp),
+                )
+            )
+        ).one()
+        key = (await get_data_version(session), *bounds)
+        if key == self.key:
+            return self.stats
+
+        async with self._lock:
+            if key != self.key:
+                result = await session.execute(
+                    select(
+                        HourlyBitcoinPrice.unix_timestamp,
+                        HourlyBitcoinPrice.close,
+                        HourlyBitcoinPrice.volumefrom,
+                        HourlyBitcoinPrice.volumeto,
+                    ).order_by(HourlyBitcoinPrice.unix_timestamp.asc())
+                )
+                self.stats = PriceSeriesStats.from_rows(result.all())
+                self.key = key
+            return self.stats
+
+
+price_stats_cache = PriceStatsCache()
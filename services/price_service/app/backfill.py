@@ -0,0 +1,235 @@
+import asyncio
+import time
+from typing import Callable
+
+import aiohttp
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+from app.coverage import find_gaps
+from app.cryptocompare import (
+    MAX_HISTOHOUR_LIMIT,
+    CryptoCompareError,
+    fetch_histohour,
+)
+from app.ingest import insert_hourly_prices, record_new_hours
+from app.models import FIRST_VALID_TIMESTAMP, BackfillWindow
+from app.utils.timestamp import round_timestamp_down_to_hour
+
+SECONDS_IN_HOUR = 3600
+# One histohour call returns limit + 1 hours
+DEFAULT_WINDOW_HOURS = MAX_HISTOHOUR_LIMIT
+
+
+class RateLimiter:
+    """Spaces out calls so that at most `rate` of them start per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def split_into_windows(
+    from_ts: int, to_ts: int, window_hours: int = DEFAULT_WINDOW_HOURS
+) -> list[tuple[int, int]]:
+    """
+    Splits [from_ts, to_ts] into hour-aligned windows of at most `window_hours` hours.
+
+    Windows sit on a fixed grid (multiples of window_hours since the epoch) so that runs
+    over overlapping ranges produce the same interior windows and can share checkpoints.
+
+    Returns:
+        list[tuple[int, int]]: (first hour, last hour) pairs, both inclusive, sorted ASC.
+    """
+    if not 1 <= window_hours <= MAX_HISTOHOUR_LIMIT + 1:
+        raise ValueError(
+            f"window_hours must be between 1 and {MAX_HISTOHOUR_LIMIT + 1}"
+        )
+    first_hour = max(
+        round_timestamp_down_to_hour(from_ts + SECONDS_IN_HOUR - 1),
+        FIRST_VALID_TIMESTAMP,
+    )
+    last_hour = round_timestamp_down_to_hour(to_ts)
+    span = window_hours * SECONDS_IN_HOUR
+
+    windows = []
+    for grid_start in range(first_hour - first_hour % span, last_hour + 1, span):
+        start = max(grid_start, first_hour)
+        end = min(grid_start + span - SECONDS_IN_HOUR, last_hour)
+        windows.append((start, end))
+    return windows
+
+
+async def get_completed_windows(session) -> set[tuple[int, int]]:
+    result = await session.execute(
+        select(BackfillWindow.window_start, BackfillWindow.window_end)
+    )
+    return {tuple(row) for row in result.all()}
+
+
+async def run_backfill(
+    session_factory: sessionmaker,
+    from_ts: int,
+    to_ts: int,
+    concurrency: int = 4,
+    requests_per_second: float = 5.0,
+    window_hours: int = DEFAULT_WINDOW_HOURS,
+    base_url: str | None = None,
+    on_window_done: Callable[[tuple[int, int], int], None] | None = None,
+) -> dict:
+    """
+    Fetches every hour in [from_ts, to_ts] from CryptoCompare, several windows at a time.
+
+    Each window is written in its own transaction as soon as it arrives, together with a
+    BackfillWindow checkpoint; windows that are already checkpointed are not fetched again,
+    so an interrupted run picks up where it stopped. Writes are serialized because the
+    rollup candles of neighbouring windows can overlap. The still-open current hour is
+    never fetched. Hours older than the stored ones are written out of time order; see
+    HourlyBitcoinPrice on re-clustering the table after a large backfill.
+
+    Args:
+        session_factory (sessionmaker): Creates the sessions the windows are written with.
+        from_ts (int): First Unix timestamp of the range.
+        to_ts (int): Last Unix timestamp of the range (inclusive).
+        concurrency (int): Maximum number of requests in flight.
+        requests_per_second (float): Maximum request start rate; 0 disables the limit.
+        window_hours (int): Hours per request (at most 2001).
+        base_url (str | None): Overrides settings.cryptocompare_base_url.
+        on_window_done: Called with the window and the number of inserted rows.
+
+    Returns:
+        dict: windows, skipped, completed, failed (list of windows), inserted and candles.
+    """
+    last_closed_hour = round_timestamp_down_to_hour(int(time.time())) - SECONDS_IN_HOUR
+    windows = split_into_windows(from_ts, min(to_ts, last_closed_hour), window_hours)
+
+    async with session_factory() as session:
+        completed = await get_completed_windows(session)
+    pending = [window for window in windows if window not in completed]
+
+    report = await fetch_and_store_windows(
+        session_factory,
+        pending,
+        concurrency=concurrency,
+        requests_per_second=requests_per_second,
+        base_url=base_url,
+        on_window_done=on_window_done,
+    )
+    report["windows"] = len(windows)
+    report["skipped"] = len(windows) - len(pending)
+    return report
+
+
+async def fetch_and_store_windows(
+    session_factory: sessionmaker,
+    windows: list[tuple[int, int]],
+    concurrency: int = 4,
+    requests_per_second: float = 5.0,
+    base_url: str | None = None,
+    on_window_done: Callable[[tuple[int, int], int], None] | None = None,
+) -> dict:
+    """
+    Fetches the given windows concurrently and stores each one as soon as it arrives,
+    recording (or refreshing) its BackfillWindow checkpoint. Existing checkpoints are
+    not consulted; run_backfill filters them out, gap repair deliberately refetches.
+
+    Returns:
+        dict: completed, failed (list of windows), inserted and candles.
+    """
+    report = {"completed": 0, "failed": [], "inserted": 0, "candles": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+    rate_limiter = RateLimiter(requests_per_second)
+    write_lock = asyncio.Lock()
+
+    async def backfill_window(http_session: aiohttp.ClientSession, window):
+        start, end = window
+        try:
+            async with semaphore:
+                await rate_limiter.wait()
+                records = await fetch_histohour(
+                    http_session,
+                    to_ts=end,
+                    limit=(end - start) // SECONDS_IN_HOUR,
+                    base_url=base_url,
+                )
+        except (CryptoCompareError, aiohttp.ClientError, asyncio.TimeoutError):
+            report["failed"].append(window)
+            return
+
+        records = [r for r in records if start <= r["time"] <= end]
+        async with write_lock, session_factory() as session:
+            inserted = await insert_hourly_prices(session, records)
+            candles = await record_new_hours(session, inserted)
+            await session.merge(
+                BackfillWindow(
+                    window_start=start,
+                    window_end=end,
+                    rows_inserted=len(inserted),
+                    completed_at=int(time.time()),
+                )
+            )
+            await session.commit()
+
+        report["completed"] += 1
+        report["inserted"] += len(inserted)
+        report["candles"] += candles
+        if on_window_done:
+            on_window_done(window, len(inserted))
+
+    async with aiohttp.ClientSession() as http_session:
+        async with asyncio.TaskGroup() as tasks:
+            for window in windows:
+                tasks.create_task(backfill_window(http_session, window))
+
+    report["failed"].sort()
+    return report
+
+
+async def repair_gaps(
+    session_factory: sessionmaker,
+    concurrency: int = 4,
+    requests_per_second: float = 5.0,
+    window_hours: int = DEFAULT_WINDOW_HOURS,
+    base_url: str | None = None,
+    on_window_done: Callable[[tuple[int, int], int], None] | None = None,
+) -> dict:
+    """
+    Refetches exactly the missing hours found by find_gaps, ignoring checkpoints.
+
+    Repaired hours are stored out of time order; see HourlyBitcoinPrice on re-clustering
+    the table after a large repair.
+
+    Returns:
+        dict: gaps, missing_hours, windows, completed, failed, inserted and candles.
+    """
+    async with session_factory() as session:
+        gaps = await find_gaps(session)
+
+    windows = [
+        window
+        for gap_start, gap_end in gaps
+        for window in split_into_windows(gap_start, gap_end, window_hours)
+    ]
+    report = await fetch_and_store_windows(
+        session_factory,
+        windows,
+        concurrency=concurrency,
+        requests_per_second=requests_per_second,
+        base_url=base_url,
+        on_window_done=on_window_done,
+    )
+    report["gaps"] = len(gaps)
+    report["missing_hours"] = sum(
+        (end - start) // SECONDS_IN_HOUR + 1 for start, end in gaps
+    )
+    report["windows"] = len(windows)
+    return report
@@ -0,0 +1,87 @@
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models import HourlyBitcoinPrice
+
+SECONDS_IN_HOUR = 3600
+
+
+async def find_gaps(session: AsyncSession) -> list[tuple[int, int]]:
+    """
+    Finds every run of missing hours between the first and the last stored hour.
+
+    A single pass over the unix_timestamp index: LEAD() pairs each hour with the next
+    stored one, and only the pairs more than an hour apart are returned, so the result
+    stays small no matter how long the history is.
+
+    Returns:
+        list[tuple[int, int]]: (first missing hour, last missing hour) pairs, both inclusive, sorted ASC.
+    """
+    ordered = select(
+        HourlyBitcoinPrice.unix_timestamp.label("ts"),
+        func.lead(HourlyBitcoinPrice.unix_timestamp)
+        .over(order_by=HourlyBitcoinPrice.unix_timestamp)
+        .label("next_ts"),
+    ).subquery()
+    result = await session.execute(
+        select(ordered.c.ts, ordered.c.next_ts)
+        .where(ordered.c.next_ts - ordered.c.ts > SECONDS_IN_HOUR)
+        .order_by(ordered.c.ts)
+    )
+    return [
+        (ts + SECONDS_IN_HOUR, next_ts - SECONDS_IN_HOUR)
+        for ts, next_ts in result.all()
+    ]
+
+
+def _span(start: int, end: int) -> dict:
+    return {"start": start, "end": end, "hours": (end - start) // SECONDS_IN_HOUR + 1}
+
+
+async def get_coverage(session: AsyncSession) -> dict:
+    """
+    Summarizes which hours of the history are stored.
+
+    Returns:
+        dict: first/last stored timestamp, expected, stored and missing hour counts, and
+        the contiguous `ranges` and missing `gaps` as {start, end, hours} dicts.
+    """
+    first_ts, last_ts, stored = (
+        await session.execute(
+            select(
+                func.min(HourlyBitcoinPrice.unix_timestamp),
+                func.max(HourlyBitcoinPrice.unix_timestamp),
+                func.count(HourlyBitcoinPrice.unix_timestamp),
+            )
+        )
+    ).one()
+    if first_ts is None:
+        return {
+            "first_timestamp": None,
+            "last_timestamp": None,
+            "expected_hours": 0,
+            "stored_hours": 0,
+            "missing_hours": 0,
+            "ranges": [],
+            "gaps": [],
+        }
+
+    gaps = await find_gaps(session)
+    ranges = []
+    range_start = first_ts
+    for gap_start, gap_end in gaps:
+        ranges.append(_span(range_start, gap_start - SECONDS_IN_HOUR))
+        range_start = gap_end + SECONDS_IN_HOUR
+    ranges.append(_span(range_start, last_ts))
+
+    expected = (last_ts - first_ts) // SECONDS_IN_HOUR + 1
+    return {
+        "first_timestamp": first_ts,
+        "last_timestamp": last_ts,
+        "expected_hours": expected,
+        "stored_hours": stored,
+        "missing_hours": expected - stored,
+        "ranges": ranges,
+        "gaps": [_span(start, end) for start, end in gaps],
+    }
@@ -0,0 +1,122 @@
+import aiohttp
+
+from core.settings import settings
+
+HISTOHOUR_PATH = "/data/v2/histohour"
+HISTOMINUTE_PATH = "/data/v2/histominute"
+PRICEMULTIFULL_PATH = "/data/pricemultifull"
+# CryptoCompare returns at most limit + 1 = 2001 records per histohour call
+MAX_HISTOHOUR_LIMIT = 2000
+# Same cap per histominute call
+MAX_HISTOMINUTE_LIMIT = 2000
+
+
+class CryptoCompareError(Exception):
+    """Raised when the CryptoCompare API returns an error or an unexpected payload."""
+
+
+async def fetch_histohour(
+    http_session: aiohttp.ClientSession,
+    to_ts: int,
+    limit: int,
+    base_url: str | None = None,
+) -> list[dict]:
+    """
+    Fetches hourly BTC/USD candles ending at `to_ts` (inclusive).
+
+    Args:
+        http_session (aiohttp.ClientSession): The session to send the request with.
+        to_ts (int): The Unix timestamp of the last hour to return.
+        limit (int): The number of hours before `to_ts` to return (at most 2000).
+        base_url (str | None): Overrides settings.cryptocompare_base_url.
+
+    Returns:
+        list[dict]: limit + 1 records sorted by time ASC, each with time/high/low/open/close/volumefrom/volumeto.
+
+    Raises:
+        CryptoCompareError: If the request fails or the payload is not a histohour response.
+    """
+    return await _fetch_history(http_session, HISTOHOUR_PATH, to_ts, limit, base_url)
+
+
+async def fetch_histominute(
+    http_session: aiohttp.ClientSession,
+    to_ts: int,
+    limit: int,
+    base_url: str | None = None,
+) -> list[dict]:
+    """
+    Fetches minute BTC/USD candles ending at `to_ts` (inclusive); same shape as fetch_histohour.
+    CryptoCompare only serves the last 7 days of minutes on the free tier.
+    """
+    return await _fetch_history(http_session, HISTOMINUTE_PATH, to_ts, limit, base_url)
+
+
+async def _fetch_history(
+    http_session: aiohttp.ClientSession,
+    path: str,
+    to_ts: int,
+    limit: int,
+    base_url: str | None,
+) -> list[dict]:
+    url = (base_url or settings.cryptocompare_base_url) + path
+    params = {"fsym": "BTC", "tsym": "USD", "limit": limit, "toTs": to_ts}
+    if settings.cryptocompare_api_key:
+        params["api_key"] = settings.cryptocompare_api_key
+
+    async with http_session.get(url, params=params) as response:
+        if response.status != 200:
+            raise CryptoCompareError(
+                f"API request failed with status {response.status}"
+            )
+        json_response = await response.json()
+
+    if json_response.get("Response") == "Error":
+        raise CryptoCompareError(f"API error: {json_response.get('Message')}")
+    try:
+        return json_response["Data"]["Data"]
+    except (KeyError, TypeError):
+        raise CryptoCompareError(
+            f"Unexpected {path.rsplit('/', 1)[-1]} response format"
+        )
+
+
+async def fetch_spot_price(
+    http_session: aiohttp.ClientSession, base_url: str | None = None
+) -> dict:
+    """
+    Fetches the current BTC/USD spot price and its 24h change.
+
+    Returns:
+        dict: price, change_24h, change_pct_24h, high_24h, low_24h and source_timestamp
+        (CryptoCompare's LASTUPDATE, a Unix timestamp).
+
+    Raises:
+        CryptoCompareError: If the request fails or the payload is not a pricemultifull response.
+    """
+    url = (base_url or settings.cryptocompare_base_url) + PRICEMULTIFULL_PATH
+    params = {"fsyms": "BTC", "tsyms": "USD"}
+    if settings.cryptocompare_api_key:
+        params["api_key"] = settings.cryptocompare_api_key
+
+    async with http_session.get(url, params=params) as response:
+        if response.status != 200:
+            raise CryptoCompareError(
+                f"API request failed with status {response.status}"
+            )
+        json_response = await response.json()
+
+    if json_response.get("Response") == "Error":
+        raise CryptoCompareError(f"API error: {json_response.get('Message')}")
+    try:
+        raw = json_response["RAW"]["BTC"]["USD"]
+        return {
+            "price": float(raw["PRICE"]),
+            "change_24h": float(raw["CHANGE24HOUR"]),
+            "change_pct_24h": float(raw["CHANGEPCT24HOUR"]),
+            "high_24h": float(raw["HIGH24HOUR"]),
+            "low_24h": float(raw["LOW24HOUR"]),
+            "source_timestamp": int(raw["LASTUPDATE"]),
+        }
+    except (KeyError, TypeError, ValueError):
+        raise CryptoCompareError("Unexpected pricemultifull response format")
@@ -0,0 +1,132 @@
+import time
+from typing import Callable, Iterator
+
+import pandas as pd
+from sqlalchemy.orm import sessionmaker
+
+from app.ingest import bulk_load_price_rows, record_new_hours
+from app.models import FIRST_VALID_TIMESTAMP
+from app.utils.export import EXPORT_COLUMNS
+
+IMPORT_CHUNK_SIZE = 50_000
+CSV_DTYPES = {name: "float64" for name in EXPORT_COLUMNS} | {"unix_timestamp": "int64"}
+
+
+class CsvImportError(ValueError):
+    """Raised when the CSV file does not match the hourly_bitcoin_prices schema."""
+
+
+def read_csv_chunks(
+    path, chunk_size: int = IMPORT_CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """
+    Streams the CSV file in DataFrames of at most `chunk_size` rows, keeping only the
+    table columns (an exported `id` column, for example, is ignored).
+
+    Raises:
+        CsvImportError: If a column is missing or a value cannot be parsed.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    missing = [name for name in EXPORT_COLUMNS if name not in header]
+    if missing:
+        raise CsvImportError(f"Missing columns: {', '.join(missing)}")
+
+    reader = pd.read_csv(
+        path, usecols=list(EXPORT_COLUMNS), dtype=CSV_DTYPES, chunksize=chunk_size
+    )
+    try:
+        for chunk in reader:
+            yield chunk[list(EXPORT_COLUMNS)]
+    except ValueError as e:
+        raise CsvImportError(f"Invalid value: {e}") from e
+
+
+def validate_chunk(chunk: pd.DataFrame, first_row: int):
+    """
+    Checks a chunk against the NOT NULL and valid_unix_timestamp constraints.
+
+    Args:
+        chunk (pd.DataFrame): Rows returned by read_csv_chunks.
+        first_row (int): The 1-based data row number of the chunk's first row, for messages.
+
+    Raises:
+        CsvImportError: On the first offending row.
+    """
+    nulls = chunk.isna().any(axis=1).to_numpy()
+    if nulls.any():
+        raise CsvImportError(f"Row {first_row + nulls.argmax()}: empty value")
+
+    too_early = (chunk["unix_timestamp"] < FIRST_VALID_TIMESTAMP).to_numpy()
+    if too_early.any():
+        row = too_early.argmax()
+        raise CsvImportError(
+            f"Row {first_row + row}: unix_timestamp "
+            f"{chunk['unix_timestamp'].iloc[row]} is before {FIRST_VALID_TIMESTAMP}"
+        )
+
+
+def validate_csv(path, chunk_size: int = IMPORT_CHUNK_SIZE) -> int:
+    """
+    Validates the whole file without touching the database.
+
+    Returns:
+        int: The number of data rows.
+    """
+    rows = 0
+    for chunk in read_csv_chunks(path, chunk_size):
+        validate_chunk(chunk, rows + 1)
+        rows += len(chunk)
+    return rows
+
+
+async def import_csv(
+    session_factory: sessionmaker,
+    path,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    on_chunk_done: Callable[[dict], None] | None = None,
+) -> dict:
+    """
+    Imports a CSV file into hourly_bitcoin_prices, one transaction per chunk.
+
+    The file is validated completely before anything is written. On Postgres every chunk
+    is COPYed into a temp table and merged with `INSERT ... ON CONFLICT (unix_timestamp)
+    DO NOTHING` (see bulk_load_price_rows); other databases use multi-row inserts. Hours that are already stored are
+    skipped, and rollups and the data version are updated per chunk.
+
+    Args:
+        session_factory (sessionmaker): Creates the session the chunks are written with.
+        path: The CSV file; needs the unix_timestamp/high/low/open/close/volumefrom/volumeto columns.
+        chunk_size (int): Rows per chunk and transaction.
+        on_chunk_done: Called with the running report after every chunk.
+
+    Returns:
+        dict: rows, inserted, skipped, seconds and rows_per_second.
+
+    Raises:
+        CsvImportError: If the file fails validation.
+    """
+    validate_csv(path, chunk_size)
+
+    started = time.perf_counter()
+    report = {
+        "rows": 0,
+        "inserted": 0,
+        "skipped": 0,
+        "seconds": 0.0,
+        "rows_per_second": 0.0,
+    }
+    async with session_factory() as session:
+        for chunk in read_csv_chunks(path, chunk_size):
+            rows = list(chunk.itertuples(index=False, name=None))
+            inserted = await bulk_load_price_rows(session, rows)
+            await record_new_hours(session, inserted)
+            await session.commit()
+
+            report["rows"] += len(chunk)
+            report["inserted"] += len(inserted)
+            report["skipped"] = report["rows"] - report["inserted"]
+            report["seconds"] = time.perf_counter() - started
+            report["rows_per_second"] = report["rows"] / max(report["seconds"], 1e-9)
+            if on_chunk_done:
+                on_chunk_done(report)
+    return report
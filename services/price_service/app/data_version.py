@@ -0,0 +1,29 @@
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models import DataVersion
+
+PRICES_VERSION = "hourly_bitcoin_prices"
+
+
+async def get_data_version(session: AsyncSession, name: str = PRICES_VERSION) -> int:
+    """Returns the current version of a table's data (0 if it was never bumped)."""
+    result = await session.execute(
+        select(DataVersion.version).where(DataVersion.name == name)
+    )
+    return result.scalar_one_or_none() or 0
+
+
+async def bump_data_version(session: AsyncSession, name: str = PRICES_VERSION) -> None:
+    """
+    Increments a table's data version in the current transaction; the caller commits.
+    Call this whenever rows are inserted so ETags derived from the version change.
+    """
+    result = await session.execute(
+        update(DataVersion)
+        .where(DataVersion.name == name)
+        .values(version=DataVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        session.add(DataVersion(name=name, version=1))
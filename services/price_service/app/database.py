@@ -19,3 +19,9 @@ Base = declarative_base()
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocal() as session:
         yield session
+
+
+# Dependency to get the session factory, for work that outlives the request
+# (e.g. streaming responses, which run after get_db has closed its session)
+def get_session_factory() -> sessionmaker:
+    return SessionLocal
@@ -0,0 +1,172 @@
+from typing import Iterable
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.data_version import bump_data_version
+from app.models import HourlyBitcoinPrice
+from app.rollups import update_rollups
+from app.utils.export import EXPORT_COLUMNS
+
+# 7 bound parameters per row; stays well below Postgres' 32767 parameter limit
+INSERT_CHUNK_SIZE = 2000
+
+COPY_TABLE = "hourly_bitcoin_prices_import"
+COLUMN_LIST = ", ".join(EXPORT_COLUMNS)
+CREATE_COPY_TABLE = text(f"""
+    CREATE TEMPORARY TABLE IF NOT EXISTS {COPY_TABLE} (
+        unix_timestamp BIGINT NOT NULL,
+        high DOUBLE PRECISION NOT NULL,
+        low DOUBLE PRECISION NOT NULL,
+        open DOUBLE PRECISION NOT NULL,
+        close DOUBLE PRECISION NOT NULL,
+        volumefrom DOUBLE PRECISION NOT NULL,
+        volumeto DOUBLE PRECISION NOT NULL
+    ) ON COMMIT DELETE ROWS
+    """)
+MERGE_COPY_TABLE = text(f"""
+    INSERT INTO hourly_bitcoin_prices ({COLUMN_LIST})
+    SELECT DISTINCT ON (unix_timestamp) {COLUMN_LIST} FROM {COPY_TABLE}
+    ORDER BY unix_timestamp
+    ON CONFLICT (unix_timestamp) DO NOTHING
+    RETURNING unix_timestamp
+    """)
+
+
+def record_to_row(record: dict) -> dict:
+    """Maps a CryptoCompare histohour record to HourlyBitcoinPrice column values."""
+    return {
+        "unix_timestamp": record["time"],
+        "high": record["high"],
+        "low": record["low"],
+        "open": record["open"],
+        "close": record["close"],
+        "volumefrom": record["volumefrom"],
+        "volumeto": record["volumeto"],
+    }
+
+
+def _insert_ignoring_duplicates(
+    session: AsyncSession, rows: list[dict], model=HourlyBitcoinPrice
+):
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        insert = postgresql.insert
+    elif dialect == "sqlite":
+        insert = sqlite.insert
+    else:
+        raise NotImplementedError(f"Bulk upsert is not supported on {dialect}")
+
+    return (
+        insert(model)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["unix_timestamp"])
+        .returning(model.unix_timestamp)
+    )
+
+
+async def insert_hourly_prices(
+    session: AsyncSession, records: Iterable[dict]
+) -> list[int]:
+    """
+    Inserts CryptoCompare records with multi-row `INSERT ... ON CONFLICT (unix_timestamp) DO NOTHING`
+    statements in the current transaction; the caller commits.
+
+    Args:
+        session (AsyncSession): The session to insert with.
+        records (Iterable[dict]): Records with time/high/low/open/close/volumefrom/volumeto keys.
+
+    Returns:
+        list[int]: The timestamps that were actually inserted (existing hours are skipped).
+    """
+    rows = list({record["time"]: record_to_row(record) for record in records}.values())
+    return await insert_price_rows(session, rows)
+
+
+async def insert_price_rows(
+    session: AsyncSession, rows: list[dict], model=HourlyBitcoinPrice
+) -> list[int]:
+    """
+    Same as insert_hourly_prices for rows already keyed by HourlyBitcoinPrice column names.
+    Rows must not repeat a timestamp within one call. `model` selects the table
+    (MinuteBitcoinPrice has the same columns).
+    """
+    inserted = []
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        chunk = rows[start : start + INSERT_CHUNK_SIZE]
+        result = await session.execute(
+            _insert_ignoring_duplicates(session, chunk, model)
+        )
+        inserted.extend(result.scalars().all())
+    return sorted(inserted)
+
+
+async def insert_hourly_prices_row_by_row(
+    session: AsyncSession, records: Iterable[dict]
+) -> list[int]:
+    """
+    Diagnostics only: checks, inserts and commits one record at a time (a SELECT, an
+    INSERT and a COMMIT each). Use insert_hourly_prices otherwise.
+
+    Returns:
+        list[int]: The timestamps that were actually inserted.
+    """
+    inserted = []
+    for record in records:
+        existing = await session.scalar(
+            select(HourlyBitcoinPrice.unix_timestamp).where(
+                HourlyBitcoinPrice.unix_timestamp == record["time"]
+            )
+        )
+        if existing is not None:
+            continue
+        session.add(HourlyBitcoinPrice(**record_to_row(record)))
+        await session.commit()
+        inserted.append(record["time"])
+    return inserted
+
+
+async def bulk_load_price_rows(session: AsyncSession, rows: list[tuple]) -> list[int]:
+    """
+    Loads a large batch of rows in the current transaction, skipping stored hours; the caller commits.
+
+    On Postgres the rows are sent with binary COPY into a per-session temp table (emptied
+    on commit) and merged with `INSERT ... ON CONFLICT (unix_timestamp) DO NOTHING`.
+    Other databases fall back to insert_price_rows.
+
+    Args:
+        session (AsyncSession): The session to load with.
+        rows (list[tuple]): Tuples of Python scalars ordered like EXPORT_COLUMNS; may repeat timestamps.
+
+    Returns:
+        list[int]: The timestamps that were actually inserted.
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        unique_rows = {row[0]: dict(zip(EXPORT_COLUMNS, row)) for row in rows}
+        return await insert_price_rows(session, list(unique_rows.values()))
+
+    await session.execute(CREATE_COPY_TABLE)
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        COPY_TABLE, records=rows, columns=list(EXPORT_COLUMNS)
+    )
+    result = await session.execute(MERGE_COPY_TABLE)
+    return sorted(result.scalars().all())
+
+
+async def record_new_hours(session: AsyncSession, timestamps: list[int]) -> int:
+    """
+    Updates everything derived from the hourly table after new hours were inserted:
+    the rollup candles and the data version. The caller commits.
+
+    Returns:
+        int: The number of candles written.
+    """
+    if not timestamps:
+        return 0
+    candles = await update_rollups(session, timestamps)
+    await bump_data_version(session)
+    return candles
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import os
+import time
+
+import aiohttp
+
+from app.cryptocompare import CryptoCompareError, fetch_spot_price
+from app.price_stream import price_stream
+from app.utils.file_lock import try_lock_file
+
+
+class LatestPrice:
+    """
+    The current BTC/USD spot price, kept in memory by a background poller so requests
+    never wait on CryptoCompare. Every consumer reads the same cached quote.
+
+    With several workers, run() elects one poller per host through a lock file; it
+    writes each quote to a shared file that the other workers read, so CryptoCompare
+    is polled once and every worker serves the same quote.
+    """
+
+    def __init__(self):
+        self._poller_file = None
+        self.reset()
+
+    def reset(self):
+        """Forgets the cached quote."""
+        self.quote: dict | None = None
+        self.last_updated: float | None = None
+        self.last_error: str | None = None
+        self.last_error_at: float | None = None
+        self.polls = 0
+        self.failures = 0
+
+    def set_quote(self, quote: dict, last_updated: float | None = None):
+        """Stores a quote and pushes it to /prices/stream subscribers if it changed."""
+        changed = quote != self.quote
+        self.quote = quote
+        self.last_updated = time.time() if last_updated is None else last_updated
+        if changed:
+            price_stream.publish("tick", self.tick())
+
+    def tick(self) -> dict | None:
+        """Returns the cached quote as pushed to /prices/stream subscribers."""
+        if self.quote is None:
+            return None
+        return {**self.quote, "last_updated": self.last_updated}
+
+    async def poll_once(
+        self, http_session: aiohttp.ClientSession, base_url: str | None = None
+    ) -> bool:
+        """
+        Fetches one quote; on failure the previous quote is kept and the error recorded.
+
+        Returns:
+            bool: Whether a new quote was stored.
+        """
+        self.polls += 1
+        try:
+            quote = await fetch_spot_price(http_session, base_url=base_url)
+        except (CryptoCompareError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.failures += 1
+            self.last_error = str(e) or type(e).__name__
+            self.last_error_at = time.time()
+            return False
+        self.set_quote(quote)
+        return True
+
+    def save(self, path: str):
+        """Writes the cached quote to `path` atomically, for the workers that follow it."""
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            json.dump({"quote": self.quote, "last_updated": self.last_updated}, f)
+        os.replace(temporary, path)
+
+    def follow(self, path: str) -> bool:
+        """
+        Takes the quote saved by the poller at `path` if it is newer than the cached one.
+
+        Returns:
+            bool: Whether a newer quote was stored.
+        """
+        try:
+            with open(path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if saved.get("quote") is None or saved["last_updated"] <= (
+            self.last_updated or 0
+        ):
+            return False
+        self.set_quote(saved["quote"], last_updated=saved["last_updated"])
+        return True
+
+    async def run(self, path: str, interval: float, base_url: str | None = None):
+        """
+        Keeps the quote fresh every `interval` seconds until cancelled. The worker holding
+        the `{path}.poller` lock polls CryptoCompare and saves each quote to `path`; the
+        others follow that file, and take the lock over if the poller process dies.
+        """
+        timeout = aiohttp.ClientTimeout(total=max(interval, 5))
+        async with aiohttp.ClientSession(timeout=timeout) as http_session:
+            while True:
+                if self._poller_file is None:
+                    self._poller_file = try_lock_file(f"{path}.poller")
+                if self._poller_file is None:
+                    self.follow(path)
+                elif await self.poll_once(http_session, base_url=base_url):
+                    self.save(path)
+                else:
+                    print(f"Latest price poll failed: {self.last_error}")
+                await asyncio.sleep(interval)
+
+    def release(self):
+        """Gives up the poller role."""
+        if self._poller_file is not None:
+            self._poller_file.close()
+            self._poller_file = None
+
+    async def run_poller(self, interval: float, base_url: str | None = None):
+        """Polls every `interval` seconds until cancelled, in this process alone."""
+        timeout = aiohttp.ClientTimeout(total=max(interval, 5))
+        async with aiohttp.ClientSession(timeout=timeout) as http_session:
+            while True:
+                if not await self.poll_once(http_session, base_url=base_url):
+                    print(f"Latest price poll failed: {self.last_error}")
+                await asyncio.sleep(interval)
+
+    def snapshot(self, stale_after: float) -> dict | None:
+        """
+        Returns the cached quote with staleness fields, or None before the first successful poll.
+
+        Args:
+            stale_after (float): Age in seconds after which the quote is flagged as stale.
+        """
+        if self.quote is None:
+            return None
+        age = time.time() - self.last_updated
+        return {
+            **self.quote,
+            "last_updated": self.last_updated,
+            "age_seconds": age,
+            "stale": age > stale_after,
+        }
+
+
+latest_price = LatestPrice()
@@ -1,8 +1,90 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from app.database import SessionLocal
+from app.latest_price import latest_price
+from app.price_index import price_index
+from app.price_stream import price_stream, run_candle_watcher
 from app.routers import prices
+from app.shared_series import shared_price_series
+from app.snapshot import load_snapshot
+from core.settings import settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    refresher = None
+    poller = None
+    candle_watcher = None
+    if settings.latest_price_enabled:
+        if settings.latest_price_shared_path:
+            # One worker polls CryptoCompare; the others serve the quote it saves
+            poller = asyncio.create_task(
+                latest_price.run(
+                    settings.latest_price_shared_path,
+                    settings.latest_price_poll_seconds,
+                )
+            )
+        else:
+            poller = asyncio.create_task(
+                latest_price.run_poller(settings.latest_price_poll_seconds)
+            )
+        candle_watcher = asyncio.create_task(
+            run_candle_watcher(
+                price_stream, SessionLocal, settings.price_stream_candle_poll_seconds
+            )
+        )
+
+    if settings.shared_price_series_path:
+        # One worker loads the file and keeps it fresh; the others map it read-only
+        # and take the loader role over if that worker dies
+        path = settings.shared_price_series_path
+        is_loader = shared_price_series.try_become_loader(path)
+        shared_price_series.attach(path, writable=is_loader)
+        if is_loader:
+            async with SessionLocal() as session:
+                rows = await shared_price_series.load(session)
+            print(f"Shared price series loaded: {rows} rows")
+        refresher = asyncio.create_task(
+            shared_price_series.run_refresher(
+                SessionLocal, settings.price_index_refresh_seconds
+            )
+        )
+    elif settings.price_index_enabled:
+        if settings.price_snapshot_path:
+            # Serve from the snapshot right away; the refresh adds newer rows from the
+            # database and rebuilds the index if hours were stored inside its range since
+            rows = price_index.load_from_snapshot(
+                load_snapshot(settings.price_snapshot_path)
+            )
+            print(f"Price index loaded from snapshot: {rows} rows")
+            try:
+                async with SessionLocal() as session:
+                    added = await price_index.refresh(session)
+                print(f"Price index refreshed: {added} new rows")
+            except Exception as e:
+                print(f"Price index refresh failed: {e}")
+        else:
+            async with SessionLocal() as session:
+                rows = await price_index.load(session)
+            print(f"Price index loaded: {rows} rows")
+        refresher = asyncio.create_task(
+            price_index.run_refresher(
+                SessionLocal, settings.price_index_refresh_seconds
+            )
+        )
+
+    yield
+
+    for task in (refresher, poller, candle_watcher):
+        if task is not None:
+            task.cancel()
+    shared_price_series.detach()
+    latest_price.release()
 
 
-app = FastAPI(title="Prices Microservice")
+app = FastAPI(title="Prices Microservice", lifespan=lifespan)
 
 app.include_router(prices.router, prefix="/prices", tags=["Prices"])
 
@@ -0,0 +1,171 @@
+import time
+
+import aiohttp
+from sqlalchemy import delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+from app.cryptocompare import MAX_HISTOMINUTE_LIMIT, fetch_histominute
+from app.ingest import insert_price_rows, record_new_hours, record_to_row
+from app.models import MinuteBitcoinPrice
+from app.utils.export import EXPORT_COLUMNS
+from app.utils.timestamp import round_timestamp_down_to_hour
+
+SECONDS_IN_MINUTE = 60
+SECONDS_IN_DAY = 86400
+MINUTES_IN_HOUR = 60
+
+MINUTE_COLUMNS = tuple(getattr(MinuteBitcoinPrice, name) for name in EXPORT_COLUMNS)
+
+
+async def get_minute_price(session: AsyncSession, unix_timestamp: int) -> dict | None:
+    """
+    Returns the stored minute for a timestamp already rounded to the minute, or None.
+    Selects only columns carried by the primary key, so Postgres answers from the index.
+    """
+    result = await session.execute(
+        select(*MINUTE_COLUMNS).where(
+            MinuteBitcoinPrice.unix_timestamp == unix_timestamp
+        )
+    )
+    row = result.first()
+    return dict(zip(EXPORT_COLUMNS, row)) if row is not None else None
+
+
+async def update_minute_prices(
+    session_factory: sessionmaker,
+    http_session: aiohttp.ClientSession,
+    retention_days: int,
+    now: float | None = None,
+    base_url: str | None = None,
+) -> dict:
+    """
+    Fetches the closed minutes after the newest stored one (at most `retention_days` back)
+    and stores them.
+
+    Returns:
+        dict: missing (minutes requested) and inserted.
+    """
+    current_minute = int(now or time.time()) // SECONDS_IN_MINUTE * SECONDS_IN_MINUTE
+    earliest = current_minute - retention_days * SECONDS_IN_DAY
+    async with session_factory() as session:
+        latest_ts = await session.scalar(
+            select(func.max(MinuteBitcoinPrice.unix_timestamp))
+        )
+        after = max(latest_ts or 0, earliest - SECONDS_IN_MINUTE)
+        missing = max((current_minute - after) // SECONDS_IN_MINUTE - 1, 0)
+
+        records = []
+        to_ts = current_minute - SECONDS_IN_MINUTE
+        remaining = missing
+        while remaining > 0:
+            # limit + 1 minutes per call, ending at to_ts
+            limit = min(MAX_HISTOMINUTE_LIMIT, remaining - 1)
+            batch = await fetch_histominute(
+                http_session, to_ts=to_ts, limit=limit, base_url=base_url
+            )
+            if not batch:
+                break
+            records = batch + records
+            remaining -= limit + 1
+            to_ts = batch[0]["time"] - SECONDS_IN_MINUTE
+
+        rows = {
+            r["time"]: record_to_row(r)
+            for r in records
+            if after < r["time"] < current_minute
+        }
+        inserted = await insert_price_rows(
+            session, list(rows.values()), MinuteBitcoinPrice
+        )
+        await session.commit()
+    return {"missing": missing, "inserted": len(inserted)}
+
+
+def downsample_minutes(rows) -> tuple[list[dict], int]:
+    """
+    Rolls minute rows up into hourly rows (first open, max high, min low, last close,
+    summed volumes). Hours missing any of their 60 minutes are skipped, since their
+    volumes would be understated.
+
+    Args:
+        rows: (unix_timestamp, high, low, open, close, volumefrom, volumeto) tuples sorted ASC.
+
+    Returns:
+        tuple: The hourly rows keyed by HourlyBitcoinPrice column names, and the number
+        of incomplete hours skipped.
+    """
+    hours = []
+    incomplete = 0
+    hour = None
+    minutes = 0
+
+    def close_hour():
+        nonlocal incomplete
+        if hour is None:
+            return
+        if minutes == MINUTES_IN_HOUR:
+            hours.append(hour)
+        else:
+            incomplete += 1
+
+    for ts, high, low, open_, close, volumefrom, volumeto in rows:
+        hour_start = round_timestamp_down_to_hour(ts)
+        if hour is None or hour_start != hour["unix_timestamp"]:
+            close_hour()
+            hour = {
+                "unix_timestamp": hour_start,
+                "high": high,
+                "low": low,
+                "open": open_,
+                "close": close,
+                "volumefrom": 0.0,
+                "volumeto": 0.0,
+            }
+            minutes = 0
+        hour["high"] = max(hour["high"], high)
+        hour["low"] = min(hour["low"], low)
+        hour["close"] = close
+        hour["volumefrom"] += volumefrom
+        hour["volumeto"] += volumeto
+        minutes += 1
+    close_hour()
+    return hours, incomplete
+
+
+async def downsample_old_minutes(
+    session: AsyncSession, retention_days: int, now: float | None = None
+) -> dict:
+    """
+    Moves minutes older than `retention_days` (cut at an hour boundary) into the hourly
+    table and deletes them. Hours already stored from histohour are kept as they are;
+    the caller commits.
+
+    Returns:
+        dict: minutes (deleted), hours (complete hours built), inserted (hours that were
+        missing from the hourly table), incomplete and candles.
+    """
+    cutoff = round_timestamp_down_to_hour(
+        int(now or time.time()) - retention_days * SECONDS_IN_DAY
+    )
+    result = await session.execute(
+        select(*MINUTE_COLUMNS)
+        .where(MinuteBitcoinPrice.unix_timestamp < cutoff)
+        .order_by(MinuteBitcoinPrice.unix_timestamp.asc())
+    )
+    minutes = result.all()
+    hours, incomplete = downsample_minutes(minutes)
+
+    inserted = await insert_price_rows(session, hours)
+    candles = await record_new_hours(session, inserted)
+    await session.execute(
+        delete(MinuteBitcoinPrice).where(MinuteBitcoinPrice.unix_timestamp < cutoff)
+    )
+    return {
+        "minutes": len(minutes),
+        "hours": len(hours),
+        "inserted": len(inserted),
+        "incomplete": incomplete,
+        "candles": candles,
+    }
@@ -1,13 +1,28 @@
-from sqlalchemy import Column, Integer, BigInteger, Float
+from sqlalchemy import Column, Integer, BigInteger, Float, String
 from app.database import Base
-from sqlalchemy import CheckConstraint
+from sqlalchemy import CheckConstraint, Index
+
+# 17. July 2010 01:00:00 UTC, the first hour CryptoCompare has BTC/USD data for
+FIRST_VALID_TIMESTAMP = 1279328400
 
 
 class HourlyBitcoinPrice(Base):
+    """
+    One row per hour, keyed by the hour's timestamp. The BRIN index below serves range
+    scans from a few pages only while the heap stays in time order: the migration
+    CLUSTERs the table once, and the updater keeps appending newer hours at the end.
+
+    Backfills and gap repairs insert old hours at the end of the heap too, which widens
+    the BRIN ranges they land in. After a large one, run
+    `CLUSTER hourly_bitcoin_prices USING hourly_bitcoin_prices_pkey` (takes an exclusive
+    lock) to restore the order; `SELECT brin_summarize_new_values(
+    'ix_hourly_bitcoin_prices_unix_timestamp_brin')` only summarizes unsummarized pages
+    and is enough after plain appends.
+    """
+
     __tablename__ = "hourly_bitcoin_prices"
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    unix_timestamp = Column(BigInteger, index=True, nullable=False, unique=True)
+    unix_timestamp = Column(BigInteger, primary_key=True, autoincrement=False)
     high = Column(Float, nullable=False)
     low = Column(Float, nullable=False)
     open = Column(Float, nullable=False)
@@ -15,5 +30,66 @@ class HourlyBitcoinPrice(Base):
     volumefrom = Column(Float, nullable=False)
     volumeto = Column(Float, nullable=False)
     __table_args__ = (
-        CheckConstraint("unix_timestamp >= 1279328400", name="valid_unix_timestamp"),
+        CheckConstraint(
+            f"unix_timestamp >= {FIRST_VALID_TIMESTAMP}", name="valid_unix_timestamp"
+        ),
+        Index(
+            "ix_hourly_bitcoin_prices_unix_timestamp_brin",
+            "unix_timestamp",
+            postgresql_using="brin",
+        ),
     )
+
+
+class MinuteBitcoinPrice(Base):
+    """
+    Optional minute-resolution tier: recent minutes only, downsampled into
+    hourly_bitcoin_prices and deleted once they are older than the retention period.
+    On Postgres the primary key INCLUDEs the price columns, so lookups are index-only scans.
+    """
+
+    __tablename__ = "minute_bitcoin_prices"
+
+    unix_timestamp = Column(BigInteger, primary_key=True, autoincrement=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    open = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    volumefrom = Column(Float, nullable=False)
+    volumeto = Column(Float, nullable=False)
+
+
+class BitcoinPriceCandle(Base):
+    """OHLCV rollup of hourly prices into daily (1d), weekly (1w) and monthly (1M) candles."""
+
+    __tablename__ = "bitcoin_price_candles"
+
+    interval = Column(String(2), primary_key=True)
+    bucket_start = Column(BigInteger, primary_key=True)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    open = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    volumefrom = Column(Float, nullable=False)
+    volumeto = Column(Float, nullable=False)
+    hours = Column(Integer, nullable=False)
+
+
+class DataVersion(Base):
+    """Counter bumped whenever a table's content changes; used to build ETags."""
+
+    __tablename__ = "data_versions"
+
+    name = Column(String(64), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+
+class BackfillWindow(Base):
+    """Checkpoint of a historical backfill window that has been fetched and stored."""
+
+    __tablename__ = "backfill_windows"
+
+    window_start = Column(BigInteger, primary_key=True)
+    window_end = Column(BigInteger, primary_key=True)
+    rows_inserted = Column(Integer, nullable=False)
+    completed_at = Column(BigInteger, nullable=False)
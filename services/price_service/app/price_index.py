@@ -0,0 +1,296 @@
+import asyncio
+import time
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.data_version import get_data_version
+from app.models import HourlyBitcoinPrice
+
+SECONDS_IN_HOUR = 3600
+PRICE_COLUMNS = ("high", "low", "open", "close", "volumefrom", "volumeto")
+
+
+async def fetch_price_rows(session: AsyncSession, after: int | None = None):
+    """Returns (unix_timestamp, *PRICE_COLUMNS) rows sorted ASC, optionally only those after a timestamp."""
+    query = select(
+        HourlyBitcoinPrice.unix_timestamp,
+        *(getattr(HourlyBitcoinPrice, name) for name in PRICE_COLUMNS),
+    ).order_by(HourlyBitcoinPrice.unix_timestamp.asc())
+    if after is not None:
+        query = query.where(HourlyBitcoinPrice.unix_timestamp > after)
+    result = await session.execute(query)
+    return result.all()
+
+
+async def count_price_rows(session: AsyncSession) -> int:
+    """Returns the number of stored hours."""
+    result = await session.execute(
+        select(func.count(HourlyBitcoinPrice.unix_timestamp))
+    )
+    return result.scalar_one()
+
+
+def neighbour_slots(
+    present: np.ndarray, offset: int, max_distance: int
+) -> tuple[int | None, int | None]:
+    """
+    Finds the stored hour slots closest to a position in an hour-slot presence mask.
+
+    Args:
+        present (np.ndarray): Presence mask; slot i is the hour i * 3600 seconds after the base.
+        offset (int): Seconds from the base hour to the target timestamp.
+        max_distance (int): Ignore slots further than this many seconds from the target.
+
+    Returns:
+        tuple: The nearest present slot at or before the target and the nearest at or after
+        it, each None if there is none within max_distance.
+    """
+    first = -(-(offset - max_distance) // SECONDS_IN_HOUR)  # ceil
+    last = offset // SECONDS_IN_HOUR
+    before = after = None
+
+    low, high = max(first, 0), min(last, present.size - 1)
+    if low <= high:
+        stored = np.flatnonzero(present[low : high + 1])
+        if stored.size:
+            before = low + int(stored[-1])
+
+    first = -(-offset // SECONDS_IN_HOUR)
+    last = (offset + max_distance) // SECONDS_IN_HOUR
+    low, high = max(first, 0), min(last, present.size - 1)
+    if low <= high:
+        stored = np.flatnonzero(present[low : high + 1])
+        if stored.size:
+            after = low + int(stored[0])
+    return before, after
+
+
+class PriceIndex:
+    """
+    In-process, columnar copy of the hourly_bitcoin_prices table.
+
+    Every column lives in its own NumPy array and a row is stored at its hour
+    offset from the first stored timestamp, so looking up an hour is a single
+    array read. Hours that are missing from the table are flagged in the
+    `present` mask.
+
+    The index remembers the data version (see app/data_version.py) it was built
+    from, so a refresh notices hours inserted inside the indexed range (backfill,
+    gap repair, imports, minute downsampling) and not only newer ones.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self.reset()
+
+    def reset(self):
+        """Drops all data and marks the index as not loaded."""
+        self.base_ts: int | None = None
+        self.timestamps = np.empty(0, dtype=np.int64)
+        self.present = np.empty(0, dtype=bool)
+        self.columns = {name: np.empty(0, dtype=np.float64) for name in PRICE_COLUMNS}
+        self.row_count = 0
+        self.min_ts: int | None = None
+        self.max_ts: int | None = None
+        self.data_version: int | None = None
+        self.loaded_at: float | None = None
+        self.refreshed_at: float | None = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    async def load(self, session: AsyncSession) -> int:
+        """
+        (Re)builds the index from scratch.
+
+        Returns:
+            int: The number of rows loaded.
+        """
+        async with self._lock:
+            return await self._load(session)
+
+    async def _load(self, session: AsyncSession) -> int:
+        # Read the version first: rows committed in between are picked up by the next refresh
+        version = await get_data_version(session)
+        rows = await fetch_price_rows(session)
+        self.reset()
+        self._append(rows)
+        self.data_version = version
+        self.loaded_at = self.refreshed_at = time.time()
+        return len(rows)
+
+    def load_from_snapshot(self, snapshot: np.ndarray) -> int:
+        """
+        (Re)builds the index from a snapshot (see app/snapshot.py) without querying the database.
+        The snapshot may be memory-mapped; its columns are copied into the index arrays.
+
+        Returns:
+            int: The number of rows loaded.
+        """
+        self.reset()
+        values = np.column_stack([snapshot[name] for name in PRICE_COLUMNS])
+        self._append_arrays(np.asarray(snapshot["unix_timestamp"]), values)
+        self.loaded_at = self.refreshed_at = time.time()
+        return int(snapshot.size)
+
+    async def refresh(self, session: AsyncSession) -> int:
+        """
+        Appends rows stored after the newest indexed timestamp. If the data version has
+        changed and the table no longer holds as many rows as the index, hours were
+        inserted inside the indexed range (or removed), and the index is rebuilt.
+
+        Returns:
+            int: The number of rows added (negative if rows were removed).
+        """
+        if not self.is_loaded:
+            return await self.load(session)
+
+        async with self._lock:
+            rows_before = self.row_count
+            version = await get_data_version(session)
+            self._append(await fetch_price_rows(session, after=self.max_ts))
+            if (
+                version != self.data_version
+                and await count_price_rows(session) != self.row_count
+            ):
+                await self._load(session)
+            self.data_version = version
+            self.refreshed_at = time.time()
+            return self.row_count - rows_before
+
+    async def run_refresher(self, session_factory, interval: float):
+        """Refreshes the index every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with session_factory() as session:
+                    added = await self.refresh(session)
+                if added:
+                    print(f"Price index refreshed: {added} new rows")
+            except Exception as e:
+                print(f"Price index refresh failed: {e}")
+
+    def _append(self, rows):
+        if not rows:
+            return
+
+        timestamps = np.fromiter(
+            (row[0] for row in rows), dtype=np.int64, count=len(rows)
+        )
+        values = np.array([row[1:] for row in rows], dtype=np.float64)
+        self._append_arrays(timestamps, values)
+
+    def _append_arrays(self, timestamps: np.ndarray, values: np.ndarray):
+        if timestamps.size == 0:
+            return
+        if self.base_ts is None:
+            self.base_ts = int(timestamps[0])
+
+        # Rows older than the base hour cannot be addressed by offset
+        keep = timestamps >= self.base_ts
+        timestamps, values = timestamps[keep], values[keep]
+        if timestamps.size == 0:
+            return
+
+        offsets = (timestamps - self.base_ts) // SECONDS_IN_HOUR
+        self._grow(int(offsets.max()) + 1)
+
+        new_rows = int(np.count_nonzero(~self.present[offsets]))
+        self.timestamps[offsets] = timestamps
+        self.present[offsets] = True
+        for i, name in enumerate(PRICE_COLUMNS):
+            self.columns[name][offsets] = values[:, i]
+
+        self.row_count += new_rows
+        self.min_ts = int(self.timestamps[self.present][0])
+        self.max_ts = int(self.timestamps[self.present][-1])
+
+    def _grow(self, length: int):
+        current = self.present.size
+        if length <= current:
+            return
+        # Over-allocate so hourly appends do not copy the arrays every time
+        capacity = max(length, current + current // 4)
+        extra = capacity - current
+
+        self.timestamps = np.concatenate([self.timestamps, np.zeros(extra, np.int64)])
+        self.present = np.concatenate([self.present, np.zeros(extra, bool)])
+        for name in PRICE_COLUMNS:
+            self.columns[name] = np.concatenate(
+                [self.columns[name], np.full(extra, np.nan)]
+            )
+
+    def bounds(self) -> tuple[int, int] | None:
+        """Returns the (min, max) stored timestamps, or None if the index is empty."""
+        if self.row_count == 0:
+            return None
+        return self.min_ts, self.max_ts
+
+    def lookup(self, unix_timestamp: int) -> dict | None:
+        """
+        Returns the stored row for an exact hourly timestamp.
+
+        Args:
+            unix_timestamp (int): A timestamp already rounded to the hour.
+
+        Returns:
+            dict | None: The row as a dict, or None if the hour is not stored.
+        """
+        if self.base_ts is None:
+            return None
+
+        offset = (unix_timestamp - self.base_ts) // SECONDS_IN_HOUR
+        if not (0 <= offset < self.present.size) or not self.present[offset]:
+            return None
+        if self.timestamps[offset] != unix_timestamp:
+            return None
+
+        return self._row(offset)
+
+    def neighbours(
+        self, unix_timestamp: int, max_distance: int
+    ) -> tuple[dict | None, dict | None]:
+        """
+        Returns the stored rows at or before and at or after any timestamp, each None if
+        there is no stored hour within max_distance seconds on that side.
+        """
+        if self.base_ts is None:
+            return None, None
+        slots = neighbour_slots(
+            self.present, unix_timestamp - self.base_ts, max_distance
+        )
+        return tuple(self._row(slot) if slot is not None else None for slot in slots)
+
+    def _row(self, offset: int) -> dict:
+        row = {"unix_timestamp": int(self.timestamps[offset])}
+        for name in PRICE_COLUMNS:
+            row[name] = float(self.columns[name][offset])
+        return row
+
+    def stats(self) -> dict:
+        """Returns size and staleness diagnostics."""
+        now = time.time()
+        nbytes = self.timestamps.nbytes + self.present.nbytes
+        nbytes += sum(column.nbytes for column in self.columns.values())
+        return {
+            "loaded": self.is_loaded,
+            "rows": self.row_count,
+            "slots": int(self.present.size),
+            "memory_bytes": int(nbytes),
+            "first_timestamp": self.min_ts,
+            "last_timestamp": self.max_ts,
+            "data_version": self.data_version,
+            "loaded_at": self.loaded_at,
+            "refreshed_at": self.refreshed_at,
+            "seconds_since_refresh": (
+                now - self.refreshed_at if self.refreshed_at is not None else None
+            ),
+            "data_lag_seconds": now - self.max_ts if self.max_ts is not None else None,
+        }
+
+
+price_index = PriceIndex()
@@ -0,0 +1,95 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models import HourlyBitcoinPrice
+from app.price_index import PRICE_COLUMNS, SECONDS_IN_HOUR
+from app.utils.timestamp import round_timestamp_to_nearest_hour
+
+LOOKUP_MODES = ("exact", "nearest", "interpolate")
+DEFAULT_TOLERANCE_SECONDS = 3 * SECONDS_IN_HOUR
+MAX_TOLERANCE_SECONDS = 7 * 24 * SECONDS_IN_HOUR
+
+
+async def get_neighbour_prices(
+    session: AsyncSession, unix_timestamp: int, max_distance: int
+) -> tuple[HourlyBitcoinPrice | None, HourlyBitcoinPrice | None]:
+    """
+    Returns the stored hours at or before and at or after a timestamp, within max_distance seconds.
+    Each side is one descent of the unix_timestamp index (ORDER BY ... LIMIT 1).
+    """
+    column = HourlyBitcoinPrice.unix_timestamp
+    result = await session.execute(
+        select(HourlyBitcoinPrice)
+        .where(column <= unix_timestamp, column >= unix_timestamp - max_distance)
+        .order_by(column.desc())
+        .limit(1)
+    )
+    before = result.scalars().first()
+    result = await session.execute(
+        select(HourlyBitcoinPrice)
+        .where(column >= unix_timestamp, column <= unix_timestamp + max_distance)
+        .order_by(column.asc())
+        .limit(1)
+    )
+    after = result.scalars().first()
+    return before, after
+
+
+def price_to_dict(price) -> dict:
+    if isinstance(price, dict):
+        return price
+    return {
+        "unix_timestamp": price.unix_timestamp,
+        **{name: getattr(price, name) for name in PRICE_COLUMNS},
+    }
+
+
+def resolve_price(
+    mode: str, unix_timestamp: int, before, after
+) -> tuple[dict, str] | None:
+    """
+    Picks or derives the price for a timestamp from its stored neighbours.
+
+    Args:
+        mode (str): `nearest` or `interpolate`.
+        unix_timestamp (int): The requested (unrounded) timestamp.
+        before: The stored row at or before the timestamp, or None.
+        after: The stored row at or after the timestamp, or None.
+
+    Returns:
+        tuple | None: The row and the mode actually used, or None if both neighbours are
+        missing. The nearest hour is reported as `exact` when it is the hour the timestamp
+        rounds to; `interpolate` falls back to `nearest` when only one side is stored.
+        An interpolated row has only a close; the other columns are None.
+    """
+    if before is None and after is None:
+        return None
+    before = price_to_dict(before) if before is not None else None
+    after = price_to_dict(after) if after is not None else None
+
+    if (
+        mode == "interpolate"
+        and before is not None
+        and after is not None
+        and before["unix_timestamp"] != after["unix_timestamp"]
+    ):
+        weight = (unix_timestamp - before["unix_timestamp"]) / (
+            after["unix_timestamp"] - before["unix_timestamp"]
+        )
+        row = {name: None for name in PRICE_COLUMNS}
+        row["unix_timestamp"] = unix_timestamp
+        row["close"] = before["close"] + weight * (after["close"] - before["close"])
+        return row, "interpolate"
+
+    # Ties go to the later hour, like round_timestamp_to_nearest_hour
+    if after is None or (
+        before is not None
+        and unix_timestamp - before["unix_timestamp"]
+        < after["unix_timestamp"] - unix_timestamp
+    ):
+        row = before
+    else:
+        row = after
+    if row["unix_timestamp"] == round_timestamp_to_nearest_hour(unix_timestamp):
+        return row, "exact"
+    return row, "nearest"
@@ -0,0 +1,122 @@
+import asyncio
+from contextlib import contextmanager
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models import HourlyBitcoinPrice
+from app.utils.export import EXPORT_COLUMNS
+from core.settings import settings
+
+DEFAULT_QUEUE_SIZE = 100
+
+
+class Subscription:
+    """One connected client: a bounded queue of (event, data) pairs."""
+
+    def __init__(self, kind: str, queue_size: int):
+        self.kind = kind
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    async def get(self) -> tuple[str, dict]:
+        return await self.queue.get()
+
+
+class Broadcaster:
+    """
+    Fans events out to many subscribers without letting a slow one hold up the rest.
+
+    publish() never waits: when a client's queue is full its oldest event is dropped
+    and counted, so a stalled connection only loses its own backlog.
+    """
+
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.subscriptions: set[Subscription] = set()
+        self.published = 0
+        self.dropped = 0
+
+    @contextmanager
+    def subscribe(self, kind: str):
+        """Registers a subscriber for the duration of the with block."""
+        subscription = Subscription(kind, self.queue_size)
+        self.subscriptions.add(subscription)
+        try:
+            yield subscription
+        finally:
+            self.subscriptions.discard(subscription)
+
+    def publish(self, event: str, data: dict):
+        self.published += 1
+        for subscription in self.subscriptions:
+            if subscription.queue.full():
+                subscription.queue.get_nowait()
+                subscription.dropped += 1
+                self.dropped += 1
+            subscription.queue.put_nowait((event, data))
+
+    def stats(self) -> dict:
+        """Returns connection and delivery counters."""
+        kinds = [subscription.kind for subscription in self.subscriptions]
+        return {
+            "clients": len(kinds),
+            "sse_clients": kinds.count("sse"),
+            "websocket_clients": kinds.count("websocket"),
+            "published": self.published,
+            "dropped": self.dropped,
+            "max_queue_size": self.queue_size,
+        }
+
+
+def format_sse(event: str, data: dict) -> bytes:
+    """Encodes one server-sent event."""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+async def stream_events(subscription: Subscription, keepalive: float):
+    """
+    Yields the subscription's (event, data) pairs as they arrive, and None after every
+    `keepalive` seconds without one so the caller can keep idle connections open.
+    """
+    while True:
+        try:
+            yield await asyncio.wait_for(subscription.get(), timeout=keepalive)
+        except asyncio.TimeoutError:
+            yield None
+
+
+async def get_latest_closed_hour(session: AsyncSession) -> dict | None:
+    result = await session.execute(
+        select(*(getattr(HourlyBitcoinPrice, name) for name in EXPORT_COLUMNS))
+        .order_by(HourlyBitcoinPrice.unix_timestamp.desc())
+        .limit(1)
+    )
+    row = result.first()
+    return dict(zip(EXPORT_COLUMNS, row)) if row is not None else None
+
+
+async def run_candle_watcher(
+    broadcaster: Broadcaster, session_factory, interval: float
+):
+    """
+    Publishes a `candle` event whenever a newer hourly row appears in the database,
+    checking every `interval` seconds until cancelled. The hour present at startup is
+    not announced.
+    """
+    last_seen = None
+    while True:
+        try:
+            async with session_factory() as session:
+                candle = await get_latest_closed_hour(session)
+            if candle is not None:
+                if last_seen is not None and candle["unix_timestamp"] > last_seen:
+                    broadcaster.publish("candle", candle)
+                last_seen = candle["unix_timestamp"]
+        except Exception as e:
+            print(f"Candle watcher failed: {e}")
+        await asyncio.sleep(interval)
+
+
+price_stream = Broadcaster(settings.price_stream_queue_size)
@@ -0,0 +1,181 @@
+from datetime import datetime, timezone
+from typing import Iterable
+
+from sqlalchemy import delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models import BitcoinPriceCandle, HourlyBitcoinPrice
+
+SECONDS_IN_DAY = 86400
+SECONDS_IN_WEEK = 7 * SECONDS_IN_DAY
+# 1970-01-05 00:00 UTC is the first Monday after the epoch; weeks start on Monday
+FIRST_MONDAY = 4 * SECONDS_IN_DAY
+
+INTERVALS = ("1d", "1w", "1M")
+# 9 bound parameters per candle; stays well below Postgres' 32767 parameter limit
+UPSERT_CHUNK_SIZE = 2000
+CANDLE_COLUMNS = ("high", "low", "open", "close", "volumefrom", "volumeto", "hours")
+
+HOURLY_COLUMNS = (
+    HourlyBitcoinPrice.unix_timestamp,
+    HourlyBitcoinPrice.high,
+    HourlyBitcoinPrice.low,
+    HourlyBitcoinPrice.open,
+    HourlyBitcoinPrice.close,
+    HourlyBitcoinPrice.volumefrom,
+    HourlyBitcoinPrice.volumeto,
+)
+
+
+def get_bucket_start(unix_timestamp: int, interval: str) -> int:
+    """
+    Returns the UTC start of the candle that contains the timestamp.
+
+    Args:
+        unix_timestamp (int): The Unix timestamp (epoch).
+        interval (str): "1d", "1w" (weeks start on Monday) or "1M" (calendar month).
+
+    Returns:
+        int: The Unix timestamp of the bucket start.
+    """
+    if interval == "1d":
+        return unix_timestamp - unix_timestamp % SECONDS_IN_DAY
+    if interval == "1w":
+        return unix_timestamp - (unix_timestamp - FIRST_MONDAY) % SECONDS_IN_WEEK
+    if interval == "1M":
+        dt = datetime.fromtimestamp(unix_timestamp, tz=timezone.utc)
+        return int(datetime(dt.year, dt.month, 1, tzinfo=timezone.utc).timestamp())
+    raise ValueError(f"Unknown interval: {interval}")
+
+
+def get_bucket_end(bucket_start: int, interval: str) -> int:
+    """Returns the (exclusive) end of the candle starting at bucket_start."""
+    if interval == "1d":
+        return bucket_start + SECONDS_IN_DAY
+    if interval == "1w":
+        return bucket_start + SECONDS_IN_WEEK
+    if interval == "1M":
+        dt = datetime.fromtimestamp(bucket_start, tz=timezone.utc)
+        year, month = (dt.year + 1, 1) if dt.month == 12 else (dt.year, dt.month + 1)
+        return int(datetime(year, month, 1, tzinfo=timezone.utc).timestamp())
+    raise ValueError(f"Unknown interval: {interval}")
+
+
+def aggregate_candles(rows, interval: str) -> list[dict]:
+    """
+    Rolls hourly rows up into candles: first open, max high, min low, last close, summed volumes.
+
+    Args:
+        rows: (unix_timestamp, high, low, open, close, volumefrom, volumeto) tuples sorted by timestamp ASC.
+        interval (str): One of INTERVALS.
+
+    Returns:
+        list[dict]: One dict per non-empty bucket, sorted by bucket_start ASC.
+    """
+    candles = []
+    candle = None
+    bucket_end = None
+    for ts, high, low, open_, close, volumefrom, volumeto in rows:
+        if candle is None or ts >= bucket_end:
+            start = get_bucket_start(ts, interval)
+            bucket_end = get_bucket_end(start, interval)
+            candle = {
+                "interval": interval,
+                "bucket_start": start,
+                "high": high,
+                "low": low,
+                "open": open_,
+                "close": close,
+                "volumefrom": 0.0,
+                "volumeto": 0.0,
+                "hours": 0,
+            }
+            candles.append(candle)
+
+        candle["high"] = max(candle["high"], high)
+        candle["low"] = min(candle["low"], low)
+        candle["close"] = close
+        candle["volumefrom"] += volumefrom
+        candle["volumeto"] += volumeto
+        candle["hours"] += 1
+    return candles
+
+
+async def _upsert_candles(session: AsyncSession, candles: list[dict]):
+    # Several writers (updater, backfill, minute downsampling) can recompute the same
+    # bucket at once; an upsert on the candle key lets the last one win instead of
+    # failing the caller's transaction on a duplicate key
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        insert = postgresql.insert
+    elif dialect == "sqlite":
+        insert = sqlite.insert
+    else:
+        raise NotImplementedError(f"Bulk upsert is not supported on {dialect}")
+
+    for i in range(0, len(candles), UPSERT_CHUNK_SIZE):
+        statement = insert(BitcoinPriceCandle).values(
+            candles[i : i + UPSERT_CHUNK_SIZE]
+        )
+        await session.execute(
+            statement.on_conflict_do_update(
+                index_elements=["interval", "bucket_start"],
+                set_={column: statement.excluded[column] for column in CANDLE_COLUMNS},
+            )
+        )
+
+
+async def update_rollups(session: AsyncSession, timestamps: Iterable[int]) -> int:
+    """
+    Recomputes every candle that contains one of the given hourly timestamps.
+    Called by the updater after inserting new hours; the caller commits.
+
+    Returns:
+        int: The number of candles written.
+    """
+    timestamps = list(timestamps)
+    if not timestamps:
+        return 0
+
+    candles = []
+    for interval in INTERVALS:
+        starts = {get_bucket_start(ts, interval) for ts in timestamps}
+        result = await session.execute(
+            select(*HOURLY_COLUMNS)
+            .where(
+                HourlyBitcoinPrice.unix_timestamp >= min(starts),
+                HourlyBitcoinPrice.unix_timestamp
+                < get_bucket_end(max(starts), interval),
+            )
+            .order_by(HourlyBitcoinPrice.unix_timestamp.asc())
+        )
+        candles.extend(
+            candle
+            for candle in aggregate_candles(result.all(), interval)
+            if candle["bucket_start"] in starts
+        )
+
+    await _upsert_candles(session, candles)
+    return len(candles)
+
+
+async def rebuild_all_rollups(session: AsyncSession) -> int:
+    """
+    Drops and recomputes every candle from the full hourly history; the caller commits.
+
+    Returns:
+        int: The number of candles written.
+    """
+    result = await session.execute(
+        select(*HOURLY_COLUMNS).order_by(HourlyBitcoinPrice.unix_timestamp.asc())
+    )
+    rows = result.all()
+
+    await session.execute(delete(BitcoinPriceCandle))
+    candles = []
+    for interval in INTERVALS:
+        candles.extend(aggregate_candles(rows, interval))
+    session.add_all(BitcoinPriceCandle(**candle) for candle in candles)
+    return len(candles)
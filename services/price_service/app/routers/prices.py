@@ -1,65 +1,652 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi_pagination import Page, add_pagination
-from fastapi_pagination.ext.sqlalchemy import paginate
-from sqlalchemy import desc
+from math import ceil
+from typing import Annotated, Literal
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Depends,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from fastapi_pagination import Page, Params, add_pagination
+from pydantic import Field
+from sqlalchemy import BigInteger, any_, bindparam, func
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.models import HourlyBitcoinPrice
-from app.schemas import HourlyBitcoinPriceSchema
-from app.database import get_db
-from app.utils.timestamp import round_timestamp_to_nearest_hour
-
+from app.models import BitcoinPriceCandle, HourlyBitcoinPrice
+from app.schemas import (
+    BatchPriceItem,
+    BatchPriceRequest,
+    CandleSchema,
+    CoverageSchema,
+    CursorPage,
+    HourlyBitcoinPriceSchema,
+    LatestPriceSchema,
+    MAX_CURSOR_PAGE_SIZE,
+    PriceIndexStatsSchema,
+    PriceLookupSchema,
+    PriceStatsSchema,
+    StreamStatsSchema,
+)
+from app.analytics import METRICS, price_stats_cache
+from app.coverage import get_coverage
+from app.data_version import get_data_version
+from app.database import get_db, get_session_factory
+from app.latest_price import latest_price
+from app.minute_prices import get_minute_price
+from app.price_index import price_index
+from app.price_lookup import (
+    DEFAULT_TOLERANCE_SECONDS,
+    MAX_TOLERANCE_SECONDS,
+    get_neighbour_prices,
+    price_to_dict,
+    resolve_price,
+)
+from app.price_stream import format_sse, price_stream, stream_events
+from app.shared_series import shared_price_series
+from app.utils.export import (
+    EXPORT_COLUMNS,
+    MEDIA_TYPES,
+    ArrowStreamEncoder,
+    encode_csv,
+    encode_ndjson,
+    rows_to_dicts,
+)
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.http_cache import (
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    etag_matches,
+    hour_etag,
+    versioned_etag,
+)
+from app.utils.timestamp import (
+    round_timestamp_to_nearest_hour,
+    round_timestamp_to_nearest_minute,
+)
+from core.settings import settings
 
 router = APIRouter()
 
+EXPORT_CHUNK_SIZE = 5000
+
+# Large responses are selected as Core rows and encoded with orjson directly;
+# the response models only document them in the OpenAPI schema
+PRICE_ROW_COLUMNS = tuple(getattr(HourlyBitcoinPrice, name) for name in EXPORT_COLUMNS)
+CANDLE_FIELDS = tuple(CandleSchema.model_fields)
+CANDLE_ROW_COLUMNS = tuple(getattr(BitcoinPriceCandle, name) for name in CANDLE_FIELDS)
+
 
 # Get all Bitcoin prices
-@router.get("/", response_model=Page[HourlyBitcoinPriceSchema])
-async def get_all_prices(db: AsyncSession = Depends(get_db)):
+@router.get(
+    "/",
+    response_model=Annotated[
+        Page[HourlyBitcoinPriceSchema] | CursorPage, Field(union_mode="left_to_right")
+    ],
+)
+async def get_all_prices(
+    request: Request,
+    params: Params = Depends(),
+    pagination: Literal["page", "cursor"] = Query(
+        default="page",
+        description="`page` for page numbers, `cursor` for keyset pagination on unix_timestamp",
+    ),
+    cursor: str | None = Query(
+        default=None, description="`next_cursor` or `prev_cursor` of a previous page"
+    ),
+    limit: int = Query(
+        default=100, ge=1, le=MAX_CURSOR_PAGE_SIZE, description="Cursor page size"
+    ),
+    db: AsyncSession = Depends(get_db),
+):
     """Returns paginated hourly Bitcoin prices sorted by timestamp DESC."""
-    return await paginate(
-        db, select(HourlyBitcoinPrice).order_by(desc(HourlyBitcoinPrice.unix_timestamp))
+    position = None
+    if cursor is not None:
+        try:
+            position = decode_cursor(cursor)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+    # The page only changes when the updater bumps the data version
+    version = await get_data_version(db)
+    etag = versioned_etag(version, request.url.query)
+    cache_headers = {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers)
+
+    if pagination == "cursor" or cursor is not None:
+        page = await paginate_by_cursor(db, position, limit)
+    else:
+        page = await paginate_by_page(db, params)
+    return ORJSONResponse(page, headers=cache_headers)
+
+
+async def paginate_by_page(db: AsyncSession, params: Params) -> dict:
+    """Page-number pagination with the same fields as fastapi_pagination's `Page`."""
+    total = await db.scalar(
+        select(func.count()).select_from(HourlyBitcoinPrice.__table__)
+    )
+    raw_params = params.to_raw_params()
+    result = await db.execute(
+        select(*PRICE_ROW_COLUMNS)
+        .order_by(HourlyBitcoinPrice.unix_timestamp.desc())
+        .limit(raw_params.limit)
+        .offset(raw_params.offset)
     )
+    return {
+        "items": rows_to_dicts(result.all()),
+        "total": total,
+        "page": params.page,
+        "size": params.size,
+        "pages": ceil(total / params.size),
+    }
+
+
+async def paginate_by_cursor(
+    db: AsyncSession, position: tuple[int, str] | None, limit: int
+) -> dict:
+    """
+    Keyset pagination over the unique unix_timestamp index, starting after a decoded cursor position.
+    Fetches one extra row to know whether another page exists, so no COUNT(*) or OFFSET is needed.
+    """
+    direction = "next"
+    query = select(*PRICE_ROW_COLUMNS)
+    if position is None:
+        query = query.order_by(HourlyBitcoinPrice.unix_timestamp.desc())
+    else:
+        boundary, direction = position
+        if direction == "next":
+            query = query.where(HourlyBitcoinPrice.unix_timestamp < boundary).order_by(
+                HourlyBitcoinPrice.unix_timestamp.desc()
+            )
+        else:
+            query = query.where(HourlyBitcoinPrice.unix_timestamp > boundary).order_by(
+                HourlyBitcoinPrice.unix_timestamp.asc()
+            )
+
+    result = await db.execute(query.limit(limit + 1))
+    rows = result.all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == "prev":
+        rows.reverse()
+
+    page = {
+        "items": rows_to_dicts(rows),
+        "size": len(rows),
+        "next_cursor": None,
+        "prev_cursor": None,
+    }
+    if not rows:
+        return page
+
+    # Following a cursor means there are rows on the side we came from
+    has_older = has_more if direction == "next" else True
+    has_newer = has_more if direction == "prev" else position is not None
+    if has_older:
+        page["next_cursor"] = encode_cursor(rows[-1].unix_timestamp, "next")
+    if has_newer:
+        page["prev_cursor"] = encode_cursor(rows[0].unix_timestamp, "prev")
+    return page
 
 
 add_pagination(router)  # Enables pagination globally
 
 
+# Diagnostics for the in-process price index
+@router.get("/index/stats", response_model=PriceIndexStatsSchema)
+async def get_price_index_stats():
+    """Returns the size and staleness of the in-memory price index in use."""
+    if shared_price_series.is_attached:
+        return {"enabled": True, "shared": True, **shared_price_series.stats()}
+    return {
+        "enabled": settings.price_index_enabled,
+        "shared": False,
+        **price_index.stats(),
+    }
+
+
+# Get the current spot price from memory
+@router.get("/latest", response_model=LatestPriceSchema)
+async def get_latest_price():
+    """
+    Returns the spot price and 24h change kept fresh by the background poller.
+    `stale` is set when the last successful poll is older than three poll intervals.
+    """
+    quote = latest_price.snapshot(stale_after=3 * settings.latest_price_poll_seconds)
+    if quote is None:
+        raise HTTPException(status_code=503, detail="Latest price not available yet.")
+    return quote
+
+
+# Push spot ticks and newly closed hours to subscribers
+@router.get("/stream")
+async def stream_prices():
+    """
+    Server-sent events: a `tick` event for every new spot quote and a `candle` event
+    for every newly closed hour, starting with the current quote. Comment lines are
+    sent while idle to keep the connection open.
+    """
+
+    async def generate_events():
+        with price_stream.subscribe("sse") as subscription:
+            tick = latest_price.tick()
+            if tick is not None:
+                yield format_sse("tick", tick)
+            async for message in stream_events(
+                subscription, settings.price_stream_keepalive_seconds
+            ):
+                yield b": keepalive\n\n" if message is None else format_sse(*message)
+
+    return StreamingResponse(
+        generate_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/stream/ws")
+async def stream_prices_websocket(websocket: WebSocket):
+    """WebSocket alternative to /stream: one {"event": ..., "data": ...} JSON message per event."""
+    await websocket.accept()
+    with price_stream.subscribe("websocket") as subscription:
+        try:
+            tick = latest_price.tick()
+            if tick is not None:
+                await websocket.send_json({"event": "tick", "data": tick})
+            async for message in stream_events(
+                subscription, settings.price_stream_keepalive_seconds
+            ):
+                if message is None:
+                    await websocket.send_json({"event": "keepalive"})
+                else:
+                    event, data = message
+                    await websocket.send_json({"event": event, "data": data})
+        except WebSocketDisconnect:
+            pass
+
+
+@router.get("/stream/stats", response_model=StreamStatsSchema)
+async def get_stream_stats():
+    """Returns the number of connected stream clients and the delivery counters."""
+    return price_stream.stats()
+
+
+# Report which hours of the history are stored
+@router.get("/coverage", response_model=CoverageSchema)
+async def get_price_coverage(db: AsyncSession = Depends(get_db)):
+    """Returns the contiguous ranges of stored hours and the gaps between them."""
+    return await get_coverage(db)
+
+
+# Summary statistics between two timestamps
+@router.get(
+    "/stats",
+    response_model=PriceStatsSchema,
+    response_model_exclude_unset=True,
+)
+async def get_price_stats(
+    from_ts: int = Query(alias="from", description="Start Unix timestamp (inclusive)"),
+    to_ts: int = Query(alias="to", description="End Unix timestamp (inclusive)"),
+    metrics: list[str] = Query(
+        default=list(METRICS),
+        description=f"Any of {', '.join(METRICS)}; comma-separated or repeated",
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Computes returns, volatility, VWAP, volume and max drawdown over the stored hours in a window.
+    Window sums come from prefix sums built once per data version, so any window costs O(1)
+    except max drawdown, which scans the window's closes.
+    """
+    if from_ts > to_ts:
+        raise HTTPException(status_code=400, detail="`from` must not be after `to`.")
+    requested = {name.strip() for value in metrics for name in value.split(",")}
+    requested.discard("")
+    unknown = requested - set(METRICS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown metrics: {', '.join(sorted(unknown))}. Choose from {', '.join(METRICS)}.",
+        )
+
+    stats = await price_stats_cache.get(db)
+    start, end = stats.window(from_ts, to_ts)
+    if start == end:
+        raise HTTPException(status_code=404, detail="No price data in range.")
+    return {
+        "from_ts": from_ts,
+        "to_ts": to_ts,
+        "first_timestamp": int(stats.timestamps[start]),
+        "last_timestamp": int(stats.timestamps[end - 1]),
+        "hours": end - start,
+        **stats.compute(start, end, requested or METRICS),
+    }
+
+
+# Stream all Bitcoin prices in a time range
+@router.get("/range")
+async def export_price_range(
+    from_ts: int = Query(alias="from", description="Start Unix timestamp (inclusive)"),
+    to_ts: int = Query(alias="to", description="End Unix timestamp (inclusive)"),
+    format: Literal["ndjson", "csv", "arrow"] = "ndjson",
+    session_factory=Depends(get_session_factory),
+):
+    """Streams hourly Bitcoin prices between two timestamps sorted by timestamp ASC, using a server-side cursor."""
+    if from_ts > to_ts:
+        raise HTTPException(status_code=400, detail="`from` must not be after `to`.")
+
+    if format == "arrow":
+        try:
+            arrow_encoder = ArrowStreamEncoder()
+        except ImportError:
+            raise HTTPException(
+                status_code=501, detail="Arrow export requires pyarrow."
+            )
+
+    query = (
+        select(*(getattr(HourlyBitcoinPrice, name) for name in EXPORT_COLUMNS))
+        .where(HourlyBitcoinPrice.unix_timestamp.between(from_ts, to_ts))
+        .order_by(HourlyBitcoinPrice.unix_timestamp.asc())
+        .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+
+    async def generate_chunks():
+        if format == "csv":
+            yield encode_csv([], header=True)
+
+        async with session_factory() as session:
+            result = await session.stream(query)
+            async for rows in result.partitions():
+                if format == "ndjson":
+                    yield encode_ndjson(rows)
+                elif format == "csv":
+                    yield encode_csv(rows)
+                else:
+                    yield arrow_encoder.encode(rows)
+
+        if format == "arrow":
+            yield arrow_encoder.close()
+
+    return StreamingResponse(generate_chunks(), media_type=MEDIA_TYPES[format])
+
+
+# Get daily, weekly or monthly candles
+@router.get("/candles", response_model=list[CandleSchema])
+async def get_candles(
+    interval: Literal["1d", "1w", "1M"] = "1d",
+    from_ts: int | None = Query(
+        default=None, alias="from", description="Earliest bucket start (inclusive)"
+    ),
+    to_ts: int | None = Query(
+        default=None, alias="to", description="Latest bucket start (inclusive)"
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    """Returns pre-aggregated OHLCV candles sorted by bucket start ASC."""
+    query = select(*CANDLE_ROW_COLUMNS).where(BitcoinPriceCandle.interval == interval)
+    if from_ts is not None:
+        query = query.where(BitcoinPriceCandle.bucket_start >= from_ts)
+    if to_ts is not None:
+        query = query.where(BitcoinPriceCandle.bucket_start <= to_ts)
+
+    result = await db.execute(query.order_by(BitcoinPriceCandle.bucket_start.asc()))
+    return ORJSONResponse(rows_to_dicts(result.all(), CANDLE_FIELDS))
+
+
+# Get Bitcoin prices for many Unix timestamps at once
+@router.post("/batch", response_model=list[BatchPriceItem])
+async def get_prices_batch(
+    batch: BatchPriceRequest, db: AsyncSession = Depends(get_db)
+):
+    """
+    Rounds every timestamp to the nearest full hour and returns one item per input, in input order.
+    Items that are out of range or missing carry an error instead of failing the whole batch.
+    """
+    rounded = [round_timestamp_to_nearest_hour(ts) for ts in batch.timestamps]
+    hours = set(rounded)
+
+    memory = read_memory_index(
+        lambda index: (index.bounds(), {hour: index.lookup(hour) for hour in hours})
+    )
+    if memory is not None:
+        bounds, prices = memory
+    else:
+        bounds = await get_price_bounds(db)
+
+    errors = {}
+    for hour in hours:
+        try:
+            check_timestamp_in_range(hour, bounds)
+        except HTTPException as exc:
+            errors[hour] = exc.detail
+    hours_in_range = hours - errors.keys()
+
+    if memory is not None:
+        prices = {
+            hour: price
+            for hour, price in prices.items()
+            if hour in hours_in_range and price is not None
+        }
+    elif hours_in_range:
+        result = await db.execute(
+            select(HourlyBitcoinPrice).where(timestamp_in(db, sorted(hours_in_range)))
+        )
+        prices = {price.unix_timestamp: price for price in result.scalars()}
+    else:
+        prices = {}
+
+    items = []
+    for ts, hour in zip(batch.timestamps, rounded):
+        if hour in errors:
+            items.append(BatchPriceItem(timestamp=ts, error=errors[hour]))
+        elif hour not in prices:
+            items.append(BatchPriceItem(timestamp=ts, error="Price record not found"))
+        else:
+            price = HourlyBitcoinPriceSchema.model_validate(
+                prices[hour], from_attributes=True
+            )
+            items.append(BatchPriceItem(timestamp=ts, price=price))
+    return items
+
+
 # Get a specific Bitcoin price by Unix timestamp
-@router.get("/{unix_timestamp}", response_model=HourlyBitcoinPriceSchema)
+@router.get("/{unix_timestamp}", response_model=PriceLookupSchema)
 async def get_price_by_timestamp(
-    unix_timestamp: int, db: AsyncSession = Depends(get_db)
+    unix_timestamp: int,
+    request: Request,
+    response: Response,
+    mode: Literal["exact", "nearest", "interpolate"] = Query(
+        default="exact",
+        description="`exact`: the hour the timestamp rounds to; `nearest`: the closest "
+        "stored hour within `tolerance`; `interpolate`: the close, linear between the "
+        "stored hours around the timestamp",
+    ),
+    tolerance: int = Query(
+        default=DEFAULT_TOLERANCE_SECONDS,
+        ge=0,
+        le=MAX_TOLERANCE_SECONDS,
+        description="Seconds a stored hour may be away from the timestamp "
+        "(nearest/interpolate); 0 answers like `exact`",
+    ),
+    resolution: Literal["hour", "minute"] = Query(
+        default="hour",
+        description="`minute` answers from the minute tier when it has the minute the "
+        "timestamp rounds to (`mode` does not apply there and is reported as `exact`), "
+        "and falls back to hourly prices otherwise",
+    ),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Rounds the timestamp to the nearest full hour and returns the Bitcoin price for that hour."""
+    """
+    Rounds the timestamp to the nearest full hour and returns the Bitcoin price for that hour.
+    With `mode=nearest` or `mode=interpolate` a missing hour is filled from the stored hours
+    around the timestamp instead of failing; `mode` in the response says which was used.
+    `resolution` in the response says whether a minute or an hourly price was returned;
+    hourly answers to a minute request are never marked immutable, since the minute
+    tier may store that minute later.
+    """
+    if resolution == "minute" and settings.minute_prices_enabled:
+        price = await get_minute_price(
+            db, round_timestamp_to_nearest_minute(unix_timestamp)
+        )
+        if price is not None:
+            return {**price, "mode": "exact", "resolution": "minute"}
+
+    # With no tolerance only the rounded hour could match, so answer like exact mode
+    # (including its range check) instead of a narrower one of our own
+    if mode != "exact" and tolerance > 0:
+        return await get_price_near_timestamp(unix_timestamp, mode, tolerance, db)
 
     # Round timestamp
     rounded_timestamp = round_timestamp_to_nearest_hour(unix_timestamp)
 
+    # The ETag is only ever handed out for closed hours, which never change,
+    # so a match can be answered without looking anything up. `*` is not enough:
+    # it would answer 304 for hours that are out of range or not stored
+    immutable = resolution == "hour"
+    etag = hour_etag(rounded_timestamp)
+    if immutable and etag_matches(
+        request.headers.get("if-none-match"), etag, match_any=False
+    ):
+        return Response(
+            status_code=304,
+            headers={"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL},
+        )
+
+    # Answer from memory when an index is available (no DB round trip)
+    memory = read_memory_index(
+        lambda index: (index.bounds(), index.lookup(rounded_timestamp))
+    )
+    if memory is not None:
+        bounds, price = memory
+        check_timestamp_in_range(rounded_timestamp, bounds)
+        if price is None:
+            raise HTTPException(status_code=404, detail="Price record not found")
+        if immutable:
+            set_hour_cache_headers(response, rounded_timestamp, bounds)
+        return {**price, "mode": "exact"}
+
     # Get min and max timestamp from DB
-    min_result = await db.execute(
-        select(HourlyBitcoinPrice.unix_timestamp)
-        .order_by(HourlyBitcoinPrice.unix_timestamp.asc())
-        .limit(1)
+    bounds = await get_price_bounds(db)
+    check_timestamp_in_range(rounded_timestamp, bounds)
+
+    # Fetch price
+    result = await db.execute(
+        select(HourlyBitcoinPrice).where(
+            HourlyBitcoinPrice.unix_timestamp == rounded_timestamp
+        )
     )
-    max_result = await db.execute(
-        select(HourlyBitcoinPrice.unix_timestamp)
-        .order_by(HourlyBitcoinPrice.unix_timestamp.desc())
-        .limit(1)
+    price = result.scalars().first()
+    if price is None:
+        raise HTTPException(status_code=404, detail="Price record not found")
+    if immutable:
+        set_hour_cache_headers(response, rounded_timestamp, bounds)
+    return {**price_to_dict(price), "mode": "exact"}
+
+
+async def get_price_near_timestamp(
+    unix_timestamp: int, mode: str, tolerance: int, db: AsyncSession
+) -> dict:
+    """
+    Resolves a timestamp from the closest stored hours on either side (nearest/interpolate).
+    The answer can change when a missing hour is backfilled, so no immutable cache headers are set.
+    """
+    memory = read_memory_index(
+        lambda index: (index.bounds(), index.neighbours(unix_timestamp, tolerance))
     )
+    if memory is not None:
+        bounds, (before, after) = memory
+    else:
+        bounds = await get_price_bounds(db)
+    check_timestamp_in_range(unix_timestamp, bounds, before=tolerance, after=tolerance)
 
-    # Fetch scalars BEFORE doing anything else
-    min_scalar = min_result.scalar_one_or_none()
-    max_scalar = max_result.scalar_one_or_none()
+    if memory is None:
+        before, after = await get_neighbour_prices(db, unix_timestamp, tolerance)
 
-    # Check for None
+    resolved = resolve_price(mode, unix_timestamp, before, after)
+    if resolved is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No price record within {tolerance} seconds of the timestamp",
+        )
+    price, mode_used = resolved
+    return {**price, "mode": mode_used}
+
+
+def get_memory_index():
+    """
+    Returns the in-memory price source to answer from: the series shared by all workers,
+    else the in-process index, else None (query the database). The shared series is
+    skipped while a write to it is in progress, so requests never wait on its lock.
+    """
+    if shared_price_series.is_readable:
+        return shared_price_series
+    if price_index.is_loaded:
+        return price_index
+    return None
+
+
+def read_memory_index(read):
+    """
+    Runs `read` against the in-memory price source and returns its result, or None when
+    there is no source or the shared series stayed mid-write for every read attempt;
+    the caller answers from the database then.
+    """
+    memory_index = get_memory_index()
+    if memory_index is None:
+        return None
+    try:
+        return read(memory_index)
+    except TimeoutError:
+        return None
+
+
+def set_hour_cache_headers(
+    response: Response, rounded_timestamp: int, bounds: tuple[int, int]
+) -> None:
+    """Marks hours older than the latest stored hour as immutable."""
+    if rounded_timestamp < bounds[1]:
+        response.headers["ETag"] = hour_etag(rounded_timestamp)
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+
+
+async def get_price_bounds(db: AsyncSession) -> tuple[int, int] | None:
+    """Returns the (min, max) stored timestamps in one query, or None if the table is empty."""
+    result = await db.execute(
+        select(
+            func.min(HourlyBitcoinPrice.unix_timestamp),
+            func.max(HourlyBitcoinPrice.unix_timestamp),
+        )
+    )
+    min_scalar, max_scalar = result.one()
     if min_scalar is None or max_scalar is None:
+        return None
+    return min_scalar, max_scalar
+
+
+def check_timestamp_in_range(
+    rounded_timestamp: int,
+    bounds: tuple[int, int] | None,
+    before: int = 1800,
+    after: int = 1799,
+) -> None:
+    """
+    Raises 500 if there is no data at all and 400 if the timestamp is outside of the stored range,
+    widened by `before` seconds below the first and `after` seconds above the last stored hour.
+    """
+
+    # Check for None
+    if bounds is None:
         raise HTTPException(
             status_code=500, detail="No price data available in the database."
         )
 
-    # Only now it’s safe to compute
-    min_ts = min_scalar - 1800
-    max_ts = max_scalar + 1799
+    min_ts = bounds[0] - before
+    max_ts = bounds[1] + after
 
     if not (min_ts <= rounded_timestamp <= max_ts):
         raise HTTPException(
@@ -67,13 +654,13 @@ async def get_price_by_timestamp(
             detail=f"Timestamp out of valid range. Must be between {min_ts} and {max_ts}.",
         )
 
-    # Fetch price
-    result = await db.execute(
-        select(HourlyBitcoinPrice).where(
-            HourlyBitcoinPrice.unix_timestamp == rounded_timestamp
-        )
-    )
-    price = result.scalars().first()
-    if price is None:
-        raise HTTPException(status_code=404, detail="Price record not found")
-    return price
+
+def timestamp_in(db: AsyncSession, timestamps: list[int]):
+    """
+    Builds a `unix_timestamp IN (...)` filter.
+    On Postgres this is `= ANY(:timestamps)` with a single array parameter, so the statement is the same for any batch size.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        param = bindparam("timestamps", timestamps, type_=ARRAY(BigInteger))
+        return HourlyBitcoinPrice.unix_timestamp == any_(param)
+    return HourlyBitcoinPrice.unix_timestamp.in_(timestamps)
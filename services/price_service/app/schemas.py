@@ -1,6 +1,10 @@
-from pydantic import BaseModel
+from typing import Literal
+from pydantic import BaseModel, Field
 import datetime
 
+MAX_BATCH_SIZE = 1000
+MAX_CURSOR_PAGE_SIZE = 5000
+
 
 class HourlyBitcoinPriceSchema(BaseModel):
     unix_timestamp: int
@@ -11,5 +15,131 @@ class HourlyBitcoinPriceSchema(BaseModel):
     volumefrom: float
     volumeto: float
 
-    class Config:
-        orm_mode = True
+    model_config = {"from_attributes": True}
+
+
+class PriceLookupSchema(HourlyBitcoinPriceSchema):
+    # An interpolated price has a close only
+    high: float | None
+    low: float | None
+    open: float | None
+    volumefrom: float | None
+    volumeto: float | None
+    mode: Literal["exact", "nearest", "interpolate"] = Field(
+        description="How the price was resolved: the rounded hour, the closest stored "
+        "hour, or the close interpolated between the stored hours around the timestamp "
+        "(the other columns are null then). A minute from the minute tier is always "
+        "`exact`"
+    )
+    resolution: Literal["hour", "minute"] = Field(
+        default="hour", description="Granularity of the price that was returned"
+    )
+
+
+class CursorPage(BaseModel):
+    items: list[HourlyBitcoinPriceSchema]
+    size: int
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+class CandleSchema(BaseModel):
+    interval: str
+    bucket_start: int
+    high: float
+    low: float
+    open: float
+    close: float
+    volumefrom: float
+    volumeto: float
+    hours: int
+
+    model_config = {"from_attributes": True}
+
+
+class BatchPriceRequest(BaseModel):
+    timestamps: list[int] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class BatchPriceItem(BaseModel):
+    timestamp: int
+    price: HourlyBitcoinPriceSchema | None = None
+    error: str | None = None
+
+
+class PriceIndexStatsSchema(BaseModel):
+    enabled: bool
+    shared: bool
+    loaded: bool
+    rows: int
+    slots: int
+    memory_bytes: int
+    first_timestamp: int | None
+    last_timestamp: int | None
+    # Data version (see app/data_version.py) the index was last loaded or refreshed at
+    data_version: int | None
+    loaded_at: float | None
+    refreshed_at: float | None
+    seconds_since_refresh: float | None
+    data_lag_seconds: float | None
+
+
+class CoverageSpanSchema(BaseModel):
+    start: int
+    end: int
+    hours: int
+
+
+class CoverageSchema(BaseModel):
+    first_timestamp: int | None
+    last_timestamp: int | None
+    expected_hours: int
+    stored_hours: int
+    missing_hours: int
+    ranges: list[CoverageSpanSchema]
+    gaps: list[CoverageSpanSchema]
+
+
+class LatestPriceSchema(BaseModel):
+    price: float
+    change_24h: float
+    change_pct_24h: float
+    high_24h: float
+    low_24h: float
+    source_timestamp: int = Field(
+        description="When CryptoCompare last updated the quote"
+    )
+    last_updated: float = Field(description="When the price service fetched the quote")
+    age_seconds: float
+    stale: bool
+
+
+class StreamStatsSchema(BaseModel):
+    clients: int
+    sse_clients: int
+    websocket_clients: int
+    published: int
+    dropped: int
+    max_queue_size: int
+
+
+class PriceStatsSchema(BaseModel):
+    from_ts: int = Field(serialization_alias="from")
+    to_ts: int = Field(serialization_alias="to")
+    first_timestamp: int
+    last_timestamp: int
+    hours: int = Field(description="Stored hours in the window")
+    simple_return: float | None = None
+    log_return: float | None = None
+    volatility: float | None = Field(
+        default=None, description="Standard deviation of hourly log returns"
+    )
+    annualized_volatility: float | None = None
+    vwap: float | None = Field(
+        default=None,
+        description="Quote volume divided by volume (volumeto / volumefrom)",
+    )
+    volume: float | None = None
+    max_drawdown: float | None = Field(
+        default=None, description="Largest fall from a running high, as a fraction"
+    )
@@ -0,0 +1,475 @@
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.data_version import get_data_version
+from app.models import FIRST_VALID_TIMESTAMP
+from app.price_index import (
+    PRICE_COLUMNS,
+    SECONDS_IN_HOUR,
+    count_price_rows,
+    fetch_price_rows,
+    neighbour_slots,
+)
+from app.utils.file_lock import try_lock_file
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, every worker loads
+    fcntl = None
+
+MAGIC = b"BTCHOURS"
+LAYOUT_VERSION = 1
+# Slot i holds the hour FIRST_VALID_TIMESTAMP + i * 3600; 400k slots reach into 2056
+DEFAULT_CAPACITY_HOURS = 400_000
+HEADER_SIZE = 128
+HEADER_DTYPE = np.dtype(
+    [
+        ("magic", "S8"),
+        ("layout", "<i8"),
+        # Seqlock: odd while a writer is updating the file
+        ("version", "<u8"),
+        ("base_ts", "<i8"),
+        ("capacity", "<i8"),
+        ("row_count", "<i8"),
+        ("min_ts", "<i8"),
+        ("max_ts", "<i8"),
+        ("loaded_at", "<f8"),
+        ("refreshed_at", "<f8"),
+        # Data version (see app/data_version.py) of the last full load or refresh
+        ("data_version", "<i8"),
+    ]
+)
+# Writers hold the seqlock for at most this many hour slots at a time, so readers,
+# which run on the event loop, retry a bounded number of times without sleeping
+WRITE_CHUNK_SLOTS = 4096
+READ_ATTEMPTS = 1000
+
+
+def _present_size(capacity: int) -> int:
+    # Keep the float64 columns 8-byte aligned
+    return (capacity + 7) // 8 * 8
+
+
+def _file_size(capacity: int) -> int:
+    return HEADER_SIZE + _present_size(capacity) + 8 * capacity * len(PRICE_COLUMNS)
+
+
+@contextmanager
+def _locked(file):
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+class SharedPriceSeries:
+    """
+    The hourly price series in a memory-mapped file shared by every worker process.
+
+    The file holds a fixed header followed by a presence mask and one float64 column
+    per price field, each indexed by hour offset from FIRST_VALID_TIMESTAMP, so workers
+    map it read-only and look hours up without copying. One worker (the loader) fills
+    the file from the database and keeps it in step with the table; writers take an
+    exclusive flock and make the header's version odd while they write. Readers retry
+    until they see the same even version before and after reading, so they never
+    observe a half written update and pick up new hours without remapping.
+
+    If the loader process dies, another worker takes the role over on its next
+    refresh tick (see run_refresher()).
+    """
+
+    def __init__(self):
+        self.path: str | None = None
+        self.writable = False
+        self._file = None
+        self._loader_file = None
+        self._map = None
+        self._header = None
+        self.present = np.empty(0, dtype=bool)
+        self.columns = {name: np.empty(0, dtype=np.float64) for name in PRICE_COLUMNS}
+
+    def attach(
+        self,
+        path: str,
+        writable: bool = False,
+        capacity: int = DEFAULT_CAPACITY_HOURS,
+    ):
+        """
+        Maps the file, creating it with `capacity` empty hour slots if it does not exist yet.
+
+        Raises:
+            ValueError: If the file exists but is not a shared price series.
+        """
+        self._unmap()
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        with open(fd, "r+b") as f, _locked(f):
+            if os.fstat(f.fileno()).st_size == 0:
+                f.truncate(_file_size(capacity))
+                header = np.zeros(1, dtype=HEADER_DTYPE)
+                header["magic"] = MAGIC
+                header["layout"] = LAYOUT_VERSION
+                header["base_ts"] = FIRST_VALID_TIMESTAMP
+                header["capacity"] = capacity
+                header["min_ts"] = header["max_ts"] = -1
+                f.seek(0)
+                f.write(header.tobytes())
+
+        self._file = open(path, "r+b" if writable else "rb")
+        self._map = np.memmap(
+            self._file, dtype=np.uint8, mode="r+" if writable else "r"
+        )
+        self._header = self._map[: HEADER_DTYPE.itemsize].view(HEADER_DTYPE)
+        if (
+            self._header["magic"][0] != MAGIC
+            or self._header["layout"][0] != LAYOUT_VERSION
+        ):
+            self._unmap()
+            raise ValueError(f"{path} is not a shared price series")
+
+        capacity = int(self._header["capacity"][0])
+        offset = HEADER_SIZE
+        self.present = self._map[offset : offset + capacity].view(np.bool_)
+        offset += _present_size(capacity)
+        for name in PRICE_COLUMNS:
+            self.columns[name] = self._map[offset : offset + 8 * capacity].view("<f8")
+            offset += 8 * capacity
+        self.path = path
+        self.writable = writable
+
+        if writable:
+            with _locked(self._file):
+                self._recover()
+
+    def detach(self):
+        """Unmaps the file and gives up the loader role."""
+        self._unmap()
+        if self._loader_file is not None:
+            self._loader_file.close()
+            self._loader_file = None
+
+    def _unmap(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = self._map = self._header = None
+        self.present = np.empty(0, dtype=bool)
+        self.columns = {name: np.empty(0, dtype=np.float64) for name in PRICE_COLUMNS}
+        self.path = None
+        self.writable = False
+
+    def try_become_loader(self, path: str) -> bool:
+        """
+        Makes this process the one that loads and refreshes the file at `path`, if no
+        other process is. The role is held until detach() or process exit, so a worker
+        can call this again later to take over from a loader that died.
+        """
+        if self._loader_file is None:
+            self._loader_file = try_lock_file(f"{path}.loader")
+        return self._loader_file is not None
+
+    @property
+    def is_attached(self) -> bool:
+        return self._map is not None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.is_attached and bool(self._header["loaded_at"][0] > 0)
+
+    @property
+    def is_readable(self) -> bool:
+        """Loaded and not being written right now; callers query the database otherwise."""
+        return self.is_loaded and self.version % 2 == 0
+
+    @property
+    def version(self) -> int:
+        return int(self._header["version"][0])
+
+    def _read(self, read):
+        for _ in range(READ_ATTEMPTS):
+            before = self.version
+            if before % 2 == 0:
+                result = read()
+                if self.version == before:
+                    return result
+        raise TimeoutError(f"{self.path} is being written")
+
+    def _recover(self):
+        # Called with the file lock held. Writers hold the lock while the version is
+        # odd, so an odd version here means one died mid-update: make it even again
+        # and mark the file unloaded, since the slots it was writing may be torn.
+        # Readers fall back to the database until the loader reloads it
+        if self._header["version"][0] % 2:
+            self._header["version"] += 1
+            self._header["loaded_at"] = 0
+
+    @contextmanager
+    def _writing(self):
+        if not self.writable:
+            raise PermissionError("The shared price series is attached read-only")
+        with _locked(self._file):
+            self._recover()
+            self._header["version"] += 1
+            try:
+                yield
+            finally:
+                self._header["version"] += 1
+
+    def append(
+        self,
+        rows,
+        loaded: bool = False,
+        replace: bool = False,
+        data_version: int | None = None,
+    ) -> int:
+        """
+        Writes rows into their hour slots and bumps the version. Hours anywhere in the
+        file can be written, not only ones after the newest stored hour.
+
+        Args:
+            rows: (unix_timestamp, high, low, open, close, volumefrom, volumeto) tuples.
+                Timestamps that are not full hours are skipped.
+            loaded (bool): Mark the file as fully loaded (used by the loader after load()).
+            replace (bool): The rows are the whole table: clear every other slot.
+            data_version (int | None): The data version the rows were read at.
+
+        Returns:
+            int: The number of hours that were not stored before.
+
+        Raises:
+            ValueError: If an hour lies beyond the file's capacity.
+        """
+        rows = list(rows)
+        timestamps = np.fromiter((row[0] for row in rows), np.int64, len(rows))
+        values = np.array([row[1:] for row in rows], dtype=np.float64).reshape(
+            len(rows), len(PRICE_COLUMNS)
+        )
+        keep = timestamps % SECONDS_IN_HOUR == 0
+        timestamps, values = timestamps[keep], values[keep]
+
+        base_ts = int(self._header["base_ts"][0])
+        slots = (timestamps - base_ts) // SECONDS_IN_HOUR
+        keep = slots >= 0
+        timestamps, values, slots = timestamps[keep], values[keep], slots[keep]
+        if slots.size and slots.max() >= self.present.size:
+            raise ValueError("The shared price series is full; recreate it larger")
+
+        new_rows = 0
+        # Large writes go in chunks; the last (or only, possibly empty) chunk also
+        # updates the header
+        starts = range(0, max(slots.size, 1), WRITE_CHUNK_SLOTS)
+        for start in starts:
+            chunk = slots[start : start + WRITE_CHUNK_SLOTS]
+            with self._writing():
+                new_rows += int(np.count_nonzero(~self.present[chunk]))
+                for i, name in enumerate(PRICE_COLUMNS):
+                    self.columns[name][chunk] = values[start : start + chunk.size, i]
+                self.present[chunk] = True
+                if start == starts[-1]:
+                    self._update_header(
+                        timestamps, slots, new_rows, loaded, replace, data_version
+                    )
+        return new_rows
+
+    def _update_header(
+        self, timestamps, slots, new_rows, loaded, replace, data_version
+    ):
+        header = self._header
+        if replace:
+            stale = self.present.copy()
+            stale[slots] = False
+            self.present[stale] = False
+            stored = np.flatnonzero(self.present)
+            base_ts = int(header["base_ts"][0])
+            header["row_count"] = stored.size
+            header["min_ts"] = header["max_ts"] = -1
+            if stored.size:
+                header["min_ts"] = base_ts + int(stored[0]) * SECONDS_IN_HOUR
+                header["max_ts"] = base_ts + int(stored[-1]) * SECONDS_IN_HOUR
+        elif timestamps.size:
+            header["row_count"] += new_rows
+            low, high = int(timestamps.min()), int(timestamps.max())
+            if header["min_ts"][0] < 0 or low < header["min_ts"][0]:
+                header["min_ts"] = low
+            header["max_ts"] = max(int(header["max_ts"][0]), high)
+        now = time.time()
+        header["refreshed_at"] = now
+        if data_version is not None:
+            header["data_version"] = data_version
+        if loaded:
+            header["loaded_at"] = now
+
+    async def load(self, session: AsyncSession) -> int:
+        """
+        Writes every stored hour into the file, clears hours that are no longer stored
+        and marks it loaded; returns the row count.
+        """
+        # Read the version first: rows committed in between are picked up by the next refresh
+        version = await get_data_version(session)
+        rows = await fetch_price_rows(session)
+        self.append(rows, loaded=True, replace=True, data_version=version)
+        return len(rows)
+
+    async def refresh(self, session: AsyncSession) -> int:
+        """
+        Appends hours stored after the newest hour in the file. If the data version has
+        changed and the table no longer holds as many rows as the file, hours were
+        stored inside the file's range (backfill, gap repair, imports, downsampling) or
+        removed, and the file is reloaded.
+
+        Returns:
+            int: The number of rows added (negative if rows were removed).
+        """
+        if not self.is_loaded:
+            return await self.load(session)
+        header = self._header
+        rows_before = int(header["row_count"][0])
+        version = await get_data_version(session)
+        rows = await fetch_price_rows(session, after=int(header["max_ts"][0]))
+        self.append(rows)
+        if (
+            version != header["data_version"][0]
+            and await count_price_rows(session) != header["row_count"][0]
+        ):
+            await self.load(session)
+        self.append([], data_version=version)
+        return int(header["row_count"][0]) - rows_before
+
+    async def run_refresher(self, session_factory, interval: float):
+        """
+        Refreshes the file every `interval` seconds until cancelled. A worker attached
+        read-only tries to become the loader on every tick instead, so the file keeps
+        being refreshed when the loader process dies.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not self.writable:
+                    path = self.path
+                    if not self.try_become_loader(path):
+                        continue
+                    self.attach(path, writable=True)
+                    print("Shared price series: took over as loader")
+                async with session_factory() as session:
+                    added = await self.refresh(session)
+                if added:
+                    print(f"Shared price series refreshed: {added} new rows")
+            except Exception as e:
+                print(f"Shared price series refresh failed: {e}")
+
+    def bounds(self) -> tuple[int, int] | None:
+        """Returns the (min, max) stored timestamps, or None if the series is empty."""
+
+        def read():
+            if self._header["row_count"][0] == 0:
+                return None
+            return int(self._header["min_ts"][0]), int(self._header["max_ts"][0])
+
+        return self._read(read)
+
+    def lookup(self, unix_timestamp: int) -> dict | None:
+        """
+        Returns the stored row for an exact hourly timestamp.
+
+        Args:
+            unix_timestamp (int): A timestamp already rounded to the hour.
+
+        Returns:
+            dict | None: The row as a dict, or None if the hour is not stored.
+        """
+        offset = unix_timestamp - int(self._header["base_ts"][0])
+        slot = offset // SECONDS_IN_HOUR
+        if offset % SECONDS_IN_HOUR or not 0 <= slot < self.present.size:
+            return None
+
+        def read():
+            if not self.present[slot]:
+                return None
+            return self._row(slot)
+
+        return self._read(read)
+
+    def neighbours(
+        self, unix_timestamp: int, max_distance: int
+    ) -> tuple[dict | None, dict | None]:
+        """
+        Returns the stored rows at or before and at or after any timestamp, each None if
+        there is no stored hour within max_distance seconds on that side.
+        """
+        offset = unix_timestamp - int(self._header["base_ts"][0])
+
+        def read():
+            slots = neighbour_slots(self.present, offset, max_distance)
+            return tuple(
+                self._row(slot) if slot is not None else None for slot in slots
+            )
+
+        return self._read(read)
+
+    def _row(self, slot: int) -> dict:
+        row = {
+            "unix_timestamp": int(self._header["base_ts"][0]) + slot * SECONDS_IN_HOUR
+        }
+        for name in PRICE_COLUMNS:
+            row[name] = float(self.columns[name][slot])
+        return row
+
+    def stats(self) -> dict:
+        """Returns size and staleness diagnostics, like PriceIndex.stats()."""
+
+        def read():
+            header = self._header[0]
+            return {
+                "rows": int(header["row_count"]),
+                "min_ts": int(header["min_ts"]),
+                "max_ts": int(header["max_ts"]),
+                "data_version": int(header["data_version"]),
+                "loaded_at": float(header["loaded_at"]) or None,
+                "refreshed_at": float(header["refreshed_at"]) or None,
+            }
+
+        now = time.time()
+        header = self._read(read)
+        has_rows = header["rows"] > 0
+        return {
+            "loaded": self.is_loaded,
+            "rows": header["rows"],
+            "slots": int(self.present.size),
+            "memory_bytes": int(self._map.size),
+            "first_timestamp": header["min_ts"] if has_rows else None,
+            "last_timestamp": header["max_ts"] if has_rows else None,
+            "data_version": header["data_version"] if header["loaded_at"] else None,
+            "loaded_at": header["loaded_at"],
+            "refreshed_at": header["refreshed_at"],
+            "seconds_since_refresh": (
+                now - header["refreshed_at"] if header["refreshed_at"] else None
+            ),
+            "data_lag_seconds": now - header["max_ts"] if has_rows else None,
+        }
+
+
+def append_to_shared_series(path: str, rows) -> int:
+    """
+    Appends rows to an existing shared price series file (used by the updater).
+
+    Returns:
+        int: The number of hours added, or 0 if the file does not exist.
+    """
+    if not os.path.exists(path):
+        return 0
+    series = SharedPriceSeries()
+    series.attach(path, writable=True)
+    try:
+        return series.append(rows)
+    finally:
+        series.detach()
+
+
+shared_price_series = SharedPriceSeries()
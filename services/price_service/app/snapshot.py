@@ -0,0 +1,119 @@
+import os
+import time
+from typing import Callable
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+from app.ingest import bulk_load_price_rows, record_new_hours
+from app.models import HourlyBitcoinPrice
+from app.utils.export import EXPORT_COLUMNS
+
+# One little-endian record per hour: int64 timestamp followed by float64 OHLCV
+SNAPSHOT_DTYPE = np.dtype(
+    [("unix_timestamp", "<i8")] + [(name, "<f8") for name in EXPORT_COLUMNS[1:]]
+)
+SNAPSHOT_CHUNK_SIZE = 50_000
+
+
+class SnapshotError(ValueError):
+    """Raised when a file is not a price snapshot."""
+
+
+async def export_snapshot(
+    session: AsyncSession, path, chunk_size: int = SNAPSHOT_CHUNK_SIZE
+) -> int:
+    """
+    Dumps hourly_bitcoin_prices, sorted by timestamp ASC, to a `.npy` file of SNAPSHOT_DTYPE records.
+
+    The file is written next to `path` and renamed into place, so readers never see a
+    partial snapshot.
+
+    Returns:
+        int: The number of rows written.
+    """
+    query = (
+        select(*(getattr(HourlyBitcoinPrice, name) for name in EXPORT_COLUMNS))
+        .order_by(HourlyBitcoinPrice.unix_timestamp.asc())
+        .execution_options(yield_per=chunk_size)
+    )
+    chunks = []
+    result = await session.stream(query)
+    async for rows in result.partitions():
+        chunks.append(np.array([tuple(row) for row in rows], dtype=SNAPSHOT_DTYPE))
+    snapshot = np.concatenate(chunks) if chunks else np.empty(0, SNAPSHOT_DTYPE)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, snapshot)
+    os.replace(tmp_path, path)
+    return snapshot.size
+
+
+def load_snapshot(path, mmap: bool = True) -> np.ndarray:
+    """
+    Opens a snapshot written by export_snapshot.
+
+    Args:
+        path: The `.npy` file.
+        mmap (bool): Memory-map the file read-only instead of reading it into memory.
+
+    Returns:
+        np.ndarray: A structured array of SNAPSHOT_DTYPE records sorted by unix_timestamp.
+
+    Raises:
+        SnapshotError: If the file holds anything else.
+    """
+    try:
+        snapshot = np.load(path, mmap_mode="r" if mmap else None, allow_pickle=False)
+    except ValueError as e:
+        raise SnapshotError(f"Not a price snapshot: {e}") from e
+    if snapshot.dtype != SNAPSHOT_DTYPE or snapshot.ndim != 1:
+        raise SnapshotError(
+            f"Not a price snapshot: dtype {snapshot.dtype}, shape {snapshot.shape}"
+        )
+    return snapshot
+
+
+async def import_snapshot(
+    session_factory: sessionmaker,
+    path,
+    chunk_size: int = SNAPSHOT_CHUNK_SIZE,
+    on_chunk_done: Callable[[dict], None] | None = None,
+) -> dict:
+    """
+    Restores a snapshot into hourly_bitcoin_prices, one transaction per chunk.
+
+    Chunks go through bulk_load_price_rows (binary COPY + merge on Postgres), so hours that
+    are already stored are skipped; rollups and the data version are updated per chunk.
+
+    Returns:
+        dict: rows, inserted, skipped, seconds and rows_per_second.
+    """
+    snapshot = load_snapshot(path)
+
+    started = time.perf_counter()
+    report = {
+        "rows": 0,
+        "inserted": 0,
+        "skipped": 0,
+        "seconds": 0.0,
+        "rows_per_second": 0.0,
+    }
+    async with session_factory() as session:
+        for start in range(0, snapshot.size, chunk_size):
+            chunk = snapshot[start : start + chunk_size]
+            inserted = await bulk_load_price_rows(session, chunk.tolist())
+            await record_new_hours(session, inserted)
+            await session.commit()
+
+            report["rows"] += chunk.size
+            report["inserted"] += len(inserted)
+            report["skipped"] = report["rows"] - report["inserted"]
+            report["seconds"] = time.perf_counter() - started
+            report["rows_per_second"] = report["rows"] / max(report["seconds"], 1e-9)
+            if on_chunk_done:
+                on_chunk_done(report)
+    return report
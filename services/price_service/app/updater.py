@@ -0,0 +1,338 @@
+import asyncio
+import random
+import time
+
+import aiohttp
+from aiohttp import web
+from sqlalchemy import func
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+from app.cryptocompare import MAX_HISTOHOUR_LIMIT, fetch_histohour
+from app.ingest import (
+    insert_hourly_prices,
+    insert_hourly_prices_row_by_row,
+    record_new_hours,
+    record_to_row,
+)
+from app.minute_prices import downsample_old_minutes, update_minute_prices
+from app.models import HourlyBitcoinPrice
+from app.shared_series import append_to_shared_series
+from app.utils.timestamp import round_timestamp_down_to_hour
+from core.settings import settings
+
+SECONDS_IN_HOUR = 3600
+
+
+async def get_latest_stored_hour(session) -> int | None:
+    result = await session.execute(select(func.max(HourlyBitcoinPrice.unix_timestamp)))
+    return result.scalar()
+
+
+async def fetch_missing_hours(
+    http_session: aiohttp.ClientSession,
+    latest_ts: int,
+    current_hour: int,
+    base_url: str | None = None,
+) -> list[dict]:
+    """
+    Fetches the closed hours after `latest_ts`, paging back from `current_hour`.
+
+    Args:
+        latest_ts (int): The newest stored hour.
+        current_hour (int): The start of the hour that is still open (never returned).
+
+    Returns:
+        list[dict]: CryptoCompare histohour records sorted by time ASC.
+    """
+    total_hours = (current_hour - latest_ts) // SECONDS_IN_HOUR - 1
+    if total_hours <= 0:
+        return []
+
+    all_data = []
+    to_ts = current_hour
+    while total_hours > 0:
+        limit = min(MAX_HISTOHOUR_LIMIT, total_hours)
+        batch = await fetch_histohour(
+            http_session, to_ts=to_ts, limit=limit, base_url=base_url
+        )
+
+        # If the API returns fewer records than requested, stop
+        if not batch:
+            break
+
+        # If we expect more data after this batch, exclude last (toTs is inclusive)
+        if total_hours > limit:
+            all_data = batch[:-1] + all_data
+            to_ts = batch[0]["time"] - 1
+        else:
+            all_data = batch + all_data
+            break
+
+        total_hours -= limit
+
+    # The current hour is still open
+    return [r for r in all_data if latest_ts < r["time"] < current_hour]
+
+
+async def store_new_hours(session, records: list[dict], saved_timestamps=None) -> dict:
+    """
+    Inserts fetched records (unless `saved_timestamps` says they were already saved),
+    refreshes the candles they touch, commits, and appends them to the shared series.
+
+    Returns:
+        dict: inserted, skipped, candles and appended (rows added to the shared series).
+    """
+    if saved_timestamps is None:
+        saved_timestamps = await insert_hourly_prices(session, records)
+
+    # Refresh the daily/weekly/monthly candles touched by the new hours
+    candles = await record_new_hours(session, saved_timestamps)
+    await session.commit()
+
+    # Workers sharing a memory-mapped series on this host see the hours right away
+    appended = 0
+    if settings.shared_price_series_path and saved_timestamps:
+        saved = set(saved_timestamps)
+        appended = append_to_shared_series(
+            settings.shared_price_series_path,
+            (tuple(record_to_row(r).values()) for r in records if r["time"] in saved),
+        )
+    return {
+        "inserted": len(saved_timestamps),
+        "skipped": len(records) - len(saved_timestamps),
+        "candles": candles,
+        "appended": appended,
+    }
+
+
+async def update_prices(
+    session_factory: sessionmaker,
+    http_session: aiohttp.ClientSession,
+    now: float | None = None,
+    base_url: str | None = None,
+    row_by_row: bool = False,
+) -> dict:
+    """
+    Fetches and stores every closed hour newer than the latest stored one.
+    `row_by_row` inserts and commits one record at a time (diagnostics only).
+
+    Returns:
+        dict: missing (hours requested), inserted, skipped, candles, appended and
+        latest_hour (the newest stored hour afterwards, None if the table is empty).
+
+    Raises:
+        LookupError: If the table is empty; fill it with a backfill first.
+    """
+    current_hour = round_timestamp_down_to_hour(int(now or time.time()))
+    async with session_factory() as session:
+        latest_ts = await get_latest_stored_hour(session)
+        if latest_ts is None:
+            raise LookupError("No hourly prices stored yet; run a backfill first")
+
+        missing = max((current_hour - latest_ts) // SECONDS_IN_HOUR - 1, 0)
+        records = await fetch_missing_hours(
+            http_session, latest_ts, current_hour, base_url=base_url
+        )
+        saved_timestamps = None
+        if row_by_row:
+            saved_timestamps = await insert_hourly_prices_row_by_row(session, records)
+        report = await store_new_hours(session, records, saved_timestamps)
+        report["latest_hour"] = await get_latest_stored_hour(session)
+    return {"missing": missing, **report}
+
+
+class UpdaterDaemon:
+    """
+    Keeps the price table current from a single long-running process.
+
+    One HTTP session (and the engine's connection pool) stays open for the life of the
+    daemon. A run is scheduled `delay` seconds after every hour boundary, once
+    CryptoCompare has closed the hour. Failed runs are retried with exponential
+    backoff and full jitter until one succeeds; any run catches up on every missing
+    hour, so retries never lose data.
+
+    With `minute_retention_days` set, every run also fills the minute tier and
+    downsamples minutes past the retention period into the hourly table.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        delay: float = 5.0,
+        retry_base: float = 2.0,
+        retry_max: float = 300.0,
+        base_url: str | None = None,
+        minute_retention_days: int | None = None,
+    ):
+        self.session_factory = session_factory
+        self.delay = delay
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.base_url = base_url
+        self.minute_retention_days = minute_retention_days
+        self.last_minute_report: dict | None = None
+        self.started_at: float | None = None
+        self.runs = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_attempt_at: float | None = None
+        self.last_success_at: float | None = None
+        self.last_error: str | None = None
+        self.last_report: dict | None = None
+        self.latest_hour: int | None = None
+        self.next_run_at: float | None = None
+
+    def next_run_after(self, now: float) -> float:
+        """Returns the time of the first scheduled run after `now`."""
+        return round_timestamp_down_to_hour(int(now)) + SECONDS_IN_HOUR + self.delay
+
+    def backoff(self, attempt: int) -> float:
+        """Returns a random delay of up to retry_base * 2**attempt seconds, capped at retry_max."""
+        return random.uniform(0, min(self.retry_max, self.retry_base * 2**attempt))
+
+    async def run_once(self, http_session: aiohttp.ClientSession) -> dict:
+        """Runs one update and records its outcome; exceptions are re-raised."""
+        self.runs += 1
+        self.last_attempt_at = time.time()
+        try:
+            report = await update_prices(
+                self.session_factory, http_session, base_url=self.base_url
+            )
+        except Exception as e:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            raise
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.last_success_at = time.time()
+        self.last_report = report
+        self.latest_hour = report["latest_hour"]
+        return report
+
+    async def run_until_success(self, http_session: aiohttp.ClientSession) -> dict:
+        attempt = 0
+        while True:
+            try:
+                return await self.run_once(http_session)
+            except Exception as e:
+                delay = self.backoff(attempt)
+                print(f"Update failed ({e}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def run(self):
+        """Catches up once, then updates after every hour boundary until cancelled."""
+        self.started_at = time.time()
+        async with aiohttp.ClientSession() as http_session:
+            while True:
+                report = await self.run_until_success(http_session)
+                print(
+                    f"Inserted {report['inserted']} rows, skipped {report['skipped']}, "
+                    f"updated {report['candles']} candles"
+                )
+                if self.minute_retention_days:
+                    await self.update_minute_tier(http_session)
+                self.next_run_at = self.next_run_after(time.time())
+                await asyncio.sleep(max(self.next_run_at - time.time(), 0))
+
+    async def update_minute_tier(self, http_session: aiohttp.ClientSession):
+        """Fills and trims the minute tier; failures are reported but do not retry."""
+        try:
+            report = await update_minute_prices(
+                self.session_factory,
+                http_session,
+                self.minute_retention_days,
+                base_url=self.base_url,
+            )
+            async with self.session_factory() as session:
+                report["downsampled"] = await downsample_old_minutes(
+                    session, self.minute_retention_days
+                )
+                await session.commit()
+        except Exception as e:
+            print(f"Minute tier update failed: {e}")
+            return
+        self.last_minute_report = report
+        print(
+            f"Inserted {report['inserted']} minutes, "
+            f"downsampled {report['downsampled']['minutes']} old minutes"
+        )
+
+    def metrics(self, now: float | None = None) -> dict:
+        """
+        Returns liveness and freshness figures.
+
+        `lag_seconds` is the time since the newest stored hour closed; it stays below an
+        hour plus `delay` while the daemon keeps up.
+        """
+        now = now or time.time()
+        return {
+            "started_at": self.started_at,
+            "uptime_seconds": now - self.started_at if self.started_at else None,
+            "runs": self.runs,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "last_attempt_at": self.last_attempt_at,
+            "last_success_at": self.last_success_at,
+            "seconds_since_success": (
+                now - self.last_success_at if self.last_success_at else None
+            ),
+            "last_error": self.last_error,
+            "latest_hour": self.latest_hour,
+            "lag_seconds": (
+                now - (self.latest_hour + SECONDS_IN_HOUR)
+                if self.latest_hour is not None
+                else None
+            ),
+            "next_run_at": self.next_run_at,
+            "last_report": self.last_report,
+            "last_minute_report": self.last_minute_report,
+        }
+
+
+def create_health_app(
+    daemon: UpdaterDaemon, task: asyncio.Task, max_lag_seconds: float
+) -> web.Application:
+    """
+    HTTP endpoints for the platform and for monitoring:
+    GET /health answers 200 while the update loop is running (503 once it has died),
+    GET /metrics returns UpdaterDaemon.metrics() plus `stale` (lag above max_lag_seconds).
+    """
+
+    async def health(request):
+        alive = not task.done()
+        return web.json_response(
+            {"status": "ok" if alive else "stopped"}, status=200 if alive else 503
+        )
+
+    async def metrics(request):
+        data = daemon.metrics()
+        data["alive"] = not task.done()
+        data["stale"] = data["lag_seconds"] is None or data["lag_seconds"] > (
+            max_lag_seconds
+        )
+        return web.json_response(data)
+
+    app = web.Application()
+    app.router.add_get("/health", health)
+    app.router.add_get("/metrics", metrics)
+    return app
+
+
+async def run_daemon(
+    daemon: UpdaterDaemon, host: str, port: int, max_lag_seconds: float
+):
+    """Runs the daemon and its health server until cancelled or the loop dies."""
+    task = asyncio.create_task(daemon.run())
+    runner = web.AppRunner(create_health_app(daemon, task, max_lag_seconds))
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    print(f"Updater health server listening on {host}:{port}")
+    try:
+        await task
+    finally:
+        task.cancel()
+        await runner.cleanup()
@@ -0,0 +1,43 @@
+import base64
+import binascii
+import json
+
+
+def encode_cursor(unix_timestamp: int, direction: str) -> str:
+    """
+    Encodes a keyset pagination position into an opaque, URL-safe cursor.
+
+    Args:
+        unix_timestamp (int): The timestamp of the boundary row.
+        direction (str): "next" (older rows) or "prev" (newer rows).
+
+    Returns:
+        str: The cursor string.
+    """
+    payload = json.dumps({"ts": unix_timestamp, "dir": direction}).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[int, str]:
+    """
+    Decodes a cursor created by encode_cursor.
+
+    Args:
+        cursor (str): The cursor string.
+
+    Returns:
+        tuple[int, str]: The boundary timestamp and the direction.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        unix_timestamp, direction = int(payload["ts"]), payload["dir"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor.")
+
+    if direction not in ("next", "prev"):
+        raise ValueError("Invalid cursor.")
+    return unix_timestamp, direction
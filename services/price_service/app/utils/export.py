@@ -0,0 +1,113 @@
+import csv
+import io
+
+import orjson
+
+EXPORT_COLUMNS = (
+    "unix_timestamp",
+    "high",
+    "low",
+    "open",
+    "close",
+    "volumefrom",
+    "volumeto",
+)
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+def rows_to_dicts(rows, columns=EXPORT_COLUMNS) -> list[dict]:
+    """
+    Turns Core result rows into JSON-ready dicts without building Pydantic models.
+
+    Args:
+        rows: Sequence of tuples ordered like `columns`.
+        columns: The key for each tuple position.
+
+    Returns:
+        list[dict]: One dict per row, keyed like the response schema.
+    """
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def encode_ndjson(rows) -> bytes:
+    """
+    Encodes rows as newline-delimited JSON.
+
+    Args:
+        rows: Sequence of tuples ordered like EXPORT_COLUMNS.
+
+    Returns:
+        bytes: One JSON object per row, each terminated by a newline.
+    """
+    return b"".join(
+        orjson.dumps(dict(zip(EXPORT_COLUMNS, row)), option=orjson.OPT_APPEND_NEWLINE)
+        for row in rows
+    )
+
+
+def encode_csv(rows, header: bool = False) -> bytes:
+    """
+    Encodes rows as CSV.
+
+    Args:
+        rows: Sequence of tuples ordered like EXPORT_COLUMNS.
+        header (bool): Whether to prepend the column names.
+
+    Returns:
+        bytes: The CSV lines.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+class ArrowStreamEncoder:
+    """
+    Encodes rows as an Arrow IPC stream, one record batch per chunk.
+
+    pyarrow is imported lazily so the service still starts without it; only the
+    Arrow export format needs it.
+    """
+
+    def __init__(self):
+        import pyarrow as pa
+
+        self._pa = pa
+        self._schema = pa.schema(
+            [("unix_timestamp", pa.int64())]
+            + [(name, pa.float64()) for name in EXPORT_COLUMNS[1:]]
+        )
+        self._sink = io.BytesIO()
+        self._writer = pa.ipc.new_stream(self._sink, self._schema)
+
+    def _drain(self) -> bytes:
+        data = self._sink.getvalue()
+        self._sink.seek(0)
+        self._sink.truncate()
+        return data
+
+    def encode(self, rows) -> bytes:
+        """Returns the bytes of one record batch (the stream header is included in the first one)."""
+        columns = list(zip(*rows)) if rows else [()] * len(EXPORT_COLUMNS)
+        batch = self._pa.record_batch(
+            [
+                self._pa.array(column, type=field.type)
+                for column, field in zip(columns, self._schema)
+            ],
+            schema=self._schema,
+        )
+        self._writer.write_batch(batch)
+        return self._drain()
+
+    def close(self) -> bytes:
+        """Returns the end-of-stream marker."""
+        self._writer.close()
+        return self._drain()
@@ -0,0 +1,26 @@
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks
+    fcntl = None
+
+
+def try_lock_file(path: str):
+    """
+    Takes an exclusive, non-blocking advisory lock on a file, creating it if needed.
+
+    Args:
+        path (str): The lock file.
+
+    Returns:
+        The open file holding the lock (closing it or exiting the process releases the
+        lock), or None if another process holds it. Without fcntl (Windows) every
+        caller gets the lock.
+    """
+    lock_file = open(path, "a+b")
+    if fcntl is not None:
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return None
+    return lock_file
@@ -0,0 +1,56 @@
+import hashlib
+
+# Closed hourly candles never change
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Cacheable, but must be revalidated with If-None-Match on every use
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+
+def hour_etag(unix_timestamp: int) -> str:
+    """
+    Returns the strong ETag of a closed hourly candle.
+
+    Args:
+        unix_timestamp (int): The rounded hour.
+
+    Returns:
+        str: The quoted ETag.
+    """
+    return f'"hour-{unix_timestamp}"'
+
+
+def versioned_etag(version: int, query_string: str) -> str:
+    """
+    Returns a strong ETag for a response that depends on the data version and the request's query.
+
+    Args:
+        version (int): The data version counter.
+        query_string (str): The raw query string of the request.
+
+    Returns:
+        str: The quoted ETag.
+    """
+    params = "&".join(sorted(query_string.split("&")))
+    digest = hashlib.sha1(params.encode()).hexdigest()[:16]
+    return f'"v{version}-{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str, match_any: bool = True) -> bool:
+    """
+    Checks an If-None-Match header against an ETag (weak comparison, as RFC 9110 requires for If-None-Match).
+
+    Args:
+        if_none_match (str | None): The raw header value.
+        etag (str): The quoted ETag of the current representation.
+        match_any (bool): Whether `*` matches. Pass False when the resource has not been
+            looked up, since `*` only matches a representation that exists.
+
+    Returns:
+        bool: True if the client already has this representation.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return match_any
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
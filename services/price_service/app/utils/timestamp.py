@@ -33,3 +33,23 @@ def round_timestamp_down_to_hour(unix_timestamp: int) -> int:
     """
     SECONDS_IN_HOUR = 3600
     return unix_timestamp - (unix_timestamp % SECONDS_IN_HOUR)
+
+
+def round_timestamp_to_nearest_minute(unix_timestamp: int) -> int:
+    """
+    Rounds a given Unix timestamp to the nearest minute.
+
+    Args:
+        unix_timestamp (int): The Unix timestamp (epoch) to round.
+
+    Returns:
+        int: The Unix timestamp rounded to the nearest minute. 29 seconds or less round down, 30 seconds or above round up.
+    """
+    SECONDS_IN_MINUTE = 60
+    HALF_MINUTE = 30
+
+    remainder = unix_timestamp % SECONDS_IN_MINUTE
+    if remainder < HALF_MINUTE:
+        return unix_timestamp - remainder
+    else:
+        return unix_timestamp + (SECONDS_IN_MINUTE - remainder)
@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from typing import Optional
 import os
+import tempfile
 
 
 class Settings(BaseSettings):
@@ -11,6 +12,46 @@ class Settings(BaseSettings):
     postgres_host: Optional[str] = "localhost"
     postgres_port: Optional[int] = 5432
 
+    # CryptoCompare API (overridable so tests can point at a local stand-in)
+    cryptocompare_base_url: str = "https://min-api.cryptocompare.com"
+    cryptocompare_api_key: Optional[str] = None
+
+    # Spot price poller behind GET /prices/latest (see app/latest_price.py)
+    latest_price_enabled: bool = True
+    latest_price_poll_seconds: float = 10.0
+    # Workers on one host elect a single poller and share its quote through this file;
+    # leave empty to poll from every worker
+    latest_price_shared_path: Optional[str] = os.path.join(
+        tempfile.gettempdir(), "price_service_latest_price.json"
+    )
+
+    # Live stream behind /prices/stream (see app/price_stream.py)
+    price_stream_queue_size: int = 100
+    price_stream_keepalive_seconds: float = 15.0
+    price_stream_candle_poll_seconds: float = 30.0
+
+    # Updater daemon (python -m scripts.update_api_data --daemon, see app/updater.py)
+    updater_delay_seconds: float = 5.0
+    updater_retry_base_seconds: float = 2.0
+    updater_retry_max_seconds: float = 300.0
+    updater_health_host: str = "0.0.0.0"
+    updater_health_port: int = 8001
+    updater_max_lag_seconds: float = 7200.0
+
+    # Optional minute tier (see app/minute_prices.py); minutes older than the
+    # retention period are downsampled into the hourly table
+    minute_prices_enabled: bool = False
+    minute_prices_retention_days: int = 7
+
+    # In-process price index (see app/price_index.py)
+    price_index_enabled: bool = False
+    price_index_refresh_seconds: int = 60
+    # Optional .npy snapshot (scripts/snapshot.py) to fill the index from at startup
+    price_snapshot_path: Optional[str] = None
+    # Memory-mapped series shared by all uvicorn workers (see app/shared_series.py);
+    # takes precedence over the per-process index
+    shared_price_series_path: Optional[str] = None
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,101 @@
+import argparse
+import json
+import statistics
+import time
+
+import orjson
+from pydantic import TypeAdapter
+
+from app.models import HourlyBitcoinPrice
+from app.schemas import CursorPage, HourlyBitcoinPriceSchema
+from app.utils.export import EXPORT_COLUMNS, rows_to_dicts
+
+SIZES = (50, 5_000, 100_000)
+BASE_TIMESTAMP = 1735689600
+
+
+def make_rows(count: int) -> list[tuple]:
+    """Rows shaped like a Core select of EXPORT_COLUMNS."""
+    return [
+        (
+            BASE_TIMESTAMP + i * 3600,
+            90100.0 + i,
+            89900.0 + i,
+            89950.0 + i,
+            90000.0 + i,
+            12.5,
+            1125000.0 + i,
+        )
+        for i in range(count)
+    ]
+
+
+def encode_with_models(prices: list[HourlyBitcoinPrice]) -> bytes:
+    """
+    The previous path: ORM objects validated into response models, which FastAPI dumps,
+    validates against the response_model, serializes and encodes with json.dumps.
+    """
+    page = CursorPage(
+        items=[HourlyBitcoinPriceSchema.model_validate(price) for price in prices],
+        size=len(prices),
+    )
+    adapter = TypeAdapter(CursorPage)
+    content = adapter.validate_python(page.model_dump())
+    return json.dumps(
+        adapter.dump_python(content, mode="json"), separators=(",", ":")
+    ).encode()
+
+
+def encode_with_orjson(rows: list[tuple]) -> bytes:
+    """The fast path: Core tuples to dicts, encoded by orjson."""
+    return orjson.dumps(
+        {
+            "items": rows_to_dicts(rows),
+            "size": len(rows),
+            "next_cursor": None,
+            "prev_cursor": None,
+        }
+    )
+
+
+def time_it(func, arg, runs: int) -> float:
+    """Returns the median time of `runs` calls in milliseconds."""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func(arg)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare response serialization through Pydantic models with the "
+        "orjson fast path used by GET /prices/."
+    )
+    parser.add_argument(
+        "--runs", type=int, default=5, help="Timed runs per size and path"
+    )
+    args = parser.parse_args()
+
+    print("| rows | models ms | orjson ms | models rows/s | orjson rows/s | speedup |")
+    print("|---|---|---|---|---|---|")
+    for size in SIZES:
+        rows = make_rows(size)
+        prices = [HourlyBitcoinPrice(**dict(zip(EXPORT_COLUMNS, row))) for row in rows]
+        # Both paths must produce the same document
+        assert orjson.loads(encode_with_models(prices)) == orjson.loads(
+            encode_with_orjson(rows)
+        )
+
+        models_ms = time_it(encode_with_models, prices, args.runs)
+        orjson_ms = time_it(encode_with_orjson, rows, args.runs)
+        print(
+            f"| {size:,} | {models_ms:,.2f} | {orjson_ms:,.2f} "
+            f"| {size / models_ms * 1000:,.0f} | {size / orjson_ms * 1000:,.0f} "
+            f"| {models_ms / orjson_ms:.1f}x |"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+
+from sqlalchemy import text
+
+from app.database import SessionLocal
+
+if sys.platform.startswith("win"):
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+TABLE = "hourly_bitcoin_prices"
+# Range widths in hours: a day, a month, a year
+RANGE_HOURS = (24, 24 * 30, 24 * 365)
+
+SIZES = text(f"""
+    SELECT pg_relation_size('{TABLE}') AS heap_bytes,
+           pg_table_size('{TABLE}') AS table_bytes,
+           pg_indexes_size('{TABLE}') AS indexes_bytes,
+           pg_total_relation_size('{TABLE}') AS total_bytes
+    """)
+INDEX_SIZES = text(f"""
+    SELECT indexrelname, pg_relation_size(indexrelid)
+    FROM pg_stat_user_indexes
+    WHERE relname = '{TABLE}'
+    ORDER BY indexrelname
+    """)
+BOUNDS = text(f"SELECT min(unix_timestamp), max(unix_timestamp) FROM {TABLE}")
+RANGE_SCAN = text(f"""
+    SELECT unix_timestamp, high, low, open, close, volumefrom, volumeto
+    FROM {TABLE}
+    WHERE unix_timestamp BETWEEN :from_ts AND :to_ts
+    ORDER BY unix_timestamp
+    """)
+
+
+async def measure(runs: int, seed: int) -> dict:
+    """Collects table/index sizes and range-scan timings for hourly_bitcoin_prices."""
+    async with SessionLocal() as session:
+        if session.get_bind().dialect.name != "postgresql":
+            raise SystemExit("The storage benchmark needs PostgreSQL")
+
+        sizes = dict((await session.execute(SIZES)).mappings().one())
+        sizes["indexes"] = dict((await session.execute(INDEX_SIZES)).all())
+        min_ts, max_ts = (await session.execute(BOUNDS)).one()
+        if min_ts is None:
+            raise SystemExit(f"{TABLE} is empty")
+
+        rng = random.Random(seed)
+        scans = {}
+        for hours in RANGE_HOURS:
+            span = hours * 3600
+            starts = [
+                rng.randrange(min_ts, max(min_ts, max_ts - span) + 1, 3600)
+                for _ in range(runs)
+            ]
+            plan = (
+                await session.execute(
+                    text(f"EXPLAIN {RANGE_SCAN.text}"),
+                    {"from_ts": starts[0], "to_ts": starts[0] + span},
+                )
+            ).scalar()
+            timings = []
+            for start in starts:
+                started = time.perf_counter()
+                result = await session.execute(
+                    RANGE_SCAN, {"from_ts": start, "to_ts": start + span}
+                )
+                result.all()
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            scans[f"{hours}h"] = {
+                "median_ms": statistics.median(timings),
+                "p95_ms": timings[int(0.95 * (len(timings) - 1))],
+                "plan": plan.strip(),
+            }
+    return {"sizes": sizes, "range_scans": scans}
+
+
+def print_report(report: dict, baseline: dict | None = None):
+    """Prints the measurements as a Markdown table, next to a baseline run if given."""
+    rows = []
+    mib = 1024**2
+    for name in ("heap_bytes", "table_bytes", "indexes_bytes", "total_bytes"):
+        rows.append((name.removesuffix("_bytes"), " MiB", ("sizes", name), mib))
+    names = set(report["sizes"]["indexes"])
+    if baseline is not None:
+        names |= set(baseline["sizes"]["indexes"])
+    for name in sorted(names):
+        rows.append((f"index {name}", " MiB", ("sizes", "indexes", name), mib))
+    for width in report["range_scans"]:
+        for stat in ("median_ms", "p95_ms"):
+            label = f"{width} range scan {stat.removesuffix('_ms')}"
+            rows.append((label, " ms", ("range_scans", width, stat), 1))
+
+    def value(measurements, path, scale):
+        for key in path:
+            measurements = measurements.get(key, {})
+        return measurements / scale if measurements != {} else 0.0
+
+    if baseline is None:
+        print("| | |\n|---|---|")
+    else:
+        print("| | before | after | change |\n|---|---|---|---|")
+    for label, unit, path, scale in rows:
+        after = value(report, path, scale)
+        if baseline is None:
+            print(f"| {label} | {after:,.2f}{unit} |")
+            continue
+        before = value(baseline, path, scale)
+        change = f"{(after - before) / before * 100:+.1f}%" if before else "new"
+        print(f"| {label} | {before:,.2f}{unit} | {after:,.2f}{unit} | {change} |")
+
+    for width, scan in report["range_scans"].items():
+        print(f"\n{width} plan: {scan['plan']}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Measure hourly_bitcoin_prices table/index sizes and range-scan times. "
+        "Run it before and after a storage migration and compare the two reports."
+    )
+    parser.add_argument(
+        "--runs", type=int, default=50, help="Range scans per range width"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=42, help="Seed for the random range starts"
+    )
+    parser.add_argument("--save", help="Write the measurements to this JSON file")
+    parser.add_argument(
+        "--compare", help="JSON file of an earlier run to print before/after figures"
+    )
+    args = parser.parse_args()
+
+    report = await measure(args.runs, args.seed)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved measurements to {args.save}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
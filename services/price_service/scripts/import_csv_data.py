@@ -1,21 +1,56 @@
-import pandas as pd
-from sqlalchemy import create_engine
+import argparse
+import asyncio
+import sys
 
-# import sys
-# from pathlib import Path
+from app.csv_import import IMPORT_CHUNK_SIZE, CsvImportError, import_csv, validate_csv
+from app.database import SessionLocal
 
-# project_root = Path(__file__).resolve().parent.parent
-# sys.path.append(str(project_root))
-from core.settings import SYNC_DATABASE_URL, ASYNC_DATABASE_URL
+if sys.platform.startswith("win"):
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-DATABASE_URL = SYNC_DATABASE_URL
 
-# Define connection details (adjust these as needed)
-engine = create_engine(DATABASE_URL)
+def report_chunk(report: dict):
+    print(
+        f"{report['rows']} rows read, {report['inserted']} inserted "
+        f"({report['rows_per_second']:.0f} rows/s)"
+    )
 
-# Read the CSV file from within the container
-df = pd.read_csv("crypto_data.csv")
 
-# Insert data into PostgreSQL
-df.to_sql("hourly_bitcoin_prices", engine, if_exists="append", index=False)
-print("CSV data imported successfully!")
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Import hourly BTC prices from a CSV file."
+    )
+    parser.add_argument("path", nargs="?", default="crypto_data.csv")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=IMPORT_CHUNK_SIZE,
+        help="Rows per COPY chunk and transaction",
+    )
+    parser.add_argument(
+        "--validate-only",
+        action="store_true",
+        help="Check the file against the table schema without importing it",
+    )
+    args = parser.parse_args()
+
+    try:
+        if args.validate_only:
+            rows = validate_csv(args.path, args.chunk_size)
+            print(f"{rows} rows are valid")
+            return
+        report = await import_csv(
+            SessionLocal, args.path, args.chunk_size, on_chunk_done=report_chunk
+        )
+    except CsvImportError as e:
+        sys.exit(f"Import aborted, nothing was written: {e}")
+
+    print(
+        f"Imported {report['inserted']} of {report['rows']} rows "
+        f"({report['skipped']} already stored) in {report['seconds']:.1f}s, "
+        f"{report['rows_per_second']:.0f} rows/s"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,14 @@
+import asyncio
+from app.database import SessionLocal
+from app.rollups import rebuild_all_rollups
+
+
+async def rebuild():
+    async with SessionLocal() as session:
+        candles = await rebuild_all_rollups(session)
+        await session.commit()
+    print(f"Rebuilt {candles} candles")
+
+
+if __name__ == "__main__":
+    asyncio.run(rebuild())
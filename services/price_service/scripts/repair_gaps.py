@@ -0,0 +1,66 @@
+import argparse
+import asyncio
+import sys
+
+from app.backfill import repair_gaps
+from app.coverage import get_coverage
+from app.database import SessionLocal
+
+if sys.platform.startswith("win"):
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+
+async def repair(concurrency: int, rate: float, dry_run: bool):
+    async with SessionLocal() as session:
+        coverage = await get_coverage(session)
+
+    for gap in coverage["gaps"]:
+        print(f"Gap {gap['start']}-{gap['end']}: {gap['hours']} hours missing")
+    print(
+        f"{coverage['missing_hours']} of {coverage['expected_hours']} hours missing "
+        f"in {len(coverage['gaps'])} gaps"
+    )
+    if dry_run or not coverage["gaps"]:
+        return
+
+    def report_window(window, inserted):
+        print(f"Window {window[0]}-{window[1]}: inserted {inserted} rows")
+
+    report = await repair_gaps(
+        SessionLocal,
+        concurrency=concurrency,
+        requests_per_second=rate,
+        on_window_done=report_window,
+    )
+    print(
+        f"Repaired {report['inserted']} of {report['missing_hours']} missing hours, "
+        f"updated {report['candles']} candles"
+    )
+    if report["failed"]:
+        print(f"{len(report['failed'])} windows failed; rerun to retry them")
+    if report["inserted"] < report["missing_hours"]:
+        print("Hours the API does not have either remain missing")
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Find missing hours in the price history and fetch them."
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Only report the gaps")
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Maximum requests in flight"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=5.0,
+        help="Maximum requests per second (0 = unlimited)",
+    )
+    args = parser.parse_args()
+
+    await repair(args.concurrency, args.rate, args.dry_run)
+    print("Done")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,52 @@
+import argparse
+import asyncio
+import sys
+import time
+
+from app.database import SessionLocal
+from app.snapshot import SnapshotError, export_snapshot, import_snapshot
+
+if sys.platform.startswith("win"):
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+
+async def export(path: str):
+    started = time.perf_counter()
+    async with SessionLocal() as session:
+        rows = await export_snapshot(session, path)
+    print(f"Wrote {rows} rows to {path} in {time.perf_counter() - started:.1f}s")
+
+
+async def restore(path: str):
+    def report_chunk(report: dict):
+        print(
+            f"{report['rows']} rows read, {report['inserted']} inserted "
+            f"({report['rows_per_second']:.0f} rows/s)"
+        )
+
+    try:
+        report = await import_snapshot(SessionLocal, path, on_chunk_done=report_chunk)
+    except SnapshotError as e:
+        sys.exit(str(e))
+    print(
+        f"Restored {report['inserted']} of {report['rows']} rows "
+        f"({report['skipped']} already stored) in {report['seconds']:.1f}s"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Export or restore a binary snapshot of the hourly price table."
+    )
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path", nargs="?", default="prices.npy")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        await export(args.path)
+    else:
+        await restore(args.path)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,114 +1,120 @@
-import requests
-from sqlalchemy.future import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from app.backfill import run_backfill
 from app.database import SessionLocal
-from app.models import HourlyBitcoinPrice
-from app.utils.timestamp import round_timestamp_down_to_hour
+from app.updater import UpdaterDaemon, run_daemon, update_prices
+from core.settings import settings
 import asyncio
-from datetime import datetime, timezone
 import time
 import aiohttp
+import argparse
 import sys
 
 if sys.platform.startswith("win"):
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
 
-async def get_last_hourly_bitcoin_data():
-    async with SessionLocal() as session:
-        result = await session.execute(
-            select(HourlyBitcoinPrice)
-            .order_by(HourlyBitcoinPrice.unix_timestamp.desc())
-            .limit(1)
-        )
+async def fetch_and_save_bitcoin_price(row_by_row: bool = False):
+    async with aiohttp.ClientSession() as http_session:
+        report = await update_prices(SessionLocal, http_session, row_by_row=row_by_row)
 
-        return result.scalars().first()
+    print(f"Total hours missing: {report['missing']}")
+    if report["appended"]:
+        print(f"Appended {report['appended']} rows to the shared price series")
+    print(
+        f"Inserted {report['inserted']} rows, "
+        f"skipped {report['skipped']}, "
+        f"updated {report['candles']} candles"
+    )
 
 
-async def save_hourly_bitcoin_data(session: AsyncSession, data: dict):
-    # Check if record already exists
-    existing = await session.execute(
-        select(HourlyBitcoinPrice).where(
-            HourlyBitcoinPrice.unix_timestamp == data["time"]
-        )
+async def run_as_daemon():
+    daemon = UpdaterDaemon(
+        SessionLocal,
+        delay=settings.updater_delay_seconds,
+        retry_base=settings.updater_retry_base_seconds,
+        retry_max=settings.updater_retry_max_seconds,
+        minute_retention_days=(
+            settings.minute_prices_retention_days
+            if settings.minute_prices_enabled
+            else None
+        ),
     )
-    if existing.scalar_one_or_none():
-        print(f"Skipping duplicate timestamp: {data['time']}")
-        return
-
-    new_entry = HourlyBitcoinPrice(
-        unix_timestamp=data["time"],
-        high=data["high"],
-        low=data["low"],
-        open=data["open"],
-        close=data["close"],
-        volumefrom=data["volumefrom"],
-        volumeto=data["volumeto"],
+    await run_daemon(
+        daemon,
+        settings.updater_health_host,
+        settings.updater_health_port,
+        settings.updater_max_lag_seconds,
     )
-    print(f"Creating new entry for timestamp: {data['time']}")
-    session.add(new_entry)
-    await session.commit()
-
-
-async def fetch_and_save_bitcoin_price():
-    async with SessionLocal() as session:
-        latest_record = await get_last_hourly_bitcoin_data()
-        latest_record_ts = latest_record.unix_timestamp
-        current_ts = int(time.time())
-        current_ts_rounded_down = round_timestamp_down_to_hour(current_ts)
-
-        total_hours = (current_ts_rounded_down - latest_record_ts) // 3600 - 1
-        print(f"Total hours missing: {total_hours}")
-
-        if total_hours <= 0:
-            print("No new data to fetch.")
-            return
-
-        url = "https://min-api.cryptocompare.com/data/v2/histohour"
-        all_data = []
-        limit_per_request = 2000
-        to_ts = current_ts_rounded_down
-
-        async with aiohttp.ClientSession() as http_session:
-            while total_hours > 0:
-                limit = min(limit_per_request, total_hours)
-                params = {"fsym": "BTC", "tsym": "USD", "limit": limit, "toTs": to_ts}
-
-                async with http_session.get(url, params=params) as response:
-                    if response.status != 200:
-                        raise Exception(
-                            f"API request failed with status {response.status}"
-                        )
-                    json_response = await response.json()
-
-                    batch = json_response["Data"]["Data"]
 
-                    # If the API returns fewer records than requested, stop
-                    if not batch:
-                        break
 
-                    # If we expect more data after this batch, exclude last (toTs is inclusive)
-                    if total_hours > limit:
-                        all_data = batch[:-1] + all_data
-                        earliest_ts = batch[0]["time"]
-                        to_ts = earliest_ts - 1
-                    else:
-                        all_data = batch + all_data
-                        break
+async def backfill(from_ts: int, to_ts: int, concurrency: int, rate: float):
+    def report_window(window, inserted):
+        print(f"Window {window[0]}-{window[1]}: inserted {inserted} rows")
 
-                    total_hours -= limit
-
-        # Save to DB
-        for record in all_data:
-            if record["time"] == current_ts_rounded_down:
-                continue
-            await save_hourly_bitcoin_data(session=session, data=record)
+    report = await run_backfill(
+        SessionLocal,
+        from_ts,
+        to_ts,
+        concurrency=concurrency,
+        requests_per_second=rate,
+        on_window_done=report_window,
+    )
+    print(
+        f"Backfilled {report['completed']} of {report['windows']} windows "
+        f"({report['skipped']} already done), inserted {report['inserted']} rows, "
+        f"updated {report['candles']} candles"
+    )
+    if report["failed"]:
+        print(f"{len(report['failed'])} windows failed; rerun to retry them")
 
 
 # Run inside an async event loop
 async def main():
-    await fetch_and_save_bitcoin_price()
+    parser = argparse.ArgumentParser(description="Fetch missing hourly BTC prices.")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running: update after every hour boundary and serve /health and /metrics",
+    )
+    parser.add_argument(
+        "--row-by-row",
+        action="store_true",
+        help="Insert and commit one record at a time (diagnostics only)",
+    )
+    parser.add_argument(
+        "--from",
+        dest="from_ts",
+        type=int,
+        help="Backfill mode: first Unix timestamp of the range to fetch",
+    )
+    parser.add_argument(
+        "--to",
+        dest="to_ts",
+        type=int,
+        help="Backfill mode: last Unix timestamp of the range (default: now)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Backfill mode: maximum number of requests in flight",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=5.0,
+        help="Backfill mode: maximum requests per second (0 = unlimited)",
+    )
+    args = parser.parse_args()
+
+    if args.daemon:
+        await run_as_daemon()
+    elif args.from_ts is not None:
+        to_ts = args.to_ts if args.to_ts is not None else int(time.time())
+        await backfill(args.from_ts, to_ts, args.concurrency, args.rate)
+    else:
+        await fetch_and_save_bitcoin_price(row_by_row=args.row_by_row)
     print("Done")
 
 
-asyncio.run(main())
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,14 +1,25 @@
 import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from app.database import Base, get_db
+from sqlalchemy.pool import StaticPool
+from app.database import Base, get_db, get_session_factory
 from app.main import app
+from app.models import HourlyBitcoinPrice
+from app.price_index import PRICE_COLUMNS
 from httpx import AsyncClient
 from httpx import ASGITransport
 
 # Create async SQLite engine
 DATABASE_URL = "sqlite+aiosqlite:///:memory:"
-engine_test = create_async_engine(DATABASE_URL, future=True, echo=False)
+engine_test = create_async_engine(
+    DATABASE_URL,
+    future=True,
+    echo=False,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
 TestSessionLocal = sessionmaker(
     engine_test, class_=AsyncSession, expire_on_commit=False
 )
@@ -25,26 +36,114 @@ async def prepare_test_db():
     async with engine_test.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestSessionLocal
 
 
 @pytest.fixture
 async def db_session():
     # Before the tests run, create all the tables in the test database.
-    async with test_engine.begin() as conn:
+    async with engine_test.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
 
     # Yield a session to be used by the dependency override.
-    async with TestingSessionLocal() as session:
+    async with TestSessionLocal() as session:
         yield session
 
     # After the tests are done, drop the tables again.
-    async with test_engine.begin() as conn:
+    async with engine_test.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
 
 
+@pytest.fixture
+def session_factory():
+    return TestSessionLocal
+
+
 @pytest.fixture
 async def async_client():
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as client:
         yield client
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+def make_record(unix_timestamp: int, close: float = 90000.0) -> dict:
+    """One OHLCV record shaped like the CryptoCompare history endpoints return it."""
+    return {
+        "time": unix_timestamp,
+        "high": close + 100,
+        "low": close - 100,
+        "open": close - 10,
+        "close": close,
+        "volumefrom": 10.0,
+        "volumeto": close * 10,
+        "conversionType": "direct",
+    }
+
+
+def make_price(unix_timestamp: int, close: float = 50000.0) -> HourlyBitcoinPrice:
+    record = make_record(unix_timestamp, close)
+    return HourlyBitcoinPrice(
+        unix_timestamp=unix_timestamp,
+        **{column: record[column] for column in PRICE_COLUMNS},
+    )
+
+
+@pytest.fixture
+async def cryptocompare():
+    """
+    Local stand-in for the CryptoCompare histohour, histominute and pricemultifull
+    endpoints. Tests steer it through the yielded state:
+
+    - `record`: builds the history record for a timestamp (default `make_record`)
+    - `quote`: the raw BTC/USD quote pricemultifull answers with
+    - `failures`: fails that many of the next requests
+    - `fail_to_ts`: fails every history page ending at one of these timestamps
+    - `requests`: the query of every request served
+    """
+    state = {
+        "record": make_record,
+        "quote": None,
+        "failures": 0,
+        "fail_to_ts": set(),
+        "requests": [],
+    }
+
+    def take_failure(request) -> bool:
+        state["requests"].append(dict(request.query))
+        if state["failures"]:
+            state["failures"] -= 1
+            return True
+        return False
+
+    def history(step: int):
+        async def handler(request):
+            to_ts = int(request.query["toTs"])
+            limit = int(request.query["limit"])
+            if take_failure(request) or to_ts in state["fail_to_ts"]:
+                return web.json_response({"Response": "Error", "Message": "rate limit"})
+            data = [state["record"](to_ts - i * step) for i in range(limit, -1, -1)]
+            return web.json_response({"Response": "Success", "Data": {"Data": data}})
+
+        return handler
+
+    async def pricemultifull(request):
+        assert request.query["fsyms"] == "BTC"
+        if take_failure(request):
+            return web.Response(status=429)
+        return web.json_response({"RAW": {"BTC": {"USD": state["quote"]}}})
+
+    stand_in = web.Application()
+    stand_in.router.add_get("/data/v2/histohour", history(3600))
+    stand_in.router.add_get("/data/v2/histominute", history(60))
+    stand_in.router.add_get("/data/pricemultifull", pricemultifull)
+    server = TestServer(stand_in)
+    await server.start_server()
+    state["base_url"] = str(server.make_url("")).rstrip("/")
+    yield state
+    await server.close()
@@ -1,11 +1,16 @@
+import csv
+import io
+import json
 from fastapi.testclient import TestClient
 from app.main import app
+from app.data_version import bump_data_version
 import pytest
 from app.models import HourlyBitcoinPrice
+from app.schemas import CursorPage, HourlyBitcoinPriceSchema
+from fastapi_pagination import Page
 from httpx import AsyncClient
 from sqlalchemy import delete
 
-
 DUMMY_TIMESTAMP = 1735689600
 
 
@@ -35,7 +40,7 @@ async def test_get_data_by_timestamp_success(async_client, test_price_entry):
 
 
 @pytest.mark.anyio
-async def test_get_data_by_timestamp_not_found(async_client):
+async def test_get_data_by_timestamp_not_found(async_client, test_price_entry):
     nonexistent_timestamp = 1117062000
     response = await async_client.get(f"/prices/{nonexistent_timestamp}")
     assert response.status_code == 400
@@ -64,7 +69,9 @@ async def test_get_data_by_timestamp_rounds_to_existing(async_client, test_price
 
 
 @pytest.mark.anyio
-async def test_get_data_by_timestamp_below_min_timestamp(async_client):
+async def test_get_data_by_timestamp_below_min_timestamp(
+    async_client, test_price_entry
+):
     nonexistent_timestamp = 0
     response = await async_client.get(f"/prices/{nonexistent_timestamp}")
     assert response.status_code == 400
@@ -72,7 +79,9 @@ async def test_get_data_by_timestamp_below_min_timestamp(async_client):
 
 
 @pytest.mark.anyio
-async def test_get_data_by_timestamp_above_max_timestamp(async_client):
+async def test_get_data_by_timestamp_above_max_timestamp(
+    async_client, test_price_entry
+):
     nonexistent_timestamp = 9999999999
     response = await async_client.get(f"/prices/{nonexistent_timestamp}")
     assert response.status_code == 400
@@ -89,3 +98,310 @@ async def test_get_data_by_timestamp_no_data_in_db(async_client, db_session):
 
     assert response.status_code == 500
     assert response.json()["detail"] == "No price data available in the database."
+
+
+@pytest.mark.anyio
+async def test_get_prices_batch_rounds_and_preserves_order(
+    async_client, test_price_entry
+):
+    timestamps = [
+        DUMMY_TIMESTAMP + 1000,  # rounds down to DUMMY_TIMESTAMP
+        DUMMY_TIMESTAMP,
+        DUMMY_TIMESTAMP - 1000,  # rounds up to DUMMY_TIMESTAMP
+    ]
+    response = await async_client.post("/prices/batch", json={"timestamps": timestamps})
+    assert response.status_code == 200
+    items = response.json()
+    assert [item["timestamp"] for item in items] == timestamps
+    for item in items:
+        assert item["error"] is None
+        assert item["price"]["unix_timestamp"] == DUMMY_TIMESTAMP
+        assert item["price"]["close"] == 57800.0
+
+
+@pytest.mark.anyio
+async def test_get_prices_batch_reports_per_item_errors(
+    async_client, db_session, test_price_entry
+):
+    db_session.add(
+        HourlyBitcoinPrice(
+            unix_timestamp=DUMMY_TIMESTAMP + 2 * 3600,
+            high=59000.0,
+            low=58000.0,
+            open=58500.0,
+            close=58800.0,
+            volumefrom=100.0,
+            volumeto=5880000.0,
+        )
+    )
+    await db_session.commit()
+
+    timestamps = [DUMMY_TIMESTAMP, DUMMY_TIMESTAMP + 3600, 9999999999]
+    response = await async_client.post("/prices/batch", json={"timestamps": timestamps})
+    assert response.status_code == 200
+    found, missing, out_of_range = response.json()
+    assert found["price"]["close"] == 57800.0
+    assert missing["price"] is None
+    assert missing["error"] == "Price record not found"
+    assert out_of_range["price"] is None
+    assert "Timestamp out of valid range." in out_of_range["error"]
+
+
+@pytest.mark.anyio
+async def test_get_prices_batch_empty_list_returns_422(async_client):
+    response = await async_client.post("/prices/batch", json={"timestamps": []})
+    assert response.status_code == 422
+
+
+@pytest.fixture
+async def hourly_price_range(db_session):
+    prices = [
+        HourlyBitcoinPrice(
+            unix_timestamp=DUMMY_TIMESTAMP + hour * 3600,
+            high=58000.0 + hour,
+            low=57000.0 + hour,
+            open=57500.0 + hour,
+            close=57800.0 + hour,
+            volumefrom=100.0,
+            volumeto=5780000.0,
+        )
+        for hour in range(5)
+    ]
+    db_session.add_all(prices)
+    await db_session.commit()
+    return prices
+
+
+@pytest.mark.anyio
+async def test_export_price_range_ndjson(async_client, hourly_price_range):
+    response = await async_client.get(
+        "/prices/range",
+        params={"from": DUMMY_TIMESTAMP + 3600, "to": DUMMY_TIMESTAMP + 3 * 3600},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["unix_timestamp"] for row in rows] == [
+        DUMMY_TIMESTAMP + 3600,
+        DUMMY_TIMESTAMP + 2 * 3600,
+        DUMMY_TIMESTAMP + 3 * 3600,
+    ]
+    assert rows[0]["close"] == 57801.0
+
+
+@pytest.mark.anyio
+async def test_export_price_range_csv(async_client, hourly_price_range):
+    response = await async_client.get(
+        "/prices/range",
+        params={
+            "from": DUMMY_TIMESTAMP,
+            "to": DUMMY_TIMESTAMP + 10 * 3600,
+            "format": "csv",
+        },
+    )
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 5
+    assert int(rows[-1]["unix_timestamp"]) == DUMMY_TIMESTAMP + 4 * 3600
+    assert float(rows[-1]["close"]) == 57804.0
+
+
+@pytest.mark.anyio
+async def test_export_price_range_arrow(async_client, hourly_price_range):
+    pa = pytest.importorskip("pyarrow")
+    response = await async_client.get(
+        "/prices/range",
+        params={
+            "from": DUMMY_TIMESTAMP,
+            "to": DUMMY_TIMESTAMP + 10 * 3600,
+            "format": "arrow",
+        },
+    )
+    assert response.status_code == 200
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.num_rows == 5
+    assert table.column("unix_timestamp").to_pylist()[0] == DUMMY_TIMESTAMP
+    assert table.column("close").to_pylist()[-1] == 57804.0
+
+
+@pytest.mark.anyio
+async def test_export_price_range_invalid_range_returns_400(async_client):
+    response = await async_client.get(
+        "/prices/range", params={"from": DUMMY_TIMESTAMP, "to": DUMMY_TIMESTAMP - 1}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_get_all_prices_page_mode(async_client, hourly_price_range):
+    response = await async_client.get("/prices/", params={"page": 1, "size": 2})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 5
+    assert [item["unix_timestamp"] for item in data["items"]] == [
+        DUMMY_TIMESTAMP + 4 * 3600,
+        DUMMY_TIMESTAMP + 3 * 3600,
+    ]
+
+
+@pytest.mark.anyio
+async def test_get_all_prices_cursor_mode_walks_forward_and_back(
+    async_client, hourly_price_range
+):
+    response = await async_client.get(
+        "/prices/", params={"pagination": "cursor", "limit": 2}
+    )
+    assert response.status_code == 200
+    first = response.json()
+    assert [item["unix_timestamp"] for item in first["items"]] == [
+        DUMMY_TIMESTAMP + 4 * 3600,
+        DUMMY_TIMESTAMP + 3 * 3600,
+    ]
+    assert first["prev_cursor"] is None
+    assert "total" not in first
+
+    response = await async_client.get(
+        "/prices/", params={"cursor": first["next_cursor"], "limit": 2}
+    )
+    second = response.json()
+    assert [item["unix_timestamp"] for item in second["items"]] == [
+        DUMMY_TIMESTAMP + 2 * 3600,
+        DUMMY_TIMESTAMP + 3600,
+    ]
+
+    response = await async_client.get(
+        "/prices/", params={"cursor": second["next_cursor"], "limit": 2}
+    )
+    last = response.json()
+    assert [item["unix_timestamp"] for item in last["items"]] == [DUMMY_TIMESTAMP]
+    assert last["next_cursor"] is None
+
+    response = await async_client.get(
+        "/prices/", params={"cursor": second["prev_cursor"], "limit": 2}
+    )
+    back = response.json()
+    assert back["items"] == first["items"]
+    assert back["prev_cursor"] is None
+
+
+@pytest.mark.anyio
+async def test_get_all_prices_invalid_cursor_returns_400(async_client):
+    response = await async_client.get("/prices/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor."
+
+
+@pytest.mark.anyio
+async def test_closed_hour_is_immutable_and_revalidates_without_db(
+    async_client, db_session, hourly_price_range
+):
+    response = await async_client.get(f"/prices/{DUMMY_TIMESTAMP + 3600}")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert "immutable" in response.headers["cache-control"]
+
+    # Empty the table: the 304 must not depend on the database
+    await db_session.execute(delete(HourlyBitcoinPrice))
+    await db_session.commit()
+
+    response = await async_client.get(
+        f"/prices/{DUMMY_TIMESTAMP + 3600 + 600}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+@pytest.mark.anyio
+async def test_wildcard_if_none_match_does_not_skip_the_lookup(
+    async_client, hourly_price_range
+):
+    headers = {"If-None-Match": "*"}
+
+    response = await async_client.get("/prices/9999999999", headers=headers)
+    assert response.status_code == 400
+
+    response = await async_client.get(
+        f"/prices/{DUMMY_TIMESTAMP + 3600}", headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json()["close"] == 57801.0
+
+
+@pytest.mark.anyio
+async def test_latest_hour_is_not_marked_immutable(async_client, hourly_price_range):
+    response = await async_client.get(f"/prices/{DUMMY_TIMESTAMP + 4 * 3600}")
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    assert "cache-control" not in response.headers
+
+
+@pytest.mark.anyio
+async def test_get_all_prices_etag_follows_data_version(
+    async_client, db_session, hourly_price_range
+):
+    params = {"page": 1, "size": 2}
+    response = await async_client.get("/prices/", params=params)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = await async_client.get(
+        "/prices/", params=params, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    # A different page has a different ETag
+    response = await async_client.get(
+        "/prices/", params={"page": 2, "size": 2}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+    await bump_data_version(db_session)
+    await db_session.commit()
+
+    response = await async_client.get(
+        "/prices/", params=params, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.anyio
+async def test_get_all_prices_fast_path_matches_response_models(
+    async_client, hourly_price_range
+):
+    response = await async_client.get("/prices/", params={"page": 2, "size": 2})
+    assert response.status_code == 200
+    data = response.json()
+    expected = Page[HourlyBitcoinPriceSchema](
+        items=[
+            HourlyBitcoinPriceSchema.model_validate(price)
+            for price in hourly_price_range[2:0:-1]
+        ],
+        total=5,
+        page=2,
+        size=2,
+        pages=3,
+    )
+    assert data == expected.model_dump(mode="json")
+
+    response = await async_client.get(
+        "/prices/", params={"pagination": "cursor", "limit": 5}
+    )
+    data = response.json()
+    expected = CursorPage(
+        items=[
+            HourlyBitcoinPriceSchema.model_validate(price)
+            for price in reversed(hourly_price_range)
+        ],
+        size=5,
+    )
+    assert data == expected.model_dump(mode="json")
+
+
+def test_get_all_prices_openapi_schema_documents_response_models():
+    schema = app.openapi()["paths"]["/prices/"]["get"]["responses"]["200"]
+    refs = {
+        option["$ref"].rsplit("/", 1)[-1]
+        for option in schema["content"]["application/json"]["schema"]["anyOf"]
+    }
+    assert refs == {"Page_HourlyBitcoinPriceSchema_", "CursorPage"}
@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.analytics import PriceSeriesStats, price_stats_cache
+from app.models import HourlyBitcoinPrice
+
+BASE_TIMESTAMP = 1735689600
+
+
+def make_series(hours: int = 2000, seed: int = 7) -> pd.DataFrame:
+    """A random walk of hourly closes with some hours missing."""
+    rng = np.random.default_rng(seed)
+    timestamps = BASE_TIMESTAMP + np.arange(hours) * 3600
+    close = 50000.0 * np.exp(np.cumsum(rng.normal(0, 0.01, hours)))
+    volumefrom = rng.uniform(1, 100, hours)
+    frame = pd.DataFrame(
+        {
+            "unix_timestamp": timestamps,
+            "close": close,
+            "volumefrom": volumefrom,
+            "volumeto": volumefrom * close * rng.uniform(0.99, 1.01, hours),
+        }
+    )
+    return frame.drop(index=rng.choice(hours, hours // 20, replace=False))
+
+
+def reference_stats(frame: pd.DataFrame, from_ts: int, to_ts: int) -> dict:
+    window = frame[frame.unix_timestamp.between(from_ts, to_ts)]
+    log_returns = np.log(window.close).diff().dropna()
+    return {
+        "simple_return": window.close.iloc[-1] / window.close.iloc[0] - 1,
+        "log_return": log_returns.sum(),
+        "volatility": log_returns.std(),
+        "annualized_volatility": log_returns.std() * np.sqrt(24 * 365),
+        "vwap": window.volumeto.sum() / window.volumefrom.sum(),
+        "volume": window.volumefrom.sum(),
+        "max_drawdown": (window.close / window.close.cummax() - 1).min(),
+    }
+
+
+@pytest.fixture(autouse=True)
+def reset_stats_cache():
+    price_stats_cache.reset()
+    yield
+    price_stats_cache.reset()
+
+
+@pytest.mark.parametrize(
+    "from_hour, to_hour",
+    [(0, 1999), (0, 719), (500, 1300), (1234, 1240), (-100, 10)],
+)
+def test_matches_pandas_reference(from_hour, to_hour):
+    frame = make_series()
+    stats = PriceSeriesStats.from_rows(list(frame.itertuples(index=False)))
+    from_ts = BASE_TIMESTAMP + from_hour * 3600
+    to_ts = BASE_TIMESTAMP + to_hour * 3600
+
+    start, end = stats.window(from_ts, to_ts)
+    assert end - start == frame.unix_timestamp.between(from_ts, to_ts).sum()
+
+    expected = reference_stats(frame, from_ts, to_ts)
+    result = stats.compute(start, end)
+    assert result.keys() == expected.keys()
+    for name, value in expected.items():
+        assert result[name] == pytest.approx(value, rel=1e-6, abs=1e-12), name
+
+
+def test_short_windows():
+    stats = PriceSeriesStats.from_rows([(BASE_TIMESTAMP, 100.0, 1.0, 100.0)])
+    assert stats.window(BASE_TIMESTAMP + 1, BASE_TIMESTAMP + 3600) == (1, 1)
+
+    result = stats.compute(*stats.window(BASE_TIMESTAMP, BASE_TIMESTAMP))
+    assert result["simple_return"] == 0.0
+    assert result["volatility"] is None
+    assert result["vwap"] == 100.0
+    assert result["max_drawdown"] == 0.0
+
+
+def test_empty_series():
+    stats = PriceSeriesStats.from_rows([])
+    assert stats.window(BASE_TIMESTAMP, BASE_TIMESTAMP + 3600) == (0, 0)
+
+
+@pytest.fixture
+async def stored_series(db_session):
+    frame = make_series(hours=200)
+    db_session.add_all(
+        HourlyBitcoinPrice(
+            unix_timestamp=int(row.unix_timestamp),
+            high=row.close,
+            low=row.close,
+            open=row.close,
+            close=row.close,
+            volumefrom=row.volumefrom,
+            volumeto=row.volumeto,
+        )
+        for row in frame.itertuples()
+    )
+    await db_session.commit()
+    return frame
+
+
+@pytest.mark.anyio
+async def test_stats_endpoint(async_client, stored_series):
+    from_ts, to_ts = BASE_TIMESTAMP + 10 * 3600, BASE_TIMESTAMP + 150 * 3600
+    response = await async_client.get(
+        "/prices/stats",
+        params={"from": from_ts, "to": to_ts, "metrics": "vwap,max_drawdown"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+
+    window = stored_series[stored_series.unix_timestamp.between(from_ts, to_ts)]
+    expected = reference_stats(stored_series, from_ts, to_ts)
+    assert data["from"] == from_ts
+    assert data["to"] == to_ts
+    assert data["first_timestamp"] == window.unix_timestamp.iloc[0]
+    assert data["last_timestamp"] == window.unix_timestamp.iloc[-1]
+    assert data["hours"] == len(window)
+    assert data["vwap"] == pytest.approx(expected["vwap"], rel=1e-9)
+    assert data["max_drawdown"] == pytest.approx(expected["max_drawdown"], rel=1e-9)
+    assert "volatility" not in data
+
+
+@pytest.mark.anyio
+async def test_stats_endpoint_rebuilds_after_new_rows(
+    async_client, db_session, stored_series
+):
+    params = {"from": BASE_TIMESTAMP, "to": BASE_TIMESTAMP + 300 * 3600}
+    response = await async_client.get("/prices/stats", params=params)
+    assert response.json()["hours"] == len(stored_series)
+
+    db_session.add(
+        HourlyBitcoinPrice(
+            unix_timestamp=BASE_TIMESTAMP + 250 * 3600,
+            high=1.0,
+            low=1.0,
+            open=1.0,
+            close=1.0,
+            volumefrom=1.0,
+            volumeto=1.0,
+        )
+    )
+    await db_session.commit()
+
+    response = await async_client.get("/prices/stats", params=params)
+    assert response.json()["hours"] == len(stored_series) + 1
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "params, status_code",
+    [
+        ({"from": BASE_TIMESTAMP + 3600, "to": BASE_TIMESTAMP}, 400),
+        ({"from": BASE_TIMESTAMP, "to": BASE_TIMESTAMP, "metrics": "sharpe"}, 400),
+        ({"from": 1500000000, "to": 1500003600}, 404),
+    ],
+)
+async def test_stats_endpoint_errors(async_client, stored_series, params, status_code):
+    response = await async_client.get("/prices/stats", params=params)
+    assert response.status_code == status_code
@@ -0,0 +1,143 @@
+import pytest
+from sqlalchemy import func
+from sqlalchemy.future import select
+from app.backfill import repair_gaps, run_backfill, split_into_windows
+from app.coverage import find_gaps
+from app.models import BackfillWindow, BitcoinPriceCandle, HourlyBitcoinPrice
+
+# Wednesday 1. January 2025 00:00:00 UTC
+BASE_TIMESTAMP = 1735689600
+HOURS = 100
+WINDOW_HOURS = 24
+
+
+def requested_to_ts(cryptocompare) -> list[int]:
+    return [int(query["toTs"]) for query in cryptocompare["requests"]]
+
+
+@pytest.fixture
+def backfill(session_factory, cryptocompare):
+    async def run():
+        return await run_backfill(
+            session_factory,
+            BASE_TIMESTAMP,
+            BASE_TIMESTAMP + (HOURS - 1) * 3600,
+            concurrency=3,
+            requests_per_second=0,
+            window_hours=WINDOW_HOURS,
+            base_url=cryptocompare["base_url"],
+        )
+
+    return run
+
+
+def test_split_into_windows_aligns_to_grid():
+    windows = split_into_windows(BASE_TIMESTAMP + 1800, BASE_TIMESTAMP + 50 * 3600, 24)
+    assert windows == [
+        (BASE_TIMESTAMP + 3600, BASE_TIMESTAMP + 23 * 3600),
+        (BASE_TIMESTAMP + 24 * 3600, BASE_TIMESTAMP + 47 * 3600),
+        (BASE_TIMESTAMP + 48 * 3600, BASE_TIMESTAMP + 50 * 3600),
+    ]
+    with pytest.raises(ValueError):
+        split_into_windows(BASE_TIMESTAMP, BASE_TIMESTAMP + 3600, 5000)
+
+
+@pytest.mark.anyio
+async def test_backfill_fetches_and_checkpoints_every_window(db_session, backfill):
+    report = await backfill()
+
+    assert report["windows"] == 5
+    assert report["completed"] == 5
+    assert report["inserted"] == HOURS
+    assert report["failed"] == []
+    assert (
+        await db_session.scalar(select(func.count(HourlyBitcoinPrice.unix_timestamp)))
+        == HOURS
+    )
+    assert (
+        await db_session.scalar(select(func.count()).select_from(BackfillWindow)) == 5
+    )
+    assert (
+        await db_session.scalar(select(func.count()).select_from(BitcoinPriceCandle))
+        > 0
+    )
+
+
+@pytest.mark.anyio
+async def test_interrupted_backfill_resumes_with_failed_windows_only(
+    db_session, cryptocompare, backfill
+):
+    windows = split_into_windows(
+        BASE_TIMESTAMP, BASE_TIMESTAMP + (HOURS - 1) * 3600, WINDOW_HOURS
+    )
+    failing = windows[2]
+    cryptocompare["fail_to_ts"].add(failing[1])
+
+    report = await backfill()
+    assert report["completed"] == 4
+    assert report["failed"] == [failing]
+
+    cryptocompare["fail_to_ts"].clear()
+    cryptocompare["requests"].clear()
+    report = await backfill()
+
+    assert report["skipped"] == 4
+    assert report["completed"] == 1
+    assert requested_to_ts(cryptocompare) == [failing[1]]
+    assert (
+        await db_session.scalar(select(func.count(HourlyBitcoinPrice.unix_timestamp)))
+        == HOURS
+    )
+
+
+@pytest.mark.anyio
+async def test_backfill_keeps_existing_rows(db_session, backfill):
+    db_session.add(
+        HourlyBitcoinPrice(
+            unix_timestamp=BASE_TIMESTAMP,
+            high=2.0,
+            low=0.5,
+            open=1.0,
+            close=1.0,
+            volumefrom=1.0,
+            volumeto=1.0,
+        )
+    )
+    await db_session.commit()
+
+    report = await backfill()
+
+    assert report["inserted"] == HOURS - 1
+    existing = await db_session.scalar(
+        select(HourlyBitcoinPrice.close).where(
+            HourlyBitcoinPrice.unix_timestamp == BASE_TIMESTAMP
+        )
+    )
+    assert existing == 1.0
+
+
+@pytest.mark.anyio
+async def test_repair_gaps_fetches_only_missing_hours(
+    db_session, session_factory, cryptocompare, backfill
+):
+    await backfill()
+    missing = [BASE_TIMESTAMP + 30 * 3600, BASE_TIMESTAMP + 31 * 3600]
+    await db_session.execute(
+        HourlyBitcoinPrice.__table__.delete().where(
+            HourlyBitcoinPrice.unix_timestamp.in_(missing)
+        )
+    )
+    await db_session.commit()
+    cryptocompare["requests"].clear()
+
+    report = await repair_gaps(
+        session_factory,
+        requests_per_second=0,
+        base_url=cryptocompare["base_url"],
+    )
+
+    assert report["gaps"] == 1
+    assert report["missing_hours"] == 2
+    assert report["inserted"] == 2
+    assert requested_to_ts(cryptocompare) == [missing[-1]]
+    assert await find_gaps(db_session) == []
@@ -0,0 +1,52 @@
+import pytest
+from app.coverage import find_gaps, get_coverage
+from tests.conftest import make_price
+
+BASE_TIMESTAMP = 1735689600
+# Hours 3-4 and 8 are missing
+STORED_HOURS = (0, 1, 2, 5, 6, 7, 9)
+
+
+@pytest.fixture
+async def prices_with_gaps(db_session):
+    db_session.add_all(
+        make_price(BASE_TIMESTAMP + hour * 3600) for hour in STORED_HOURS
+    )
+    await db_session.commit()
+
+
+@pytest.mark.anyio
+async def test_find_gaps(db_session, prices_with_gaps):
+    assert await find_gaps(db_session) == [
+        (BASE_TIMESTAMP + 3 * 3600, BASE_TIMESTAMP + 4 * 3600),
+        (BASE_TIMESTAMP + 8 * 3600, BASE_TIMESTAMP + 8 * 3600),
+    ]
+
+
+@pytest.mark.anyio
+async def test_coverage_of_empty_table(db_session):
+    coverage = await get_coverage(db_session)
+    assert coverage["stored_hours"] == 0
+    assert coverage["ranges"] == coverage["gaps"] == []
+
+
+@pytest.mark.anyio
+async def test_get_coverage_endpoint(async_client, prices_with_gaps):
+    response = await async_client.get("/prices/coverage")
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data["first_timestamp"] == BASE_TIMESTAMP
+    assert data["last_timestamp"] == BASE_TIMESTAMP + 9 * 3600
+    assert data["expected_hours"] == 10
+    assert data["stored_hours"] == 7
+    assert data["missing_hours"] == 3
+    assert [(r["start"], r["hours"]) for r in data["ranges"]] == [
+        (BASE_TIMESTAMP, 3),
+        (BASE_TIMESTAMP + 5 * 3600, 3),
+        (BASE_TIMESTAMP + 9 * 3600, 1),
+    ]
+    assert [(g["start"], g["end"], g["hours"]) for g in data["gaps"]] == [
+        (BASE_TIMESTAMP + 3 * 3600, BASE_TIMESTAMP + 4 * 3600, 2),
+        (BASE_TIMESTAMP + 8 * 3600, BASE_TIMESTAMP + 8 * 3600, 1),
+    ]
@@ -0,0 +1,95 @@
+import pytest
+from sqlalchemy import func
+from sqlalchemy.future import select
+from app.csv_import import CsvImportError, import_csv, validate_csv
+from app.data_version import get_data_version
+from app.models import BitcoinPriceCandle, HourlyBitcoinPrice
+
+BASE_TIMESTAMP = 1735689600
+HEADER = "id,unix_timestamp,high,low,open,close,volumefrom,volumeto\n"
+
+
+def csv_line(row_id: int, unix_timestamp: int, close: float = 94000.0) -> str:
+    return (
+        f"{row_id},{unix_timestamp},{close + 150},{close - 150},"
+        f"{close - 20},{close},850.0,{close * 850}\n"
+    )
+
+
+@pytest.fixture
+def price_csv(tmp_path):
+    path = tmp_path / "crypto_data.csv"
+    lines = [csv_line(i, BASE_TIMESTAMP + i * 3600) for i in range(25)]
+    path.write_text(HEADER + "".join(lines))
+    return path
+
+
+@pytest.mark.anyio
+async def test_import_csv_in_chunks(db_session, session_factory, price_csv):
+    reports = []
+    report = await import_csv(
+        session_factory, price_csv, chunk_size=10, on_chunk_done=reports.append
+    )
+
+    assert report["rows"] == report["inserted"] == 25
+    assert report["rows_per_second"] > 0
+    assert len(reports) == 3
+    assert (
+        await db_session.scalar(select(func.count(HourlyBitcoinPrice.unix_timestamp)))
+        == 25
+    )
+    assert await db_session.scalar(
+        select(HourlyBitcoinPrice.close).where(
+            HourlyBitcoinPrice.unix_timestamp == BASE_TIMESTAMP + 3600
+        )
+    ) == pytest.approx(94000.0)
+    assert await get_data_version(db_session) == 3
+    assert (
+        await db_session.scalar(select(func.count()).select_from(BitcoinPriceCandle))
+        > 0
+    )
+
+
+@pytest.mark.anyio
+async def test_import_csv_skips_stored_and_repeated_hours(
+    db_session, session_factory, price_csv
+):
+    await import_csv(session_factory, price_csv)
+    with price_csv.open("a") as f:
+        f.write(csv_line(25, BASE_TIMESTAMP + 25 * 3600))
+        f.write(csv_line(26, BASE_TIMESTAMP + 25 * 3600, 1.0))
+
+    report = await import_csv(session_factory, price_csv, chunk_size=10)
+
+    assert report["rows"] == 27
+    assert report["inserted"] == 1
+    assert report["skipped"] == 26
+
+
+def test_validate_csv_rejects_missing_columns(tmp_path):
+    path = tmp_path / "bad.csv"
+    path.write_text("unix_timestamp,close\n1735689600,94000.0\n")
+    with pytest.raises(CsvImportError, match="Missing columns: high, low"):
+        validate_csv(path)
+
+
+@pytest.mark.anyio
+async def test_invalid_timestamp_aborts_before_writing(
+    db_session, session_factory, price_csv
+):
+    with price_csv.open("a") as f:
+        f.write(csv_line(25, 1000000000))
+
+    with pytest.raises(CsvImportError, match="Row 26: unix_timestamp 1000000000"):
+        await import_csv(session_factory, price_csv, chunk_size=10)
+    assert (
+        await db_session.scalar(select(func.count(HourlyBitcoinPrice.unix_timestamp)))
+        == 0
+    )
+
+
+def test_validate_csv_rejects_empty_values(price_csv):
+    with price_csv.open("a") as f:
+        f.write(f"25,{BASE_TIMESTAMP + 25 * 3600},1.0,,1.0,1.0,1.0,1.0\n")
+    with pytest.raises(CsvImportError, match="Row 26: empty value"):
+        validate_csv(price_csv)
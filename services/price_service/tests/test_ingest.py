@@ -0,0 +1,75 @@
+import pytest
+from sqlalchemy import func
+from sqlalchemy.future import select
+from app.data_version import get_data_version
+from app.ingest import insert_hourly_prices, record_new_hours
+from app.models import BitcoinPriceCandle, HourlyBitcoinPrice
+from tests.conftest import make_record
+
+BASE_TIMESTAMP = 1735689600
+
+
+@pytest.mark.anyio
+async def test_insert_hourly_prices_inserts_all_new_records(db_session):
+    records = [make_record(BASE_TIMESTAMP + i * 3600) for i in range(5)]
+
+    inserted = await insert_hourly_prices(db_session, records)
+    await db_session.commit()
+
+    assert inserted == [r["time"] for r in records]
+    count = await db_session.scalar(
+        select(func.count(HourlyBitcoinPrice.unix_timestamp))
+    )
+    assert count == 5
+
+
+@pytest.mark.anyio
+async def test_insert_hourly_prices_skips_existing_and_repeated_hours(db_session):
+    await insert_hourly_prices(db_session, [make_record(BASE_TIMESTAMP, 1.0)])
+    await db_session.commit()
+
+    records = [
+        make_record(BASE_TIMESTAMP, 2.0),
+        make_record(BASE_TIMESTAMP + 3600),
+        make_record(BASE_TIMESTAMP + 3600),
+    ]
+    inserted = await insert_hourly_prices(db_session, records)
+    await db_session.commit()
+
+    assert inserted == [BASE_TIMESTAMP + 3600]
+    existing = await db_session.scalar(
+        select(HourlyBitcoinPrice.close).where(
+            HourlyBitcoinPrice.unix_timestamp == BASE_TIMESTAMP
+        )
+    )
+    assert existing == 1.0
+
+
+@pytest.mark.anyio
+async def test_insert_hourly_prices_chunks_large_batches(db_session, monkeypatch):
+    monkeypatch.setattr("app.ingest.INSERT_CHUNK_SIZE", 3)
+    records = [make_record(BASE_TIMESTAMP + i * 3600) for i in range(10)]
+
+    inserted = await insert_hourly_prices(db_session, records)
+    await db_session.commit()
+
+    assert len(inserted) == 10
+
+
+@pytest.mark.anyio
+async def test_record_new_hours_updates_rollups_and_version(db_session):
+    inserted = await insert_hourly_prices(
+        db_session, [make_record(BASE_TIMESTAMP + i * 3600) for i in range(3)]
+    )
+    candles = await record_new_hours(db_session, inserted)
+    await db_session.commit()
+
+    assert candles == 3  # one daily, weekly and monthly candle
+    assert await get_data_version(db_session) == 1
+    count = await db_session.scalar(
+        select(func.count()).select_from(BitcoinPriceCandle)
+    )
+    assert count == 3
+
+    assert await record_new_hours(db_session, []) == 0
+    assert await get_data_version(db_session) == 1
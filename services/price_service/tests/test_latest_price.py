@@ -0,0 +1,112 @@
+import asyncio
+
+import aiohttp
+import pytest
+from app.latest_price import LatestPrice, latest_price
+
+QUOTE = {
+    "PRICE": 97123.45,
+    "CHANGE24HOUR": 1523.1,
+    "CHANGEPCT24HOUR": 1.59,
+    "HIGH24HOUR": 97500.0,
+    "LOW24HOUR": 95100.0,
+    "LASTUPDATE": 1735689612,
+}
+
+
+@pytest.fixture
+def pricemultifull(cryptocompare):
+    cryptocompare["quote"] = QUOTE
+    return cryptocompare
+
+
+@pytest.fixture
+def cached_latest_price():
+    yield latest_price
+    latest_price.reset()
+
+
+@pytest.mark.anyio
+async def test_poll_once_stores_quote(pricemultifull):
+    latest = LatestPrice()
+    async with aiohttp.ClientSession() as http_session:
+        assert await latest.poll_once(http_session, pricemultifull["base_url"])
+
+    snapshot = latest.snapshot(stale_after=30)
+    assert snapshot["price"] == 97123.45
+    assert snapshot["change_pct_24h"] == 1.59
+    assert snapshot["source_timestamp"] == 1735689612
+    assert snapshot["stale"] is False
+
+
+@pytest.mark.anyio
+async def test_failed_poll_keeps_previous_quote(pricemultifull):
+    latest = LatestPrice()
+    async with aiohttp.ClientSession() as http_session:
+        await latest.poll_once(http_session, pricemultifull["base_url"])
+        pricemultifull["failures"] = 1
+        assert not await latest.poll_once(http_session, pricemultifull["base_url"])
+
+    assert latest.failures == 1
+    assert "429" in latest.last_error
+    assert latest.snapshot(stale_after=30)["price"] == 97123.45
+    assert latest.snapshot(stale_after=0)["stale"] is True
+
+
+@pytest.mark.anyio
+async def test_get_latest_price(async_client, cached_latest_price):
+    response = await async_client.get("/prices/latest")
+    assert response.status_code == 503
+
+    cached_latest_price.set_quote(
+        {
+            "price": 97000.0,
+            "change_24h": -250.0,
+            "change_pct_24h": -0.26,
+            "high_24h": 97800.0,
+            "low_24h": 96500.0,
+            "source_timestamp": 1735689612,
+        }
+    )
+    response = await async_client.get("/prices/latest")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["price"] == 97000.0
+    assert data["change_24h"] == -250.0
+    assert data["age_seconds"] >= 0
+    assert data["stale"] is False
+
+
+@pytest.mark.anyio
+async def test_workers_share_one_poller(pricemultifull, tmp_path):
+    path = str(tmp_path / "latest.json")
+    workers = [LatestPrice() for _ in range(3)]
+    tasks = [
+        asyncio.create_task(
+            worker.run(path, interval=0.05, base_url=pricemultifull["base_url"])
+        )
+        for worker in workers
+    ]
+    try:
+        await asyncio.sleep(0.3)
+        assert all(worker.quote is not None for worker in workers)
+        assert {worker.quote["price"] for worker in workers} == {97123.45}
+        assert sum(worker.polls for worker in workers) == len(
+            pricemultifull["requests"]
+        )
+        assert [worker.polls > 0 for worker in workers].count(True) == 1
+
+        # The poller goes away; another worker takes the role over
+        poller = next(i for i, worker in enumerate(workers) if worker.polls)
+        tasks[poller].cancel()
+        workers[poller].release()
+        polls = len(pricemultifull["requests"])
+        await asyncio.sleep(0.3)
+        assert len(pricemultifull["requests"]) > polls
+        assert [worker.polls > 0 for worker in workers].count(True) == 2
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for worker in workers:
+            worker.release()
@@ -0,0 +1,229 @@
+import aiohttp
+import pytest
+from sqlalchemy import func
+from sqlalchemy.future import select
+from app.minute_prices import (
+    downsample_minutes,
+    downsample_old_minutes,
+    update_minute_prices,
+)
+from app.models import HourlyBitcoinPrice, MinuteBitcoinPrice
+from app.price_index import PriceIndex
+from app.utils.export import EXPORT_COLUMNS
+from core.settings import settings
+
+BASE_TIMESTAMP = 1735689600
+DAY = 86400
+
+
+def make_minute(unix_timestamp: int) -> tuple:
+    close = 90000.0 + (unix_timestamp - BASE_TIMESTAMP) / 60
+    return (unix_timestamp, close + 5, close - 5, close - 1, close, 0.5, close / 2)
+
+
+def make_minute_price(unix_timestamp: int) -> MinuteBitcoinPrice:
+    return MinuteBitcoinPrice(**dict(zip(EXPORT_COLUMNS, make_minute(unix_timestamp))))
+
+
+def make_minute_record(unix_timestamp: int) -> dict:
+    keys = ("time", "high", "low", "open", "close", "volumefrom", "volumeto")
+    return dict(zip(keys, make_minute(unix_timestamp)))
+
+
+@pytest.fixture
+def histominute(cryptocompare):
+    cryptocompare["record"] = make_minute_record
+    return cryptocompare
+
+
+@pytest.mark.anyio
+async def test_update_minute_prices_pages_within_retention(
+    db_session, session_factory, histominute
+):
+    now = BASE_TIMESTAMP + 2 * DAY + 30
+    async with aiohttp.ClientSession() as http_session:
+        report = await update_minute_prices(
+            session_factory,
+            http_session,
+            retention_days=2,
+            now=now,
+            base_url=histominute["base_url"],
+        )
+        # Every closed minute of the last two days, fetched in 2001-minute pages
+        assert report["missing"] == report["inserted"] == 2 * 1440
+        assert len(histominute["requests"]) == 2
+
+        report = await update_minute_prices(
+            session_factory,
+            http_session,
+            retention_days=2,
+            now=now + 300,
+            base_url=histominute["base_url"],
+        )
+        assert report["inserted"] == 5
+
+    stored = await db_session.scalar(
+        select(func.count(MinuteBitcoinPrice.unix_timestamp))
+    )
+    assert stored == 2 * 1440 + 5
+
+
+def test_downsample_minutes_skips_incomplete_hours():
+    rows = [make_minute(BASE_TIMESTAMP + m * 60) for m in range(60 + 30)]
+    hours, incomplete = downsample_minutes(rows)
+
+    assert incomplete == 1
+    assert len(hours) == 1
+    hour = hours[0]
+    assert hour["unix_timestamp"] == BASE_TIMESTAMP
+    assert hour["open"] == rows[0][3]
+    assert hour["close"] == rows[59][4]
+    assert hour["high"] == max(row[1] for row in rows[:60])
+    assert hour["low"] == min(row[2] for row in rows[:60])
+    assert hour["volumefrom"] == pytest.approx(30.0)
+
+
+@pytest.mark.anyio
+async def test_downsample_old_minutes_fills_missing_hours_only(db_session):
+    # Hour 0 is already stored from histohour, hour 1 is not, hour 2 is incomplete
+    db_session.add(
+        HourlyBitcoinPrice(
+            unix_timestamp=BASE_TIMESTAMP,
+            high=1.0,
+            low=1.0,
+            open=1.0,
+            close=1.0,
+            volumefrom=1.0,
+            volumeto=1.0,
+        )
+    )
+    db_session.add_all(
+        make_minute_price(ts)
+        for ts in range(BASE_TIMESTAMP, BASE_TIMESTAMP + 150 * 60, 60)
+    )
+    await db_session.commit()
+
+    report = await downsample_old_minutes(
+        db_session, retention_days=1, now=BASE_TIMESTAMP + DAY + 3 * 3600
+    )
+    await db_session.commit()
+
+    assert report == {
+        "minutes": 150,
+        "hours": 2,
+        "inserted": 1,
+        "incomplete": 1,
+        "candles": 3,
+    }
+    assert (
+        await db_session.scalar(select(func.count(MinuteBitcoinPrice.unix_timestamp)))
+        == 0
+    )
+    hour = await db_session.get(HourlyBitcoinPrice, BASE_TIMESTAMP + 3600)
+    assert hour.close == make_minute(BASE_TIMESTAMP + 119 * 60)[4]
+    assert (await db_session.get(HourlyBitcoinPrice, BASE_TIMESTAMP)).close == 1.0
+
+
+@pytest.mark.anyio
+async def test_minute_resolution_falls_back_to_hourly(
+    async_client, db_session, monkeypatch
+):
+    monkeypatch.setattr(settings, "minute_prices_enabled", True)
+    db_session.add(make_minute_price(BASE_TIMESTAMP + 60))
+    db_session.add(
+        HourlyBitcoinPrice(
+            unix_timestamp=BASE_TIMESTAMP,
+            high=1.0,
+            low=1.0,
+            open=1.0,
+            close=1.0,
+            volumefrom=1.0,
+            volumeto=1.0,
+        )
+    )
+    await db_session.commit()
+
+    response = await async_client.get(
+        f"/prices/{BASE_TIMESTAMP + 70}", params={"resolution": "minute"}
+    )
+    data = response.json()
+    assert data["resolution"] == "minute"
+    assert data["unix_timestamp"] == BASE_TIMESTAMP + 60
+    assert data["close"] == make_minute(BASE_TIMESTAMP + 60)[4]
+
+    response = await async_client.get(
+        f"/prices/{BASE_TIMESTAMP + 600}", params={"resolution": "minute"}
+    )
+    data = response.json()
+    assert data["resolution"] == "hour"
+    assert data["unix_timestamp"] == BASE_TIMESTAMP
+
+
+@pytest.mark.anyio
+async def test_hourly_fallback_for_a_minute_is_not_immutable(
+    async_client, db_session, monkeypatch
+):
+    monkeypatch.setattr(settings, "minute_prices_enabled", True)
+    db_session.add_all(
+        HourlyBitcoinPrice(
+            unix_timestamp=BASE_TIMESTAMP + hour * 3600,
+            high=1.0,
+            low=1.0,
+            open=1.0,
+            close=1.0,
+            volumefrom=1.0,
+            volumeto=1.0,
+        )
+        for hour in range(2)
+    )
+    await db_session.commit()
+    etag = f'"hour-{BASE_TIMESTAMP}"'
+
+    # The hourly URL is immutable ...
+    response = await async_client.get(f"/prices/{BASE_TIMESTAMP + 600}")
+    assert response.headers["etag"] == etag
+    assert "immutable" in response.headers["cache-control"]
+
+    # ... but the minute URL may be answered from the minute tier later
+    response = await async_client.get(
+        f"/prices/{BASE_TIMESTAMP + 600}",
+        params={"resolution": "minute"},
+        headers={"If-None-Match": etag},
+    )
+    assert response.status_code == 200
+    assert response.json()["resolution"] == "hour"
+    assert "etag" not in response.headers
+    assert "immutable" not in response.headers.get("cache-control", "")
+
+
+@pytest.mark.anyio
+async def test_downsampled_hours_reach_the_price_index(db_session):
+    db_session.add_all(
+        HourlyBitcoinPrice(
+            unix_timestamp=BASE_TIMESTAMP + hour * 3600,
+            high=1.0,
+            low=1.0,
+            open=1.0,
+            close=1.0,
+            volumefrom=1.0,
+            volumeto=1.0,
+        )
+        for hour in (0, 2)
+    )
+    db_session.add_all(
+        make_minute_price(ts)
+        for ts in range(BASE_TIMESTAMP + 3600, BASE_TIMESTAMP + 7200, 60)
+    )
+    await db_session.commit()
+    index = PriceIndex()
+    await index.load(db_session)
+
+    await downsample_old_minutes(
+        db_session, retention_days=1, now=BASE_TIMESTAMP + DAY + 3 * 3600
+    )
+    await db_session.commit()
+
+    assert await index.refresh(db_session) == 1
+    assert index.lookup(BASE_TIMESTAMP + 3600)["close"] == (
+        make_minute(BASE_TIMESTAMP + 119 * 60)[4]
+    )
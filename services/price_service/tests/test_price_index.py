@@ -0,0 +1,136 @@
+import pytest
+from sqlalchemy import delete
+from app.ingest import insert_price_rows, record_new_hours
+from app.models import HourlyBitcoinPrice
+from app.price_index import PriceIndex, price_index
+from tests.conftest import make_price
+
+BASE_TIMESTAMP = 1735689600
+
+
+@pytest.fixture
+async def hourly_prices(db_session):
+    # Hour +2 is deliberately missing
+    prices = [
+        make_price(BASE_TIMESTAMP + hour * 3600, 50000.0 + hour)
+        for hour in (0, 1, 3, 4)
+    ]
+    db_session.add_all(prices)
+    await db_session.commit()
+    return prices
+
+
+@pytest.fixture
+async def loaded_price_index(db_session, hourly_prices):
+    await price_index.load(db_session)
+    yield price_index
+    price_index.reset()
+
+
+@pytest.mark.anyio
+async def test_load_indexes_rows_by_hour_offset(db_session, hourly_prices):
+    index = PriceIndex()
+    rows = await index.load(db_session)
+
+    assert rows == 4
+    assert index.bounds() == (BASE_TIMESTAMP, BASE_TIMESTAMP + 4 * 3600)
+    assert index.lookup(BASE_TIMESTAMP + 3600)["close"] == 50001.0
+    assert index.lookup(BASE_TIMESTAMP + 4 * 3600)["unix_timestamp"] == (
+        BASE_TIMESTAMP + 4 * 3600
+    )
+
+
+@pytest.mark.anyio
+async def test_lookup_returns_none_for_missing_hours(db_session, hourly_prices):
+    index = PriceIndex()
+    await index.load(db_session)
+
+    assert index.lookup(BASE_TIMESTAMP + 2 * 3600) is None
+    assert index.lookup(BASE_TIMESTAMP - 3600) is None
+    assert index.lookup(BASE_TIMESTAMP + 100 * 3600) is None
+
+
+@pytest.mark.anyio
+async def test_refresh_appends_only_new_rows(db_session, hourly_prices):
+    index = PriceIndex()
+    await index.load(db_session)
+
+    db_session.add(make_price(BASE_TIMESTAMP + 10 * 3600, 60000.0))
+    await db_session.commit()
+
+    assert await index.refresh(db_session) == 1
+    assert await index.refresh(db_session) == 0
+    assert index.row_count == 5
+    assert index.bounds()[1] == BASE_TIMESTAMP + 10 * 3600
+    assert index.lookup(BASE_TIMESTAMP + 10 * 3600)["close"] == 60000.0
+    assert index.lookup(BASE_TIMESTAMP + 3600)["close"] == 50001.0
+
+
+@pytest.mark.anyio
+async def test_refresh_picks_up_hours_inserted_inside_the_range(
+    db_session, hourly_prices
+):
+    index = PriceIndex()
+    await index.load(db_session)
+
+    # Gap repair / backfill: the missing hour +2 is stored later
+    gap_hour = BASE_TIMESTAMP + 2 * 3600
+    inserted = await insert_price_rows(
+        db_session,
+        [
+            {
+                "unix_timestamp": gap_hour,
+                "high": 50102.0,
+                "low": 49902.0,
+                "open": 49992.0,
+                "close": 50002.0,
+                "volumefrom": 10.0,
+                "volumeto": 500020.0,
+            }
+        ],
+    )
+    await record_new_hours(db_session, inserted)
+    await db_session.commit()
+
+    assert await index.refresh(db_session) == 1
+    assert index.lookup(gap_hour)["close"] == 50002.0
+    assert index.row_count == 5
+    assert await index.refresh(db_session) == 0
+
+
+@pytest.mark.anyio
+async def test_endpoint_answers_from_index_without_db(
+    async_client, db_session, loaded_price_index
+):
+    # Empty the table: the endpoint must still answer from memory
+    await db_session.execute(delete(HourlyBitcoinPrice))
+    await db_session.commit()
+
+    response = await async_client.get(f"/prices/{BASE_TIMESTAMP + 3600 + 1000}")
+    assert response.status_code == 200
+    assert response.json()["close"] == 50001.0
+
+
+@pytest.mark.anyio
+async def test_endpoint_keeps_error_semantics_with_index(
+    async_client, loaded_price_index
+):
+    response = await async_client.get(f"/prices/{BASE_TIMESTAMP + 2 * 3600}")
+    assert response.status_code == 404
+
+    response = await async_client.get("/prices/9999999999")
+    assert response.status_code == 400
+    assert "Timestamp out of valid range." in response.json()["detail"]
+
+
+@pytest.mark.anyio
+async def test_index_stats(async_client, loaded_price_index):
+    response = await async_client.get("/prices/index/stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["loaded"] is True
+    assert data["rows"] == 4
+    assert data["last_timestamp"] == BASE_TIMESTAMP + 4 * 3600
+    assert data["memory_bytes"] > 0
+    assert loaded_price_index.data_version is not None
+    assert data["data_version"] == loaded_price_index.data_version
@@ -0,0 +1,136 @@
+import numpy as np
+import pytest
+from app.models import HourlyBitcoinPrice
+from app.price_index import neighbour_slots, price_index
+
+BASE_TIMESTAMP = 1735689600
+HOUR = 3600
+
+
+@pytest.fixture
+async def prices_with_gap(db_session):
+    # Hour +2 is deliberately missing
+    db_session.add_all(
+        HourlyBitcoinPrice(
+            unix_timestamp=BASE_TIMESTAMP + hour * HOUR,
+            high=51000.0 + hour,
+            low=49000.0 + hour,
+            open=49500.0 + hour,
+            close=50000.0 + hour,
+            volumefrom=10.0,
+            volumeto=500000.0,
+        )
+        for hour in (0, 1, 3, 4)
+    )
+    await db_session.commit()
+
+
+@pytest.fixture(params=["database", "index"])
+async def price_source(request, db_session, prices_with_gap):
+    if request.param == "index":
+        await price_index.load(db_session)
+    yield request.param
+    price_index.reset()
+
+
+def test_neighbour_slots():
+    present = np.array([True, True, False, False, True])
+    assert neighbour_slots(present, 2 * HOUR + 60, 3 * HOUR) == (1, 4)
+    assert neighbour_slots(present, 1 * HOUR, 3 * HOUR) == (1, 1)
+    assert neighbour_slots(present, 2 * HOUR, HOUR) == (1, None)
+    assert neighbour_slots(present, 6 * HOUR, HOUR) == (None, None)
+    assert neighbour_slots(present, 5 * HOUR, HOUR) == (4, None)
+    assert neighbour_slots(present, -HOUR, HOUR) == (None, 0)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "offset, mode, expected_timestamp, expected_close, expected_mode",
+    [
+        # The rounded hour is stored: same answer as exact
+        (HOUR + 100, "nearest", BASE_TIMESTAMP + HOUR, 50001.0, "exact"),
+        (2 * HOUR - 100, "nearest", BASE_TIMESTAMP + HOUR, 50001.0, "nearest"),
+        # Equally far from both sides: the later hour, like rounding
+        (2 * HOUR, "nearest", BASE_TIMESTAMP + 3 * HOUR, 50003.0, "nearest"),
+        (2 * HOUR, "interpolate", BASE_TIMESTAMP + 2 * HOUR, 50002.0, "interpolate"),
+        (
+            HOUR + 900,
+            "interpolate",
+            BASE_TIMESTAMP + HOUR + 900,
+            50001.25,
+            "interpolate",
+        ),
+        (3 * HOUR, "interpolate", BASE_TIMESTAMP + 3 * HOUR, 50003.0, "exact"),
+        # Past the last stored hour there is nothing to interpolate towards
+        (5 * HOUR, "interpolate", BASE_TIMESTAMP + 4 * HOUR, 50004.0, "nearest"),
+    ],
+)
+async def test_lookup_modes(
+    async_client,
+    price_source,
+    offset,
+    mode,
+    expected_timestamp,
+    expected_close,
+    expected_mode,
+):
+    response = await async_client.get(
+        f"/prices/{BASE_TIMESTAMP + offset}", params={"mode": mode}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["unix_timestamp"] == expected_timestamp
+    assert data["close"] == pytest.approx(expected_close)
+    assert data["mode"] == expected_mode
+    assert "ETag" not in response.headers
+
+
+@pytest.mark.anyio
+async def test_exact_mode_is_the_default(async_client, price_source):
+    response = await async_client.get(f"/prices/{BASE_TIMESTAMP + 2 * HOUR}")
+    assert response.status_code == 404
+
+    response = await async_client.get(f"/prices/{BASE_TIMESTAMP}")
+    assert response.json()["mode"] == "exact"
+
+
+@pytest.mark.anyio
+async def test_nothing_within_tolerance(async_client, price_source):
+    response = await async_client.get(
+        f"/prices/{BASE_TIMESTAMP + 2 * HOUR}",
+        params={"mode": "nearest", "tolerance": 1800},
+    )
+    assert response.status_code == 404
+
+    response = await async_client.get(
+        f"/prices/{BASE_TIMESTAMP - 10 * HOUR}", params={"mode": "nearest"}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_interpolation_fills_the_close_only(async_client, price_source):
+    response = await async_client.get(
+        f"/prices/{BASE_TIMESTAMP + 2 * HOUR}", params={"mode": "interpolate"}
+    )
+    data = response.json()
+    assert data["close"] == pytest.approx(50002.0)
+    assert [data[name] for name in ("high", "low", "open")] == [None, None, None]
+    assert data["volumefrom"] is None and data["volumeto"] is None
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "offset, status_code", [(4 * HOUR + 600, 200), (2 * HOUR, 404), (-HOUR, 400)]
+)
+async def test_zero_tolerance_answers_like_exact_mode(
+    async_client, price_source, offset, status_code
+):
+    for mode in ("exact", "nearest", "interpolate"):
+        response = await async_client.get(
+            f"/prices/{BASE_TIMESTAMP + offset}",
+            params={"mode": mode, "tolerance": 0},
+        )
+        assert response.status_code == status_code
+        if status_code == 200:
+            assert response.json()["mode"] == "exact"
@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from app.latest_price import LatestPrice, latest_price
+from app.main import app
+from app.price_stream import (
+    Broadcaster,
+    format_sse,
+    price_stream,
+    run_candle_watcher,
+    stream_events,
+)
+from app.routers.prices import stream_prices
+from core.settings import settings
+from tests.conftest import make_price
+
+BASE_TIMESTAMP = 1735689600
+QUOTE = {
+    "price": 97000.0,
+    "change_24h": -250.0,
+    "change_pct_24h": -0.26,
+    "high_24h": 97800.0,
+    "low_24h": 96500.0,
+    "source_timestamp": 1735689612,
+}
+
+
+@pytest.mark.anyio
+async def test_publish_fans_out_to_every_subscriber():
+    broadcaster = Broadcaster(queue_size=10)
+    with broadcaster.subscribe("sse") as first, broadcaster.subscribe(
+        "websocket"
+    ) as second:
+        broadcaster.publish("tick", {"price": 1.0})
+        assert await first.get() == ("tick", {"price": 1.0})
+        assert await second.get() == ("tick", {"price": 1.0})
+        assert broadcaster.stats()["clients"] == 2
+        assert broadcaster.stats()["websocket_clients"] == 1
+
+    assert broadcaster.stats()["clients"] == 0
+
+
+@pytest.mark.anyio
+async def test_slow_subscriber_drops_oldest_events_only():
+    broadcaster = Broadcaster(queue_size=2)
+    with broadcaster.subscribe("sse") as slow, broadcaster.subscribe("sse") as fast:
+        for i in range(3):
+            broadcaster.publish("tick", {"price": float(i)})
+            assert await fast.get() == ("tick", {"price": float(i)})
+
+        assert slow.dropped == 1
+        assert await slow.get() == ("tick", {"price": 1.0})
+        assert await slow.get() == ("tick", {"price": 2.0})
+        assert fast.dropped == 0
+        assert broadcaster.stats()["dropped"] == 1
+        assert broadcaster.stats()["published"] == 3
+
+
+@pytest.mark.anyio
+async def test_stream_events_yields_keepalives_while_idle():
+    broadcaster = Broadcaster()
+    with broadcaster.subscribe("sse") as subscription:
+        events = stream_events(subscription, keepalive=0.01)
+        assert await anext(events) is None
+        broadcaster.publish("candle", {"unix_timestamp": BASE_TIMESTAMP})
+        assert await anext(events) == ("candle", {"unix_timestamp": BASE_TIMESTAMP})
+
+
+def test_format_sse():
+    assert format_sse("tick", {"price": 1.5}) == b'event: tick\ndata: {"price":1.5}\n\n'
+
+
+@pytest.mark.anyio
+async def test_changed_quotes_are_published():
+    latest = LatestPrice()
+    with price_stream.subscribe("sse") as subscription:
+        latest.set_quote(QUOTE)
+        latest.set_quote(QUOTE)
+        latest.set_quote({**QUOTE, "price": 97001.0})
+
+        assert subscription.queue.qsize() == 2
+        event, data = await subscription.get()
+        assert event == "tick"
+        assert data["price"] == 97000.0
+        assert "last_updated" in data
+
+
+@pytest.mark.anyio
+async def test_candle_watcher_publishes_new_hours(db_session, session_factory):
+    db_session.add(make_price(BASE_TIMESTAMP))
+    await db_session.commit()
+
+    broadcaster = Broadcaster()
+    with broadcaster.subscribe("sse") as subscription:
+        watcher = asyncio.create_task(
+            run_candle_watcher(broadcaster, session_factory, interval=0.01)
+        )
+        try:
+            await asyncio.sleep(0.05)
+            assert subscription.queue.empty()
+
+            db_session.add(make_price(BASE_TIMESTAMP + 3600))
+            await db_session.commit()
+            event, data = await asyncio.wait_for(subscription.get(), timeout=1)
+        finally:
+            watcher.cancel()
+
+    assert event == "candle"
+    assert data["unix_timestamp"] == BASE_TIMESTAMP + 3600
+    assert data["close"] == 50000.0
+
+
+def test_websocket_stream_sends_current_quote(monkeypatch):
+    monkeypatch.setattr(settings, "price_stream_keepalive_seconds", 0.05)
+    latest_price.set_quote(QUOTE)
+    try:
+        with TestClient(app).websocket_connect("/prices/stream/ws") as websocket:
+            message = websocket.receive_json()
+            assert message["event"] == "tick"
+            assert message["data"]["price"] == 97000.0
+            assert websocket.receive_json() == {"event": "keepalive"}
+    finally:
+        latest_price.reset()
+
+
+@pytest.mark.anyio
+async def test_sse_stream_sends_current_quote_then_events():
+    latest_price.set_quote(QUOTE)
+    try:
+        response = await stream_prices()
+        assert response.media_type == "text/event-stream"
+        events = response.body_iterator
+
+        assert (await anext(events)).startswith(b"event: tick\ndata: {")
+        assert price_stream.stats()["sse_clients"] == 1
+        price_stream.publish("candle", {"unix_timestamp": BASE_TIMESTAMP})
+        assert await anext(events) == format_sse(
+            "candle", {"unix_timestamp": BASE_TIMESTAMP}
+        )
+
+        await events.aclose()
+        assert price_stream.stats()["sse_clients"] == 0
+    finally:
+        latest_price.reset()
+
+
+@pytest.mark.anyio
+async def test_get_stream_stats(async_client):
+    response = await async_client.get("/prices/stream/stats")
+    assert response.status_code == 200
+    assert response.json()["clients"] == 0
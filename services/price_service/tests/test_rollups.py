@@ -0,0 +1,191 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy.future import select
+from app.models import BitcoinPriceCandle, HourlyBitcoinPrice
+from app.rollups import (
+    _upsert_candles,
+    aggregate_candles,
+    get_bucket_end,
+    get_bucket_start,
+    rebuild_all_rollups,
+    update_rollups,
+)
+
+# Wednesday 15. January 2025 00:00:00 UTC
+START_TIMESTAMP = 1736899200
+HOURS = 24 * 50
+
+PANDAS_RULES = {"1d": "D", "1w": "W-MON", "1M": "MS"}
+
+
+def make_hourly_prices(start: int, hours: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    closes = 95000 + np.cumsum(rng.normal(0, 250, hours))
+    return [
+        HourlyBitcoinPrice(
+            unix_timestamp=start + i * 3600,
+            high=float(closes[i] + rng.uniform(0, 300)),
+            low=float(closes[i] - rng.uniform(0, 300)),
+            open=float(closes[i] + rng.normal(0, 50)),
+            close=float(closes[i]),
+            volumefrom=float(rng.uniform(100, 2000)),
+            volumeto=float(rng.uniform(1e7, 2e8)),
+        )
+        for i in range(hours)
+    ]
+
+
+def resample_with_pandas(prices, interval: str) -> pd.DataFrame:
+    df = pd.DataFrame(
+        {
+            "unix_timestamp": [p.unix_timestamp for p in prices],
+            "high": [p.high for p in prices],
+            "low": [p.low for p in prices],
+            "open": [p.open for p in prices],
+            "close": [p.close for p in prices],
+            "volumefrom": [p.volumefrom for p in prices],
+            "volumeto": [p.volumeto for p in prices],
+        }
+    )
+    df.index = pd.to_datetime(df["unix_timestamp"], unit="s", utc=True)
+    rule = PANDAS_RULES[interval]
+    if interval == "1w":
+        # Weekly bins that start (and are labelled) on Monday
+        resampler = df.resample(rule, closed="left", label="left")
+    else:
+        resampler = df.resample(rule)
+    resampled = resampler.agg(
+        {
+            "open": "first",
+            "high": "max",
+            "low": "min",
+            "close": "last",
+            "volumefrom": "sum",
+            "volumeto": "sum",
+        }
+    ).dropna()
+    resampled.index = resampled.index.map(lambda t: int(t.timestamp()))
+    return resampled
+
+
+@pytest.fixture
+async def hourly_history(db_session):
+    prices = make_hourly_prices(START_TIMESTAMP, HOURS)
+    db_session.add_all(prices)
+    await db_session.commit()
+    return prices
+
+
+async def load_candles(db_session, interval: str) -> pd.DataFrame:
+    result = await db_session.execute(
+        select(BitcoinPriceCandle)
+        .where(BitcoinPriceCandle.interval == interval)
+        .order_by(BitcoinPriceCandle.bucket_start)
+    )
+    candles = result.scalars().all()
+    return pd.DataFrame(
+        {
+            "open": [c.open for c in candles],
+            "high": [c.high for c in candles],
+            "low": [c.low for c in candles],
+            "close": [c.close for c in candles],
+            "volumefrom": [c.volumefrom for c in candles],
+            "volumeto": [c.volumeto for c in candles],
+        },
+        index=[c.bucket_start for c in candles],
+    )
+
+
+def test_bucket_boundaries():
+    # Sunday 23. March 2025 15:30:00
+    ts = 1742743800
+    assert get_bucket_start(ts, "1d") == 1742688000  # 23. March 00:00
+    assert get_bucket_start(ts, "1w") == 1742169600  # Monday 17. March 00:00
+    assert get_bucket_start(ts, "1M") == 1740787200  # 1. March 00:00
+    assert get_bucket_end(1740787200, "1M") == 1743465600  # 1. April 00:00
+    assert get_bucket_end(1733011200, "1M") == 1735689600  # 1. Dec -> 1. Jan
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("interval", ["1d", "1w", "1M"])
+async def test_rebuild_matches_pandas_resample(db_session, hourly_history, interval):
+    await rebuild_all_rollups(db_session)
+    await db_session.commit()
+
+    candles = await load_candles(db_session, interval)
+    expected = resample_with_pandas(hourly_history, interval)
+
+    pd.testing.assert_frame_equal(
+        candles, expected, check_names=False, check_index_type=False
+    )
+
+
+@pytest.mark.anyio
+async def test_incremental_update_matches_full_rebuild(db_session):
+    prices = make_hourly_prices(START_TIMESTAMP, HOURS)
+    db_session.add_all(prices[:-30])
+    await db_session.commit()
+    await rebuild_all_rollups(db_session)
+    await db_session.commit()
+
+    # New hours arrive one at a time, as they would from the updater
+    for price in prices[-30:]:
+        db_session.add(price)
+        await db_session.commit()
+        await update_rollups(db_session, [price.unix_timestamp])
+        await db_session.commit()
+
+    for interval in ("1d", "1w", "1M"):
+        candles = await load_candles(db_session, interval)
+        expected = resample_with_pandas(prices, interval)
+        pd.testing.assert_frame_equal(
+            candles, expected, check_names=False, check_index_type=False
+        )
+
+
+@pytest.mark.anyio
+async def test_candles_written_by_another_writer_are_overwritten(
+    db_session, session_factory
+):
+    prices = make_hourly_prices(START_TIMESTAMP, 24)
+    rows = [
+        (p.unix_timestamp, p.high, p.low, p.open, p.close, p.volumefrom, p.volumeto)
+        for p in prices
+    ]
+    [early] = aggregate_candles(rows[:12], "1d")
+    [full] = aggregate_candles(rows, "1d")
+
+    # Another writer stores the same bucket between this one's read and its write
+    async with session_factory() as other:
+        other.add(BitcoinPriceCandle(**early))
+        await other.commit()
+
+    await _upsert_candles(db_session, [full])
+    await db_session.commit()
+
+    db_session.expire_all()
+    candle = await db_session.scalar(select(BitcoinPriceCandle))
+    assert (candle.hours, candle.close) == (24, full["close"])
+
+
+@pytest.mark.anyio
+async def test_get_candles_endpoint(async_client, db_session, hourly_history):
+    await rebuild_all_rollups(db_session)
+    await db_session.commit()
+
+    # Mondays 20. January and 3. February 2025
+    response = await async_client.get(
+        "/prices/candles",
+        params={"interval": "1w", "from": 1737331200, "to": 1738540800},
+    )
+    assert response.status_code == 200
+    candles = response.json()
+    assert [c["bucket_start"] for c in candles] == [1737331200, 1737936000, 1738540800]
+    assert all(c["hours"] == 168 for c in candles)
+
+
+@pytest.mark.anyio
+async def test_get_candles_invalid_interval_returns_422(async_client):
+    response = await async_client.get("/prices/candles", params={"interval": "1h"})
+    assert response.status_code == 422
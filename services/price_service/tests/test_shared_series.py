@@ -0,0 +1,246 @@
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+from sqlalchemy import delete
+from app.data_version import bump_data_version, get_data_version
+from app.models import HourlyBitcoinPrice
+from app.price_index import PRICE_COLUMNS
+from app.shared_series import (
+    SharedPriceSeries,
+    append_to_shared_series,
+    shared_price_series,
+)
+from tests.conftest import make_price, make_record
+
+BASE_TIMESTAMP = 1735689600
+CAPACITY = 200_000
+
+
+def make_row(unix_timestamp: int, close: float) -> tuple:
+    record = make_record(unix_timestamp, close)
+    return tuple(record[column] for column in ("time", *PRICE_COLUMNS))
+
+
+def append_in_other_process(path: str, rows: list[tuple]):
+    append_to_shared_series(path, rows)
+
+
+@pytest.fixture
+def series_path(tmp_path):
+    return str(tmp_path / "prices.series")
+
+
+@pytest.fixture
+def writer(series_path):
+    series = SharedPriceSeries()
+    series.attach(series_path, writable=True, capacity=CAPACITY)
+    yield series
+    series.detach()
+
+
+@pytest.fixture
+def reader(series_path, writer):
+    series = SharedPriceSeries()
+    series.attach(series_path)
+    yield series
+    series.detach()
+
+
+def test_reader_sees_appended_hours_without_remapping(writer, reader):
+    assert reader.bounds() is None
+
+    version = reader.version
+    assert (
+        writer.append(
+            [make_row(BASE_TIMESTAMP + h * 3600, 50000.0 + h) for h in (0, 1, 3)]
+        )
+        == 3
+    )
+    assert reader.version == version + 2
+    assert reader.bounds() == (BASE_TIMESTAMP, BASE_TIMESTAMP + 3 * 3600)
+    assert reader.lookup(BASE_TIMESTAMP + 3600)["close"] == 50001.0
+    assert reader.lookup(BASE_TIMESTAMP + 2 * 3600) is None
+
+    # Rewriting a stored hour does not count as a new row
+    assert writer.append([make_row(BASE_TIMESTAMP + 3 * 3600, 50003.0)]) == 0
+    assert reader.stats()["rows"] == 3
+
+
+def test_reader_is_read_only(reader):
+    with pytest.raises(PermissionError):
+        reader.append([make_row(BASE_TIMESTAMP, 50000.0)])
+
+
+def test_append_rejects_hours_beyond_capacity(writer):
+    with pytest.raises(ValueError):
+        writer.append([make_row(BASE_TIMESTAMP + CAPACITY * 3600 * 10, 1.0)])
+
+
+def test_append_from_another_process(series_path, writer, reader):
+    rows = [make_row(BASE_TIMESTAMP + h * 3600, 60000.0 + h) for h in range(5)]
+    process = multiprocessing.get_context("spawn").Process(
+        target=append_in_other_process, args=(series_path, rows)
+    )
+    process.start()
+    process.join(timeout=30)
+
+    assert process.exitcode == 0
+    assert reader.bounds() == (BASE_TIMESTAMP, BASE_TIMESTAMP + 4 * 3600)
+    assert reader.lookup(BASE_TIMESTAMP + 4 * 3600)["close"] == 60004.0
+
+
+def test_only_one_loader(series_path):
+    first, second = SharedPriceSeries(), SharedPriceSeries()
+    try:
+        assert first.try_become_loader(series_path)
+        assert not second.try_become_loader(series_path)
+        first.detach()
+        assert second.try_become_loader(series_path)
+    finally:
+        first.detach()
+        second.detach()
+
+
+@pytest.mark.anyio
+async def test_endpoint_answers_from_shared_series(
+    async_client, db_session, series_path
+):
+    db_session.add_all(
+        make_price(BASE_TIMESTAMP + h * 3600, 50000.0 + h) for h in range(3)
+    )
+    await db_session.commit()
+
+    shared_price_series.attach(series_path, writable=True, capacity=CAPACITY)
+    try:
+        assert await shared_price_series.load(db_session) == 3
+        await db_session.execute(delete(HourlyBitcoinPrice))
+        await db_session.commit()
+
+        response = await async_client.get(f"/prices/{BASE_TIMESTAMP + 3600}")
+        assert response.status_code == 200
+        assert response.json()["close"] == 50001.0
+
+        response = await async_client.get("/prices/index/stats")
+        assert response.json()["shared"] is True
+        assert response.json()["rows"] == 3
+        assert response.json()["data_version"] == await get_data_version(db_session)
+    finally:
+        shared_price_series.detach()
+
+
+@pytest.mark.anyio
+async def test_endpoints_fall_back_to_the_database_while_a_write_is_stuck(
+    async_client, db_session, series_path, monkeypatch
+):
+    db_session.add_all(
+        make_price(BASE_TIMESTAMP + h * 3600, 50000.0 + h) for h in range(3)
+    )
+    await db_session.commit()
+
+    shared_price_series.attach(series_path, writable=True, capacity=CAPACITY)
+    try:
+        assert await shared_price_series.load(db_session) == 3
+        await db_session.execute(delete(HourlyBitcoinPrice))
+        db_session.add_all(
+            make_price(BASE_TIMESTAMP + h * 3600, 60000.0 + h) for h in range(3)
+        )
+        await db_session.commit()
+
+        # The writer takes the version odd right after the route checked it
+        monkeypatch.setattr(
+            SharedPriceSeries, "is_readable", property(lambda self: self.is_loaded)
+        )
+        shared_price_series._header["version"] += 1
+
+        response = await async_client.get(f"/prices/{BASE_TIMESTAMP + 3600}")
+        assert response.status_code == 200
+        assert response.json()["close"] == 60001.0
+
+        response = await async_client.get(
+            f"/prices/{BASE_TIMESTAMP + 3600 + 600}",
+            params={"mode": "nearest"},
+        )
+        assert response.status_code == 200
+        assert response.json()["close"] == 60001.0
+
+        response = await async_client.post(
+            "/prices/batch", json={"timestamps": [BASE_TIMESTAMP + 2 * 3600]}
+        )
+        assert response.status_code == 200
+        assert response.json()[0]["price"]["close"] == 60002.0
+    finally:
+        shared_price_series._header["version"] += 1
+        shared_price_series.detach()
+
+
+@pytest.mark.anyio
+async def test_refresh_writes_hours_stored_inside_the_range(db_session, writer, reader):
+    db_session.add_all(
+        make_price(BASE_TIMESTAMP + h * 3600, 50000.0 + h) for h in (0, 1, 3)
+    )
+    await db_session.commit()
+    assert await writer.load(db_session) == 3
+
+    # Gap repair stores hour +2 after the load
+    db_session.add(make_price(BASE_TIMESTAMP + 2 * 3600, 50002.0))
+    await bump_data_version(db_session)
+    await db_session.commit()
+
+    assert await writer.refresh(db_session) == 1
+    assert reader.lookup(BASE_TIMESTAMP + 2 * 3600)["close"] == 50002.0
+    assert reader.stats()["rows"] == 4
+    assert await writer.refresh(db_session) == 0
+
+
+def test_writer_that_died_mid_update_is_recovered(series_path, writer, reader):
+    writer.append([make_row(BASE_TIMESTAMP, 50000.0)], loaded=True)
+    # A writer died while holding the version odd
+    writer._header["version"] += 1
+
+    assert not reader.is_readable
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        reader.lookup(BASE_TIMESTAMP)
+    assert time.monotonic() - started < 0.5
+
+    # The next writer evens the version out and marks the file for a reload
+    writer.append([make_row(BASE_TIMESTAMP + 3600, 50001.0)])
+    assert reader.version % 2 == 0
+    assert not reader.is_loaded
+    assert reader.lookup(BASE_TIMESTAMP + 3600)["close"] == 50001.0
+
+
+@pytest.mark.anyio
+async def test_worker_takes_over_from_a_dead_loader(
+    db_session, session_factory, series_path
+):
+    db_session.add(make_price(BASE_TIMESTAMP, 50000.0))
+    await db_session.commit()
+
+    loader, worker = SharedPriceSeries(), SharedPriceSeries()
+    try:
+        assert loader.try_become_loader(series_path)
+        loader.attach(series_path, writable=True, capacity=CAPACITY)
+        await loader.load(db_session)
+        assert not worker.try_become_loader(series_path)
+        worker.attach(series_path)
+
+        # The loader process exits; the worker's next refresh tick takes over
+        loader.detach()
+        db_session.add(make_price(BASE_TIMESTAMP + 3600, 50001.0))
+        await db_session.commit()
+
+        refresher = asyncio.create_task(worker.run_refresher(session_factory, 0.01))
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if worker.lookup(BASE_TIMESTAMP + 3600) is not None:
+                break
+        refresher.cancel()
+
+        assert worker.writable
+        assert worker.lookup(BASE_TIMESTAMP + 3600)["close"] == 50001.0
+    finally:
+        loader.detach()
+        worker.detach()
@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+from sqlalchemy import delete, func
+from sqlalchemy.future import select
+from app.data_version import bump_data_version
+from app.models import HourlyBitcoinPrice
+from app.price_index import PriceIndex, price_index
+from app.snapshot import (
+    SNAPSHOT_DTYPE,
+    SnapshotError,
+    export_snapshot,
+    import_snapshot,
+    load_snapshot,
+)
+from tests.conftest import make_price
+
+BASE_TIMESTAMP = 1735689600
+
+
+@pytest.fixture
+async def snapshot_path(db_session, tmp_path):
+    # Hour +2 is deliberately missing
+    db_session.add_all(
+        make_price(BASE_TIMESTAMP + hour * 3600, 50000.0 + hour)
+        for hour in (0, 1, 3, 4)
+    )
+    await db_session.commit()
+
+    path = tmp_path / "prices.npy"
+    assert await export_snapshot(db_session, path, chunk_size=3) == 4
+    return path
+
+
+@pytest.mark.anyio
+async def test_export_snapshot_writes_sorted_records(snapshot_path):
+    snapshot = load_snapshot(snapshot_path)
+
+    assert isinstance(snapshot, np.memmap)
+    assert snapshot.dtype == SNAPSHOT_DTYPE
+    assert snapshot["unix_timestamp"].tolist() == [
+        BASE_TIMESTAMP + hour * 3600 for hour in (0, 1, 3, 4)
+    ]
+    assert snapshot["close"][1] == 50001.0
+
+
+@pytest.mark.anyio
+async def test_import_snapshot_restores_rows(
+    db_session, session_factory, snapshot_path
+):
+    await db_session.execute(delete(HourlyBitcoinPrice))
+    await db_session.commit()
+
+    report = await import_snapshot(session_factory, snapshot_path, chunk_size=3)
+    assert report["inserted"] == 4
+
+    report = await import_snapshot(session_factory, snapshot_path)
+    assert report["inserted"] == 0
+    assert report["skipped"] == 4
+    assert (
+        await db_session.scalar(select(func.count(HourlyBitcoinPrice.unix_timestamp)))
+        == 4
+    )
+
+
+def test_load_snapshot_rejects_other_arrays(tmp_path):
+    path = tmp_path / "other.npy"
+    np.save(path, np.arange(10))
+    with pytest.raises(SnapshotError):
+        load_snapshot(path)
+
+
+@pytest.mark.anyio
+async def test_price_index_answers_from_snapshot_without_db(
+    async_client, db_session, snapshot_path
+):
+    await db_session.execute(delete(HourlyBitcoinPrice))
+    await db_session.commit()
+
+    assert price_index.load_from_snapshot(load_snapshot(snapshot_path)) == 4
+    try:
+        assert price_index.lookup(BASE_TIMESTAMP + 2 * 3600) is None
+        response = await async_client.get(f"/prices/{BASE_TIMESTAMP + 3 * 3600}")
+        assert response.status_code == 200
+        assert response.json()["close"] == 50003.0
+    finally:
+        price_index.reset()
+
+
+@pytest.mark.anyio
+async def test_refresh_after_snapshot_appends_newer_rows(db_session, snapshot_path):
+    index = PriceIndex()
+    index.load_from_snapshot(load_snapshot(snapshot_path))
+
+    db_session.add(make_price(BASE_TIMESTAMP + 6 * 3600, 60000.0))
+    await db_session.commit()
+
+    assert await index.refresh(db_session) == 1
+    assert index.bounds() == (BASE_TIMESTAMP, BASE_TIMESTAMP + 6 * 3600)
+
+
+@pytest.mark.anyio
+async def test_refresh_after_snapshot_adds_hours_stored_inside_its_range(
+    db_session, snapshot_path
+):
+    index = PriceIndex()
+    index.load_from_snapshot(load_snapshot(snapshot_path))
+
+    # Hour +2 was repaired after the snapshot was taken
+    db_session.add(make_price(BASE_TIMESTAMP + 2 * 3600, 50002.0))
+    await bump_data_version(db_session)
+    await db_session.commit()
+
+    assert await index.refresh(db_session) == 1
+    assert index.lookup(BASE_TIMESTAMP + 2 * 3600)["close"] == 50002.0
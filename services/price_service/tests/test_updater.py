@@ -0,0 +1,124 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from sqlalchemy import func
+from sqlalchemy.future import select
+from app.models import HourlyBitcoinPrice
+from app.updater import UpdaterDaemon, create_health_app, update_prices
+from app.utils.timestamp import round_timestamp_down_to_hour
+
+CURRENT_HOUR = round_timestamp_down_to_hour(int(time.time()))
+LATEST_STORED = CURRENT_HOUR - 4 * 3600
+
+
+@pytest.fixture
+async def stored_hours(db_session):
+    db_session.add_all(
+        HourlyBitcoinPrice(
+            unix_timestamp=LATEST_STORED - hour * 3600,
+            high=1.0,
+            low=1.0,
+            open=1.0,
+            close=1.0,
+            volumefrom=1.0,
+            volumeto=1.0,
+        )
+        for hour in range(3)
+    )
+    await db_session.commit()
+
+
+def test_schedule_and_backoff():
+    daemon = UpdaterDaemon(None, delay=5.0, retry_base=2.0, retry_max=60.0)
+    assert daemon.next_run_after(CURRENT_HOUR) == CURRENT_HOUR + 3605
+    assert daemon.next_run_after(CURRENT_HOUR + 3599) == CURRENT_HOUR + 3605
+
+    for attempt in range(10):
+        assert 0 <= daemon.backoff(attempt) <= min(60.0, 2.0 * 2**attempt)
+
+
+@pytest.mark.anyio
+async def test_update_prices_stores_closed_missing_hours(
+    db_session, session_factory, cryptocompare, stored_hours
+):
+    async with aiohttp.ClientSession() as http_session:
+        report = await update_prices(
+            session_factory,
+            http_session,
+            now=CURRENT_HOUR + 100,
+            base_url=cryptocompare["base_url"],
+        )
+
+    # Hours +1..+3 after the latest stored one; the current hour is still open
+    assert report["missing"] == 3
+    assert report["inserted"] == 3
+    assert report["latest_hour"] == CURRENT_HOUR - 3600
+    stored = await db_session.scalar(
+        select(func.count(HourlyBitcoinPrice.unix_timestamp))
+    )
+    assert stored == 6
+
+
+@pytest.mark.anyio
+async def test_update_prices_row_by_row_reports_the_same(
+    db_session, session_factory, cryptocompare, stored_hours
+):
+    async with aiohttp.ClientSession() as http_session:
+        report = await update_prices(
+            session_factory,
+            http_session,
+            now=CURRENT_HOUR + 100,
+            base_url=cryptocompare["base_url"],
+            row_by_row=True,
+        )
+
+    assert (report["missing"], report["inserted"], report["skipped"]) == (3, 3, 0)
+    assert report["latest_hour"] == CURRENT_HOUR - 3600
+
+
+@pytest.mark.anyio
+async def test_run_until_success_retries_and_reports_metrics(
+    session_factory, cryptocompare, stored_hours
+):
+    cryptocompare["failures"] = 2
+    daemon = UpdaterDaemon(
+        session_factory,
+        retry_base=0.01,
+        retry_max=0.01,
+        base_url=cryptocompare["base_url"],
+    )
+    async with aiohttp.ClientSession() as http_session:
+        report = await daemon.run_until_success(http_session)
+
+    assert report["inserted"] == 3
+    metrics = daemon.metrics()
+    assert metrics["runs"] == 3
+    assert metrics["failures"] == 2
+    assert metrics["consecutive_failures"] == 0
+    assert metrics["last_error"] is None
+    assert metrics["latest_hour"] == CURRENT_HOUR - 3600
+    assert 0 <= metrics["lag_seconds"] < 3600
+
+
+@pytest.mark.anyio
+async def test_health_app_reports_liveness_and_lag():
+    daemon = UpdaterDaemon(None)
+    daemon.latest_hour = CURRENT_HOUR - 5 * 3600
+    task = asyncio.create_task(asyncio.sleep(60))
+
+    async with TestClient(
+        TestServer(create_health_app(daemon, task, max_lag_seconds=7200))
+    ) as client:
+        response = await client.get("/health")
+        assert response.status == 200
+        metrics = await (await client.get("/metrics")).json()
+        assert metrics["alive"] is True
+        assert metrics["stale"] is True
+
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        response = await client.get("/health")
+        assert response.status == 503
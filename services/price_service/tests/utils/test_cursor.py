@@ -0,0 +1,18 @@
+import pytest
+from app.utils.cursor import encode_cursor, decode_cursor
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(1742745600, "next")
+    assert decode_cursor(cursor) == (1742745600, "next")
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(1742745600, "prev")
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(1, "up")])
+def test_decode_cursor_rejects_malformed_input(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
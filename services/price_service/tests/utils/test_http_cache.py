@@ -0,0 +1,20 @@
+from app.utils.http_cache import etag_matches, hour_etag, versioned_etag
+
+
+def test_hour_etag_is_quoted():
+    assert hour_etag(1742745600) == '"hour-1742745600"'
+
+
+def test_versioned_etag_ignores_query_parameter_order():
+    assert versioned_etag(3, "page=2&size=50") == versioned_etag(3, "size=50&page=2")
+    assert versioned_etag(3, "page=2&size=50") != versioned_etag(4, "page=2&size=50")
+
+
+def test_etag_matches_list_and_weak_tags():
+    etag = hour_etag(1742745600)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches(f"W/{etag}", etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches("*", etag, match_any=False)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
@@ -1,6 +1,7 @@
 from app.utils.timestamp import (
     round_timestamp_to_nearest_hour,
     round_timestamp_down_to_hour,
+    round_timestamp_to_nearest_minute,
 )
 
 
@@ -42,3 +43,10 @@ def test_round_timestamp_down_to_hour_inbetween():
     assert (
         round_timestamp_down_to_hour(ts) == 1742742000
     )  # Sunday 23. March 2025 15:00:00
+
+
+def test_round_timestamp_to_nearest_minute():
+    # Sunday 23. March 2025 15:30:29 and 15:30:30
+    assert round_timestamp_to_nearest_minute(1742743829) == 1742743800
+    assert round_timestamp_to_nearest_minute(1742743830) == 1742743860
+    assert round_timestamp_to_nearest_minute(1742743800) == 1742743800